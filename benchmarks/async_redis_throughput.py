@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import threading
+import time
+
+import httpx
+import redis
+import redis.asyncio as aioredis
+from fastapi import FastAPI
+
+from src.core.config import settings
+
+KEYS = ["pricing_plans:{catalog}:version", "provider_plans:{a.json}", "provider_plans:{b.json}"]
+
+
+def build_blocking_app(pool: redis.BlockingConnectionPool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pricing-plans")
+    async def pricing_plans():
+        client = redis.Redis(connection_pool=pool)
+        client.ping()
+        return [client.get(key) for key in KEYS]
+
+    return app
+
+
+def build_async_app(pool: aioredis.BlockingConnectionPool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pricing-plans")
+    async def pricing_plans():
+        client = aioredis.Redis(connection_pool=pool)
+        await client.ping()
+        return [await client.get(key) for key in KEYS]
+
+    return app
+
+
+async def run_load(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.get("/pricing-plans")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def start_latency_proxy(listen_port: int, upstream_port: int, latency: float) -> None:
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(latency / 2)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(
+            settings.REDIS_HOST, upstream_port
+        )
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer)
+        )
+
+    async def serve():
+        server = await asyncio.start_server(handle, settings.REDIS_HOST, listen_port)
+        ready.set()
+        await server.serve_forever()
+
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+
+
+def start_fake_server(port: int) -> None:
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer((settings.REDIS_HOST, port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Blocking vs asyncio Redis throughput")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--fake", action="store_true", help="Start an in-process fakeredis server")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Round-trip latency injected by a local proxy"
+    )
+    args = parser.parse_args()
+
+    if args.fake:
+        start_fake_server(args.port)
+    port = args.port
+    if args.latency_ms:
+        port = args.port + 1
+        start_latency_proxy(port, args.port, args.latency_ms / 1000)
+
+    blocking_pool = redis.BlockingConnectionPool(
+        host=settings.REDIS_HOST, port=port, max_connections=settings.REDIS_MAX_CONNECTIONS
+    )
+    async_pool = aioredis.BlockingConnectionPool(
+        host=settings.REDIS_HOST, port=port, max_connections=settings.REDIS_MAX_CONNECTIONS
+    )
+    blocking = await run_load(build_blocking_app(blocking_pool), args.requests, args.concurrency)
+    non_blocking = await run_load(build_async_app(async_pool), args.requests, args.concurrency)
+    await async_pool.disconnect()
+
+    print(f"blocking redis.Redis:      {blocking:10.1f} req/s")
+    print(f"redis.asyncio.Redis:       {non_blocking:10.1f} req/s")
+    print(f"speedup:                   {non_blocking / blocking:10.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import time
+
+import fakeredis.aioredis
+
+from src.clients.catalog_loader import PlanColumns
+from src.core.local_cache import plan_cache
+from src.core.single_flight import SingleFlight
+from src.repositories.pricing_plan_repository import PricingPlanRepository
+from src.services.plan_index import PlanIndexStore
+from src.services.pricing_plan_service import PricingPlanService
+from src.services.provider_fanout import ProviderFanout
+
+
+class SlowProvider:
+    def __init__(self, name: str, load_time: float):
+        self.name = name
+        self.load_time = load_time
+        self.loads = 0
+
+    async def get_plan_columns(self):
+        self.loads += 1
+        await asyncio.sleep(self.load_time)
+        columns = PlanColumns()
+        columns.append(self.name, 100, 0.02)
+        return columns
+
+
+class UncoalescedFlight(SingleFlight):
+    async def do(self, key, fn):
+        return await fn()
+
+
+async def stampede(requests: int, workers: int, load_time: float, coalesce: bool) -> tuple:
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True, max_connections=10_000)
+    plan_cache.clear()
+    provider = SlowProvider("A", load_time)
+    services = []
+    for i in range(workers):
+        repository = PricingPlanRepository(redis_client)
+        if not coalesce:
+            repository.rebuild_lease = lambda: _AlwaysGranted()
+        flight = SingleFlight(f"bench-{i}") if coalesce else UncoalescedFlight(f"bench-{i}")
+        services.append(
+            PricingPlanService(
+                repository, [provider], PlanIndexStore(), ProviderFanout(timeout=10), flight
+            )
+        )
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(services[i % workers].get_filtered_and_sorted_plans(0) for i in range(requests))
+    )
+    elapsed = time.perf_counter() - started
+    plan_cache.clear()
+    return provider.loads, elapsed
+
+
+class _AlwaysGranted:
+    async def acquire(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Catalog recomputations per cache expiry")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--load-time", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for label, coalesce in (("uncoalesced", False), ("single-flight + lease", True)):
+        loads, elapsed = asyncio.run(
+            stampede(args.requests, args.workers, args.load_time, coalesce)
+        )
+        print(f"{label:24} recomputations: {loads:5d}   wall: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
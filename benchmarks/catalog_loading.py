@@ -0,0 +1,86 @@
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.clients.catalog_loader import load_plan_columns
+from src.schemas.pricing_plan import PricingPlan
+
+
+def write_catalog(path: Path, rows: int) -> None:
+    rng = random.Random(42)
+    with open(path, "w") as f:
+        f.write("[\n")
+        for i in range(rows):
+            plan = {
+                "provider": "A",
+                "storage_gb": rng.randint(1, 100_000),
+                "price_per_gb": round(rng.uniform(0.001, 0.05), 5),
+            }
+            f.write(("," if i else "") + json.dumps(plan) + "\n")
+        f.write("]\n")
+
+
+def load_legacy(path: Path) -> int:
+    with open(path) as f:
+        data = json.load(f)
+    plans = [PricingPlan(**plan) for plan in data]
+    cached = json.dumps([plan.model_dump() for plan in plans])
+    del cached
+    return len(plans)
+
+
+def load_streaming(path: Path) -> int:
+    columns = load_plan_columns(path)
+    for _ in columns.chunks(10_000):
+        pass
+    return len(columns)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, path: Path) -> None:
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    rows = (load_legacy if mode == "legacy" else load_streaming)(path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"rows": rows, "seconds": elapsed, "peak_rss_mb": peak_rss_mb(), "baseline_rss_mb": baseline}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Provider catalog load time and peak RSS")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["legacy", "streaming"])
+    parser.add_argument("--file")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, Path(args.file))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "a.json"
+        write_catalog(path, args.rows)
+        print(f"catalog: {args.rows} rows, {path.stat().st_size / 2**20:.1f} MiB")
+        for mode in ("legacy", "streaming"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.catalog_loading", "--mode", mode, "--file", str(path)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:10} load: {result['seconds']:7.2f} s   "
+                f"peak RSS: {result['peak_rss_mb']:8.1f} MiB "
+                f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.report import compare_reports, print_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change treated as a regression"
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline["suite"] != current["suite"]:
+        print(f"Cannot compare suite {baseline['suite']} with {current['suite']}")
+        return 2
+
+    print(f"baseline {baseline['revision']} ({baseline['created_at']})")
+    print_table(baseline["results"])
+    print(f"current  {current['revision']} ({current['created_at']})")
+    print_table(current["results"])
+    regressions = compare_reports(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"no regressions above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
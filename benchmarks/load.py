@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.report import build_report, summarize, write_report
+from src.core.config import settings
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def start_fake_server(port: int) -> None:
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer((settings.REDIS_HOST, port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def start_server(
+    port: int, redis_port: int, workers: int, env: Dict[str, str] | None = None
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "REDIS_PORT": str(redis_port),
+        "CATALOG_WATCH": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "REDIS_MAX_CONNECTIONS": str(max(settings.REDIS_MAX_CONNECTIONS, 50)),
+        **(env or {}),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+
+
+async def wait_ready(
+    client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30.0, poll_interval: float = 0.2
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(poll_interval)
+    raise RuntimeError("Server did not become ready")
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    requests: int,
+    concurrency: int,
+    server_pid: int,
+    **extra,
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await request(client, i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(
+        latencies,
+        time.perf_counter() - started,
+        errors,
+        rss_pid=server_pid,
+        concurrency=concurrency,
+        **extra,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load scenarios against uvicorn")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--redis-port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--fake", action="store_true", help="Serve Redis from an in-process fakeredis server")
+    parser.add_argument("--max-storage", type=int, default=2500, help="Upper bound for random min_storage")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.fake:
+        start_fake_server(args.redis_port)
+    server = start_server(args.port, args.redis_port, args.workers)
+    rng = random.Random(args.seed)
+    thresholds = [rng.randint(0, args.max_storage) for _ in range(args.requests)]
+    order_ids: List[str] = []
+
+    async def plan_query(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.get("/pricing-plans", params={"min_storage": thresholds[i]})
+
+    async def create_order(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        response = await client.post("/orders", json={"provider": "AB"[i % 2], "storage_gb": 1 + i % 1000})
+        if response.status_code == 200:
+            order_ids.append(response.json()["order_id"])
+        return response
+
+    async def poll_status(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.get(f"/orders/{order_ids[i % len(order_ids)]}")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30.0
+        ) as client:
+            await wait_ready(client, server)
+            results = {}
+            for name, request in (
+                ("plan_queries", plan_query),
+                ("order_burst", create_order),
+                ("status_polling", poll_status),
+            ):
+                results[name] = await run_scenario(
+                    client, request, args.requests, args.concurrency, server.pid
+                )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    write_report(build_report("load", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
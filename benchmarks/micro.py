@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import logging
+import random
+from uuid import uuid4
+
+import fakeredis.aioredis
+
+from benchmarks.report import build_report, timed, timed_async, write_report
+from src.clients.provider_client import ProviderRegistry
+from src.core.local_cache import plan_cache
+from src.repositories.order_repository import OrderRepository
+from src.repositories.pricing_plan_repository import PricingPlanRepository
+from src.schemas.order import Order, OrderCreate
+from src.schemas.pricing_plan import PlanQuery, PlanRecord, PricingPlan
+from src.services.plan_index import PlanIndexStore
+from src.services.pricing_plan_service import PricingPlanService
+
+
+async def bench_plan_service(redis_client, iterations: int, rng: random.Random) -> dict:
+    registry = ProviderRegistry()
+    registry.start(redis_client)
+    service = PricingPlanService(
+        PricingPlanRepository(redis_client), list(registry.clients()), index_store=PlanIndexStore()
+    )
+    await service.get_filtered_and_sorted_plans(0)
+    thresholds = [rng.randint(0, 2500) for _ in range(iterations)]
+    queries = iter(thresholds)
+    return await timed_async(lambda: service.get_filtered_and_sorted_plans(next(queries)), iterations)
+
+
+async def bench_order_repository(redis_client, iterations: int, rng: random.Random) -> dict:
+    repository = OrderRepository(redis_client)
+    orders = [
+        Order(order_id=uuid4(), provider=rng.choice("AB"), storage_gb=rng.randint(1, 5000), status="pending")
+        for _ in range(iterations)
+    ]
+    saves = iter(orders)
+    save = await timed_async(lambda: repository.save_order(next(saves)), iterations)
+    gets = iter(orders)
+    get = await timed_async(lambda: repository.get_order(next(gets).order_id, trusted=True), iterations)
+    batch = await timed_async(
+        lambda: repository.get_orders([order.order_id for order in orders[:100]], trusted=True),
+        max(1, iterations // 100),
+    )
+    return {"order_repository.save_order": save, "order_repository.get_order": get, "order_repository.get_orders_100": batch}
+
+
+def bench_validators(iterations: int) -> dict:
+    order_id = uuid4()
+    return {
+        "schema.order_create": timed(lambda: OrderCreate(provider="A", storage_gb=100), iterations),
+        "schema.order": timed(
+            lambda: Order(order_id=order_id, provider="B", storage_gb=100, status="pending"), iterations
+        ),
+        "schema.order_trusted": timed(
+            lambda: Order.trusted(order_id=order_id, provider="B", storage_gb=100, status="pending"), iterations
+        ),
+        "schema.pricing_plan": timed(
+            lambda: PricingPlan(provider="A", storage_gb=100, price_per_gb=0.01), iterations
+        ),
+        "schema.pricing_plan_trusted": timed(
+            lambda: PricingPlan.trusted(provider="A", storage_gb=100, price_per_gb=0.01), iterations
+        ),
+        "schema.plan_record": timed(lambda: PlanRecord("A", 100, 0.01), iterations),
+        "schema.plan_query": timed(
+            lambda: PlanQuery(min_storage=100, max_budget=50.0, providers=["A"], limit=10), iterations
+        ),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for services, repositories and schemas")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    results = {"pricing_plan_service.get_filtered_and_sorted_plans": await bench_plan_service(redis_client, args.iterations, rng)}
+    results.update(await bench_order_repository(redis_client, args.iterations, rng))
+    results.update(bench_validators(args.iterations))
+    write_report(build_report("micro", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
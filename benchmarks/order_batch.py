@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from main import app
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="POST /orders/batch vs N x POST /orders")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    items = [{"provider": "AB"[i % 2], "storage_gb": 100 + i} for i in range(args.orders)]
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def single(item):
+                async with semaphore:
+                    (await client.post("/orders", json=item)).raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(single(item) for item in items))
+            singles = time.perf_counter() - started
+
+            started = time.perf_counter()
+            response = await client.post("/orders/batch", json={"orders": items})
+            response.raise_for_status()
+            batch = time.perf_counter() - started
+            assert response.json()["created"] == args.orders
+
+    print(f"{args.orders} x POST /orders:     {singles * 1000:10.1f} ms ({args.orders / singles:8.0f} orders/s)")
+    print(f"1 x POST /orders/batch:    {batch * 1000:10.1f} ms ({args.orders / batch:8.0f} orders/s)")
+    print(f"speedup:                   {singles / batch:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import redis.asyncio as aioredis
+
+from src.core.config import settings
+from src.repositories.order_completion_repository import (
+    COMPLETION_QUEUE_KEY,
+    OrderCompletionRepository,
+)
+from src.repositories.order_repository import OrderRepository
+from src.schemas.order import Order
+from src.workers.order_completion import OrderCompletionWorker
+
+
+async def seed(redis_client: aioredis.Redis, count: int, chunk: int = 5000) -> None:
+    order_repository = OrderRepository(redis_client)
+    for start in range(0, count, chunk):
+        orders = [
+            Order(order_id=uuid4(), provider="A", storage_gb=100, status="pending")
+            for _ in range(min(chunk, count - start))
+        ]
+        await order_repository.save_orders(orders, ttl=3600, complete_at=0)
+
+
+async def drain(redis_client: aioredis.Redis, worker: OrderCompletionWorker) -> None:
+    while await worker.process_due():
+        pass
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Order completion worker throughput")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=settings.ORDER_COMPLETION_BATCH_SIZE)
+    parser.add_argument("--fake", action="store_true", help="Use in-process fakeredis")
+    args = parser.parse_args()
+
+    if args.fake:
+        from fakeredis.aioredis import FakeRedis
+
+        redis_client = FakeRedis(decode_responses=True)
+    else:
+        redis_client = aioredis.Redis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
+        )
+    await redis_client.delete(COMPLETION_QUEUE_KEY)
+
+    started = time.perf_counter()
+    await seed(redis_client, args.orders)
+    seeded = time.perf_counter()
+
+    workers = [
+        OrderCompletionWorker(
+            OrderRepository(redis_client),
+            OrderCompletionRepository(redis_client),
+            batch_size=args.batch_size,
+        )
+        for _ in range(args.workers)
+    ]
+    await asyncio.gather(*(drain(redis_client, worker) for worker in workers))
+    finished = time.perf_counter()
+
+    remaining = await redis_client.zcard(COMPLETION_QUEUE_KEY)
+    print(f"orders:              {args.orders}")
+    print(f"seed time:           {seeded - started:8.2f} s")
+    print(f"completion time:     {finished - seeded:8.2f} s")
+    print(f"throughput:          {args.orders / (finished - seeded):8.0f} orders/s")
+    print(f"left in queue:       {remaining}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import time
+from typing import Dict, List
+
+import httpx
+from redis.asyncio import Redis
+
+from benchmarks.load import start_server, wait_ready
+from benchmarks.report import build_report, summarize, tree_rss_mb, write_report
+from src.core.config import settings
+
+
+def raise_file_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard < needed else needed, hard))
+
+
+def serve_fake_redis(port: int) -> None:
+    from fakeredis import TcpFakeServer
+
+    TcpFakeServer((settings.REDIS_HOST, port), server_type="redis").serve_forever()
+
+
+async def create_orders(client: httpx.AsyncClient, count: int) -> List[str]:
+    order_ids: List[str] = []
+    while len(order_ids) < count:
+        size = min(settings.ORDER_BATCH_MAX_SIZE, count - len(order_ids))
+        response = await client.post(
+            "/orders/batch", json={"orders": [{"provider": "AB"[i % 2], "storage_gb": 1 + i} for i in range(size)]}
+        )
+        response.raise_for_status()
+        order_ids.extend(result["order"]["order_id"] for result in response.json()["results"] if result["order"])
+    return order_ids
+
+
+async def watch(
+    port: int,
+    order_id: str,
+    connecting: asyncio.Semaphore,
+    connected: List[float],
+    received: Dict[int, float],
+    index: int,
+) -> None:
+    # Raw sockets keep the client cheap enough that the server is what gets measured
+    async with connecting:
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET /orders/{order_id}/events HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+        status_line = await reader.readline()
+        if b" 200 " not in status_line:
+            writer.close()
+            raise RuntimeError(f"Unexpected response {status_line!r}")
+        while not (line := await reader.readline()).startswith(b"data:"):
+            pass
+        connected.append(time.perf_counter() - started)
+    try:
+        while line:
+            if b'"completed"' in line:
+                received[index] = time.perf_counter()
+                return
+            line = await reader.readline()
+        raise RuntimeError("Stream closed before completion")
+    finally:
+        writer.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent order status watchers over SSE")
+    parser.add_argument("--watchers", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--redis-port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--fake", action="store_true", help="Serve Redis from an in-process fakeredis server")
+    parser.add_argument("--connect-concurrency", type=int, default=100, help="Watchers connecting at once")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    raise_file_limit(2 * args.watchers + 1024)
+
+    if args.fake:
+        # TcpFakeServer multiplexes with select(), so keep it away from the watcher sockets
+        multiprocessing.Process(target=serve_fake_redis, args=(args.redis_port,), daemon=True).start()
+    server = start_server(args.port, args.redis_port, workers=1)
+    redis_client = Redis(host=settings.REDIS_HOST, port=args.redis_port)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0) as client:
+            await wait_ready(client, server)
+            order_ids = await create_orders(client, args.orders)
+            baseline_rss = tree_rss_mb(server.pid)
+
+            connecting = asyncio.Semaphore(args.connect_concurrency)
+            connected: List[float] = []
+            received: Dict[int, float] = {}
+            started = time.perf_counter()
+            tasks = [
+                asyncio.create_task(
+                    watch(args.port, order_ids[i % len(order_ids)], connecting, connected, received, i)
+                )
+                for i in range(args.watchers)
+            ]
+            while (
+                len(connected) < args.watchers
+                and not any(task.done() for task in tasks)
+                and time.perf_counter() - started < args.timeout
+            ):
+                await asyncio.sleep(0.1)
+            connect_seconds = time.perf_counter() - started
+            watching_rss = tree_rss_mb(server.pid)
+
+            published = time.perf_counter()
+            pipeline = redis_client.pipeline(transaction=False)
+            for order_id in order_ids:
+                pipeline.publish(settings.ORDER_EVENTS_CHANNEL, f"{order_id} completed")
+            await pipeline.execute()
+            done, pending = await asyncio.wait(tasks, timeout=args.timeout)
+            for task in pending:
+                task.cancel()
+            errors = len(pending) + sum(1 for task in done if task.exception() is not None)
+            delivery = [at - published for at in received.values()]
+            results = {
+                "order_events.connect": summarize(
+                    connected, connect_seconds, rss_pid=server.pid, baseline_rss_mb=baseline_rss
+                ),
+                "order_events.delivery": summarize(
+                    delivery, max(delivery, default=0.0), errors, rss_pid=server.pid,
+                    watchers=args.watchers, rss_per_watcher_kb=(watching_rss - baseline_rss) * 1024 / args.watchers,
+                ),
+            }
+    finally:
+        await redis_client.aclose()
+        server.terminate()
+        server.wait(timeout=30)
+    write_report(build_report("order_events", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
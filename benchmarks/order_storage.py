@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from uuid import uuid4
+
+import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from src.core.config import settings
+from src.repositories.order_codec import ORDER_CODECS
+from src.repositories.order_repository import OrderRepository, order_key
+from src.schemas.order import Order
+
+CHUNK = 5000
+
+
+def synthetic_orders(count: int) -> list[Order]:
+    rng = random.Random(7)
+    return [
+        Order.model_construct(
+            order_id=uuid4(),
+            provider=rng.choice(settings.PROVIDERS),
+            storage_gb=rng.randint(1, 10_000),
+            status=rng.choice(["pending", "completed"]),
+        )
+        for _ in range(count)
+    ]
+
+
+async def memory_per_order(redis_client: aioredis.Redis, orders: list[Order], codec) -> tuple[float, str]:
+    sample = orders[:: max(1, len(orders) // 1000)]
+    try:
+        usages = [await redis_client.memory_usage(order_key(order.order_id)) for order in sample]
+        return sum(usages) / len(usages), "MEMORY USAGE"
+    except ResponseError:
+        sizes = []
+        for order in sample:
+            encoded = codec.encode(order)
+            payload = encoded if isinstance(encoded, str) else json.dumps(encoded, separators=(",", ":"))
+            sizes.append(len(order_key(order.order_id)) + len(payload))
+        return sum(sizes) / len(sizes), "payload bytes"
+
+
+async def run_codec(redis_client: aioredis.Redis, name: str, orders: list[Order]) -> None:
+    repository = OrderRepository(redis_client)
+    repository.codec = ORDER_CODECS[name]
+    await redis_client.flushdb()
+
+    started = time.perf_counter()
+    for start in range(0, len(orders), CHUNK):
+        await repository.save_orders(orders[start:start + CHUNK])
+    write = time.perf_counter() - started
+
+    ids = [order.order_id for order in orders]
+    timings = {}
+    for trusted in (False, True):
+        started = time.perf_counter()
+        for start in range(0, len(ids), CHUNK):
+            await repository.get_orders(ids[start:start + CHUNK], trusted=trusted)
+        timings[trusted] = time.perf_counter() - started
+
+    completed = [order.model_copy(update={"status": "completed"}) for order in orders]
+    started = time.perf_counter()
+    for start in range(0, len(completed), CHUNK):
+        await repository.update_statuses(completed[start:start + CHUNK])
+    update = time.perf_counter() - started
+
+    per_order, source = await memory_per_order(redis_client, orders, repository.codec)
+    count = len(orders)
+    print(f"[{name}]")
+    print(f"  memory per order ({source}): {per_order:8.1f} B, total {per_order * count / 2**20:8.1f} MiB")
+    print(f"  write:                {count / write:10.0f} orders/s")
+    print(f"  read (validated):     {count / timings[False]:10.0f} orders/s")
+    print(f"  read (trusted):       {count / timings[True]:10.0f} orders/s")
+    print(f"  status update:        {count / update:10.0f} orders/s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON vs hash order storage")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--db", type=int, default=15, help="Redis database to flush and use")
+    parser.add_argument("--fake", action="store_true", help="Use in-process fakeredis")
+    args = parser.parse_args()
+
+    if args.fake:
+        from fakeredis.aioredis import FakeRedis
+
+        redis_client = FakeRedis(decode_responses=True)
+    else:
+        redis_client = aioredis.Redis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=args.db, decode_responses=True
+        )
+    orders = synthetic_orders(args.orders)
+    for name in ("json", "hash"):
+        await run_codec(redis_client, name, orders)
+    await redis_client.flushdb()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+import fakeredis.aioredis
+
+from src.clients.base_provider import BaseProviderClient
+from src.repositories.order_repository import OrderRepository
+from src.schemas.order import Order
+from src.services.order_service import OrderService
+from src.services.payment_dispatcher import PaymentDispatcher
+
+
+class StubGateway(BaseProviderClient):
+    def __init__(self, name: str, latency: float):
+        super().__init__(None, None, name=name)
+        self.latency = latency
+        self.calls = 0
+
+    async def confirm_payments(self, payments):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [True] * len(payments)
+
+
+def percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+async def create_inline(service: OrderService, provider: str, storage_gb: int) -> Order:
+    order = Order(order_id=uuid4(), provider=provider, storage_gb=storage_gb, status="pending")
+    await service.order_repository.save_order(order)
+    await service.provider_clients[provider].confirm_payments([(order.order_id, uuid4().hex)])
+    return order
+
+
+async def run(service: OrderService, orders: int, concurrency: int, inline: bool):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def create(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            if inline:
+                await create_inline(service, "AB"[i % 2], 100)
+            else:
+                await service.create_order("AB"[i % 2], 100)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(create(i) for i in range(orders)))
+    await service.payments.drain()
+    return time.perf_counter() - started, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Inline vs batched payment confirmation")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub gateway latency (seconds)")
+    parser.add_argument("--window", type=float, default=0.01)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    for mode in ("inline", "batched"):
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True, max_connections=10_000)
+        clients = {name: StubGateway(name, args.latency) for name in ("A", "B")}
+        dispatcher = PaymentDispatcher(redis_client, clients, window=args.window)
+        service = OrderService(OrderRepository(redis_client), clients, payments=dispatcher)
+        elapsed, latencies = await run(service, args.orders, args.concurrency, mode == "inline")
+        calls = sum(client.calls for client in clients.values())
+        print(
+            f"{mode:8} {elapsed * 1000:9.1f} ms total  "
+            f"p50 {percentile(latencies, 0.5) * 1000:7.2f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+            f"gateway calls {calls}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
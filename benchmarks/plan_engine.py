@@ -0,0 +1,82 @@
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from src.clients.catalog_loader import PlanColumns
+from src.core.config import settings
+from src.schemas.pricing_plan import PlanQuery, PricingPlan
+from src.services.plan_table import PlanTable
+
+
+def synthetic_columns(count: int) -> PlanColumns:
+    rng = random.Random(42)
+    columns = PlanColumns()
+    for _ in range(count):
+        columns.append(
+            rng.choice(settings.PROVIDERS),
+            rng.randint(1, 100_000),
+            round(rng.uniform(0.001, 0.05), 5),
+        )
+    return columns
+
+
+def legacy_threshold(plans: List[PricingPlan], min_storage: int) -> List[PricingPlan]:
+    filtered = [plan for plan in plans if plan.storage_gb >= min_storage]
+    return sorted(filtered, key=lambda plan: plan.storage_gb * plan.price_per_gb)
+
+
+def legacy_search(plans: List[PricingPlan], query: PlanQuery) -> List[PricingPlan]:
+    filtered = [
+        plan
+        for plan in plans
+        if plan.storage_gb >= query.min_storage
+        and plan.storage_gb * plan.price_per_gb <= query.max_budget
+        and plan.provider in query.providers
+    ]
+    return sorted(filtered, key=lambda plan: plan.storage_gb * plan.price_per_gb)[: query.limit]
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PlanTable vs list-of-models filtering and ranking")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    query = PlanQuery(min_storage=50_000, max_budget=500, providers=settings.PROVIDERS[:1], limit=100)
+    print(f"{'plans':>10} {'workload':>18} {'models':>12} {'PlanTable':>12} {'speedup':>8}")
+    for size in args.sizes:
+        columns = synthetic_columns(size)
+        plans = list(columns.plans())
+        table = PlanTable.from_columns(columns)
+        position = table.position(50_000)
+        workloads = {
+            "threshold + rank": (
+                lambda: legacy_threshold(plans, 50_000),
+                lambda: table.records(table.cheapest_from(position)),
+            ),
+            "multi-criteria": (
+                lambda: legacy_search(plans, query),
+                lambda: table.plans(table.select(query)),
+            ),
+        }
+        for name, (legacy, vectorized) in workloads.items():
+            legacy_time = best_of(legacy, args.repeat)
+            table_time = best_of(vectorized, args.repeat)
+            print(
+                f"{size:>10} {name:>18} {legacy_time * 1000:>10.2f}ms "
+                f"{table_time * 1000:>10.2f}ms {legacy_time / table_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from benchmarks.plan_engine import synthetic_columns
+from src.core.config import settings
+from src.services.plan_optimizer import PlanOptimizer
+from src.services.plan_table import PlanTable
+
+
+def timed(func) -> tuple:
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/pricing-plans/optimize solver latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--required", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--max-plans", type=int, default=settings.OPTIMIZE_MAX_PLANS)
+    args = parser.parse_args()
+
+    print(f"{'plans':>9} {'required_gb':>12} {'max_plans':>9} {'cold':>10} {'memoised':>10} {'units':>6} {'cost':>12}")
+    for size in args.sizes:
+        table = PlanTable.from_columns(synthetic_columns(size))
+        _, frontier_time = timed(lambda: PlanOptimizer(table).candidates())
+        print(f"{size:>9} catalog frontier: {frontier_time * 1000:.1f} ms (once per catalog version)")
+        for required_gb in args.required:
+            for max_plans in (None, args.max_plans):
+                optimizer = PlanOptimizer(table)
+                optimizer.candidates()
+                result, cold = timed(lambda: optimizer.solve(required_gb, max_plans=max_plans))
+                _, warm = timed(lambda: optimizer.solve(required_gb, max_plans=max_plans))
+                units = result.plan_count if result else "-"
+                cost = f"{result.total_cost:.4f}" if result else "none"
+                print(
+                    f"{size:>9} {required_gb:>12} {str(max_plans):>9} {cold * 1000:>8.1f}ms "
+                    f"{warm * 1e6:>8.1f}us {units:>6} {cost:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
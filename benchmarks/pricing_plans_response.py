@@ -0,0 +1,65 @@
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.core.config import settings
+from src.core.encoded_response import encode_json
+from src.schemas.pricing_plan import PricingPlan
+from src.services.plan_index import PlanIndex, catalog_version
+
+response_adapter = TypeAdapter(List[PricingPlan])
+
+
+def synthetic_plans(count: int) -> List[PricingPlan]:
+    rng = random.Random(42)
+    return [
+        PricingPlan(
+            provider=rng.choice(settings.PROVIDERS),
+            storage_gb=rng.randint(1, 100_000),
+            price_per_gb=round(rng.uniform(0.001, 0.05), 5),
+        )
+        for _ in range(count)
+    ]
+
+
+def legacy_cache_hit(cached: str) -> bytes:
+    plans = [PricingPlan.model_validate_json(plan) for plan in json.loads(cached)]
+    validated = response_adapter.validate_python(jsonable_encoder(plans))
+    return encode_json(jsonable_encoder(validated))
+
+
+def cpu_per_call(func, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="/pricing-plans cache-hit CPU cost")
+    parser.add_argument("--plans", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    plans = synthetic_plans(args.plans)
+    index = PlanIndex(catalog_version(plans), plans)
+    min_storage = 10_000
+    legacy_cached = json.dumps([plan.model_dump_json() for plan in index.query(min_storage)])
+    index.encoded(min_storage)
+
+    legacy = cpu_per_call(lambda: legacy_cache_hit(legacy_cached), args.iterations)
+    fast = cpu_per_call(lambda: index.encoded(min_storage).body, args.iterations)
+    rows = len(index.query(min_storage))
+    print(f"rows per response:            {rows}")
+    print(f"legacy parse + validate:      {legacy * 1e6:12.1f} us/request")
+    print(f"pre-serialized bytes:         {fast * 1e6:12.1f} us/request")
+    print(f"speedup:                      {legacy / max(fast, 1e-9):12.0f}x")
+
+
+if __name__ == "__main__":
+    main()
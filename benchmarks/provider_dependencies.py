@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from src.clients.provider_client import (
+    get_provider_client,
+    get_provider_clients_with_dict,
+    get_provider_clients_with_list,
+    provider_registry,
+)
+from src.core.config import settings
+from src.core.redis_client import get_redis_client
+
+
+def legacy_list(redis_client=Depends(get_redis_client)):
+    return [get_provider_client(f"{p}.json", redis_client) for p in settings.PROVIDERS]
+
+
+def legacy_dict(redis_client=Depends(get_redis_client)):
+    return {p: get_provider_client(f"{p}.json", redis_client) for p in settings.PROVIDERS}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy(plans=Depends(legacy_list), orders=Depends(legacy_dict)):
+        return len(plans) + len(orders)
+
+    @app.get("/registry")
+    async def registry(
+        plans=Depends(get_provider_clients_with_list), orders=Depends(get_provider_clients_with_dict)
+    ):
+        return len(plans) + len(orders)
+
+    app.dependency_overrides[get_redis_client] = lambda: None
+    return app
+
+
+async def per_request(path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for _ in range(100):
+            await http.get(path)
+        started = time.perf_counter()
+        for _ in range(requests):
+            await http.get(path)
+        return (time.perf_counter() - started) / requests
+
+
+def per_call(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Provider dependency resolution overhead per request")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    provider_registry.start(None)
+    legacy_calls = per_call(lambda: (legacy_list(None), legacy_dict(None)), args.iterations)
+    registry_calls = per_call(
+        lambda: (get_provider_clients_with_list(None), get_provider_clients_with_dict(None)),
+        args.iterations,
+    )
+    legacy_request = asyncio.run(per_request("/legacy", args.requests))
+    registry_request = asyncio.run(per_request("/registry", args.requests))
+    print(f"dependency functions   legacy: {legacy_calls * 1e6:8.2f} us   registry: {registry_calls * 1e6:8.2f} us")
+    print(f"full request           legacy: {legacy_request * 1e6:8.2f} us   registry: {registry_request * 1e6:8.2f} us")
+    print(f"saved per request:     {(legacy_request - registry_request) * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
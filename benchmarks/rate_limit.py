@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import logging
+
+import fakeredis.aioredis
+from redis.asyncio import Redis
+
+from benchmarks.report import build_report, timed_async, write_report
+from src.core.config import settings
+from src.core.rate_limit import RateLimitMiddleware, TokenBucketLimiter
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+def request_scope(client: int) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/orders/1",
+        "headers": [(b"x-api-key", f"client-{client}".encode())],
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+async def bench(app, iterations: int, clients: int) -> dict:
+    scopes = [request_scope(i) for i in range(clients)]
+    calls = iter(range(iterations))
+    return await timed_async(lambda: app(scopes[next(calls) % clients], receive, send), iterations)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request overhead of rate limiting and admission control")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--redis-port", type=int, help="Use a real Redis on this port instead of fakeredis")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.redis_port:
+        redis_client = Redis(host=settings.REDIS_HOST, port=args.redis_port, decode_responses=True)
+    else:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    burst = args.iterations
+    load = lambda: 0.0
+    variants = {
+        "no_limiter": endpoint,
+        "redis_check": RateLimitMiddleware(
+            endpoint, TokenBucketLimiter(redis_client, rate=burst, burst=burst, headroom=1.0), load=load
+        ),
+        "local_precheck": RateLimitMiddleware(
+            endpoint, TokenBucketLimiter(redis_client, rate=burst, burst=burst, headroom=0.0), load=load
+        ),
+        "shed_check": RateLimitMiddleware(
+            endpoint, TokenBucketLimiter(redis_client), shed_pool_wait=-1.0, load=load
+        ),
+    }
+    results = {}
+    for name, app in variants.items():
+        await redis_client.flushdb()
+        results[f"rate_limit.{name}"] = await bench(app, args.iterations, args.clients)
+    await redis_client.aclose()
+    write_report(build_report("rate_limit", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import multiprocessing
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+from uuid import uuid4
+
+import redis
+
+from benchmarks.report import build_report, summarize, write_report
+from src.core.redis_client import cluster_client
+from src.repositories.order_repository import OrderRepository
+from src.schemas.order import Order
+
+CLUSTER_SLOTS = 16384
+HOST = "127.0.0.1"
+
+
+def cluster_info(node: redis.Redis) -> Dict[str, str]:
+    info = node.execute_command("CLUSTER INFO")
+    if isinstance(info, dict):
+        return info
+    return dict(line.split(":", 1) for line in info.splitlines() if ":" in line)
+
+
+def wait_until(check, timeout: float, what: str) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if check():
+                return
+        except redis.RedisError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for {what}")
+        time.sleep(0.05)
+
+
+@contextmanager
+def local_cluster(shards: int, replicas: int = 0, base_port: int = 7000, timeout: float = 30.0) -> Iterator[int]:
+    # Starts redis-server nodes with cluster mode on, assigns slots evenly and yields the
+    # seed port; needs only the redis-server binary (no redis-cli)
+    server = shutil.which("redis-server")
+    if server is None:
+        raise RuntimeError("redis-server is required to start a local Redis Cluster")
+    ports = list(range(base_port, base_port + shards * (1 + replicas)))
+    with tempfile.TemporaryDirectory() as directory:
+        processes = [
+            subprocess.Popen(
+                [
+                    server, "--port", str(port), "--bind", HOST, "--dir", directory,
+                    "--cluster-enabled", "yes", "--cluster-config-file", f"nodes-{port}.conf",
+                    "--save", "", "--appendonly", "no",
+                ],
+                stdout=subprocess.DEVNULL,
+            )
+            for port in ports
+        ]
+        nodes = [redis.Redis(host=HOST, port=port, decode_responses=True) for port in ports]
+        try:
+            for node in nodes:
+                wait_until(node.ping, timeout, f"node {node.connection_pool.connection_kwargs['port']}")
+            for i, node in enumerate(nodes[:shards]):
+                node.execute_command(
+                    "CLUSTER ADDSLOTSRANGE", i * CLUSTER_SLOTS // shards, (i + 1) * CLUSTER_SLOTS // shards - 1
+                )
+            for port in ports[1:]:
+                nodes[0].execute_command("CLUSTER MEET", HOST, port)
+            wait_until(
+                lambda: all(int(cluster_info(node)["cluster_known_nodes"]) == len(ports) for node in nodes),
+                timeout, "nodes to meet",
+            )
+            primary_ids = [node.execute_command("CLUSTER MYID") for node in nodes[:shards]]
+            for i, node in enumerate(nodes[shards:]):
+                node.execute_command("CLUSTER REPLICATE", primary_ids[i % shards])
+            wait_until(
+                lambda: all(cluster_info(node)["cluster_state"] == "ok" for node in nodes)
+                and all(node.info("replication").get("master_link_status") == "up" for node in nodes[shards:]),
+                timeout, "cluster to converge",
+            )
+            yield base_port
+        finally:
+            for node in nodes:
+                node.close()
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+async def order_workload(port: int, operations: int, concurrency: int, batch: int) -> Dict[str, List[float]]:
+    client = cluster_client(HOST, port)
+    repository = OrderRepository(client)
+    latencies: Dict[str, List[float]] = {"orders.save": [], "orders.get": []}
+    order_ids: List[str] = []
+
+    async def save() -> None:
+        orders = [
+            Order.trusted(uuid4(), "AB"[i % 2], 10 + i, "pending") for i in range(batch)
+        ]
+        started = time.perf_counter()
+        await repository.save_orders(orders)
+        latencies["orders.save"].append(time.perf_counter() - started)
+        order_ids.extend(str(order.order_id) for order in orders)
+
+    async def get(i: int) -> None:
+        ids = [order_ids[(i * batch + j) % len(order_ids)] for j in range(batch)]
+        started = time.perf_counter()
+        await repository.get_orders(ids, trusted=True)
+        latencies["orders.get"].append(time.perf_counter() - started)
+
+    async def run(step) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                await step(i)
+
+        await asyncio.gather(*(one(i) for i in range(operations)))
+
+    try:
+        await run(lambda i: save())
+        await run(get)
+    finally:
+        await client.aclose()
+    return latencies
+
+
+def client_process(port: int, operations: int, concurrency: int, batch: int, results) -> None:
+    results.put(asyncio.run(order_workload(port, operations, concurrency, batch)))
+
+
+def measure(port: int, clients: int, operations: int, concurrency: int, batch: int) -> Dict[str, Dict[str, Any]]:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=client_process, args=(port, operations, concurrency, batch, results))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return {
+        name: summarize(
+            [latency for latencies in collected for latency in latencies[name]],
+            # Each phase takes roughly half the run; throughput is keys per second
+            elapsed / 2,
+            keys=clients * operations * batch,
+            keys_per_second=clients * operations * batch / (elapsed / 2),
+        )
+        for name in ("orders.save", "orders.get")
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order storage throughput across Redis Cluster shard counts")
+    parser.add_argument("--shards", default="1,2,4", help="Comma separated shard counts to compare")
+    parser.add_argument("--replicas", type=int, default=0, help="Replicas per shard")
+    parser.add_argument("--clients", type=int, default=4, help="Client processes driving the cluster")
+    parser.add_argument("--operations", type=int, default=2000, help="Pipelines per phase and client")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=10, help="Orders per pipeline")
+    parser.add_argument("--base-port", type=int, default=7000)
+    parser.add_argument("--output", help="Write a JSON report to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for shards in (int(value) for value in args.shards.split(",")):
+        with local_cluster(shards, args.replicas, args.base_port) as port:
+            for name, result in measure(port, args.clients, args.operations, args.concurrency, args.batch).items():
+                results[f"{name}.shards_{shards}"] = result
+    write_report(build_report("redis_cluster", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "rss_mb")
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    position = q * (len(sorted_samples) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    weight = position - lower
+    return sorted_samples[lower] * (1 - weight) + sorted_samples[upper] * weight
+
+
+def child_pids(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+    return children + [grandchild for child in children for grandchild in child_pids(child)]
+
+
+def rss_mb(pid: int | None = None) -> float:
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / 2**20
+    except OSError:
+        if pid is not None:
+            return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def pss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def tree_rss_mb(pid: int) -> float:
+    return rss_mb(pid) + sum(rss_mb(child) for child in child_pids(pid))
+
+
+def summarize(
+    latencies: List[float], elapsed: float, errors: int = 0, rss_pid: int | None = None, **extra: Any
+) -> Dict[str, Any]:
+    samples = sorted(latencies)
+    count = len(samples)
+    return {
+        "count": count,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": count / elapsed if elapsed else 0.0,
+        "mean_ms": sum(samples) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": samples[-1] * 1000 if count else 0.0,
+        "rss_mb": tree_rss_mb(rss_pid) if rss_pid is not None else rss_mb(),
+        **extra,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(suite: str, results: Dict[str, Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def write_report(report: Dict[str, Any], output: str | None) -> None:
+    text = json.dumps(report, indent=2)
+    if not output:
+        print(text)
+        return
+    Path(output).write_text(text + "\n")
+    print_table(report["results"])
+    print(f"report written to {output}")
+
+
+def print_table(results: Dict[str, Dict[str, Any]]) -> None:
+    width = max((len(name) for name in results), default=9)
+    print(f"{'benchmark':{width}} {'count':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MiB':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:{width}} {result['count']:8d} {result['throughput']:10.1f} {result['p50_ms']:9.3f} "
+            f"{result['p95_ms']:9.3f} {result['p99_ms']:9.3f} {result['rss_mb']:8.1f}"
+        )
+
+
+def timed(fn, iterations: int) -> Dict[str, Any]:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def timed_async(fn, iterations: int) -> Dict[str, Any]:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for metric in LOWER_IS_BETTER:
+            before, after = previous.get(metric), result.get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {before:.3f} -> {after:.3f} (+{after / before - 1:.0%})")
+        for metric in HIGHER_IS_BETTER:
+            before, after = previous.get(metric), result.get(metric)
+            if before and after is not None and after < before * (1 - threshold):
+                regressions.append(f"{name}.{metric}: {before:.1f} -> {after:.1f} ({after / before - 1:.0%})")
+    return regressions
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.load import run_scenario, start_fake_server, wait_ready
+from benchmarks.report import build_report, write_report
+from src.core.config import settings
+from src.server import default_workers
+
+
+def commands(port: int, workers: int) -> dict:
+    host = ["--host", "127.0.0.1", "--port", str(port)]
+    return {
+        "uvicorn": [sys.executable, "-m", "uvicorn", "main:app", *host],
+        "server": [sys.executable, "-m", "src.server", *host, "--workers", str(workers)],
+    }
+
+
+async def measure(name: str, command: list, args: argparse.Namespace) -> dict:
+    env = {
+        **os.environ,
+        "REDIS_PORT": str(args.redis_port),
+        "CATALOG_WATCH": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    rng = random.Random(args.seed)
+    thresholds = [rng.randint(0, 2500) for _ in range(args.requests)]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    started = time.perf_counter()
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30.0
+        ) as client:
+            await wait_ready(client, server, poll_interval=0.01)
+            startup = time.perf_counter() - started
+
+            async def plan_query(client: httpx.AsyncClient, i: int) -> httpx.Response:
+                return await client.get("/pricing-plans", params={"min_storage": thresholds[i]})
+
+            async def create_order(client: httpx.AsyncClient, i: int) -> httpx.Response:
+                return await client.post("/orders", json={"provider": "AB"[i % 2], "storage_gb": 1 + i})
+
+            results = {}
+            for scenario, request in (("plan_queries", plan_query), ("order_burst", create_order)):
+                results[f"{name}.{scenario}"] = await run_scenario(
+                    client, request, args.requests, args.concurrency, server.pid, startup_seconds=startup
+                )
+            return results
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time and throughput: uvicorn main:app vs python -m src.server")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--redis-port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--fake", action="store_true", help="Serve Redis from an in-process fakeredis server")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.fake:
+        start_fake_server(args.redis_port)
+    results = {}
+    for name, command in commands(args.port, args.workers).items():
+        results.update(await measure(name, command, args))
+    write_report(build_report("server_startup", results, vars(args)), args.output)
+    for name in commands(args.port, args.workers):
+        print(f"{name:8} startup {results[f'{name}.plan_queries']['startup_seconds']:6.2f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
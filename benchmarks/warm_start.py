@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from redis.asyncio import Redis
+
+from benchmarks.load import start_fake_server, start_server
+from benchmarks.report import build_report, child_pids, pss_mb, rss_mb, summarize, write_report
+from src.core.config import settings
+
+
+def write_catalogs(directory: Path, rows: int, rng: random.Random) -> None:
+    for provider in settings.PROVIDERS:
+        plans = [
+            {"provider": provider, "storage_gb": rng.randint(1, 100_000), "price_per_gb": round(rng.uniform(0.001, 0.05), 5)}
+            for _ in range(rows)
+        ]
+        (directory / f"{provider.lower()}.json").write_text(json.dumps(plans))
+
+
+def worker_pids(pid: int) -> List[int]:
+    workers = []
+    for child in child_pids(pid):
+        try:
+            with open(f"/proc/{child}/cmdline", "rb") as f:
+                if b"spawn_main" in f.read():
+                    workers.append(child)
+        except OSError:
+            pass
+    return workers or [pid]
+
+
+async def first_request(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get("/pricing-plans", params={"min_storage": 0})).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.01)
+    raise RuntimeError("Server did not answer in time")
+
+
+async def run_mode(args, env: Dict[str, str], redis_client: Redis) -> dict:
+    samples: List[float] = []
+    rss: List[float] = []
+    pss: List[float] = []
+    for _ in range(args.runs):
+        await redis_client.flushdb()
+        server = start_server(args.port, args.redis_port, args.workers, env)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0) as client:
+                samples.append(await first_request(client, server, args.timeout))
+                await asyncio.sleep(args.settle)
+                workers = worker_pids(server.pid)
+                rss.append(sum(rss_mb(pid) for pid in workers) / len(workers))
+                pss.append(sum(pss_mb(pid) for pid in workers) / len(workers))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    result = summarize(samples, sum(samples))
+    result["rss_mb"] = sum(rss) / len(rss)
+    result["worker_pss_mb"] = sum(pss) / len(pss)
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-to-first-request and worker memory with and without a catalog snapshot")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic plans per provider (0 uses src/clients)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--redis-port", type=int, default=settings.REDIS_PORT)
+    parser.add_argument("--fake", action="store_true", help="Serve Redis from an in-process fakeredis server")
+    parser.add_argument("--settle", type=float, default=2.0, help="Wait before sampling worker memory (seconds)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.fake:
+        start_fake_server(args.redis_port)
+    redis_client = Redis(host=settings.REDIS_HOST, port=args.redis_port)
+    with tempfile.TemporaryDirectory() as directory:
+        env = {"CATALOG_DIR": ""}
+        if args.rows:
+            write_catalogs(Path(directory), args.rows, random.Random(args.seed))
+            env["CATALOG_DIR"] = directory
+        snapshot_path = os.path.join(directory, "catalog.snapshot")
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "src.snapshot", "--output", snapshot_path],
+            env={**os.environ, **env, "LOG_LEVEL": "WARNING"},
+            check=True,
+        )
+        build_seconds = time.perf_counter() - started
+
+        results = {
+            "warm_start.files": await run_mode(args, {**env, "CATALOG_SNAPSHOT_PATH": ""}, redis_client),
+            "warm_start.snapshot": await run_mode(args, {**env, "CATALOG_SNAPSHOT_PATH": snapshot_path}, redis_client),
+        }
+        results["warm_start.snapshot"]["build_seconds"] = build_seconds
+        results["warm_start.snapshot"]["snapshot_mb"] = os.path.getsize(snapshot_path) / 2**20
+    await redis_client.aclose()
+    write_report(build_report("warm_start", results, vars(args)), args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
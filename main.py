@@ -1,38 +1,81 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.clients.provider_client import provider_registry
 from src.core.config import settings
-from src.core.redis_client import get_redis_client
-from src.routers import orders, pricing_plans
+from src.core.encoded_response import FastJSONResponse
+from src.core.instrumentation import TimingMiddleware
+from src.core.local_cache import invalidation_listener
+from src.core.log_config import configure_logging
+from src.core.rate_limit import RateLimitMiddleware
+from src.core.redis_client import RedisUnavailableError, redis_manager
+from src.routers import health, metrics, orders, pricing_plans
+from src.services.catalog_manager import catalog_manager
+from src.services.order_events import order_events
+from src.services.payment_dispatcher import payment_dispatcher
 
-app = FastAPI(
-    title="Cloud Storage Marketplace API",
-    description="API for aggregating cloud storage pricing plans and managing orders from multiple providers.",
-    version="0.1.0",
-    docs_url=settings.DOCS_URL,
-    redoc_url=settings.REDOC_URL,
-)
+configure_logging()
 
 
-@app.on_event("startup")
-async def startup_event():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     try:
-        redis_client = get_redis_client()
-        redis_client.ping()
+        redis_client = await redis_manager.connect()
+        invalidation_listener.start(redis_client)
+        order_events.start(redis_client)
         print("Connected to Redis successfully")
+        provider_registry.start(redis_client)
+        payment_dispatcher.start(redis_client, provider_registry.mapping())
+        await catalog_manager.start(redis_client)
+        print(f"Loaded provider catalog {catalog_manager.version}")
     except Exception as e:
         print(f"Failed to connect to Redis: {str(e)}")
         raise
-
-
-@app.on_event("shutdown")
-async def disconnect_from_redis():
+    yield
     try:
-        redis_client = get_redis_client()
-        redis_client.close()
+        await catalog_manager.stop()
+        try:
+            await asyncio.wait_for(
+                payment_dispatcher.stop(), settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            print("Timed out draining payments, the completion worker will retry them")
+        await provider_registry.close()
+        await invalidation_listener.stop()
+        await order_events.stop()
+        await redis_manager.close()
         print("Disconnected from Redis")
     except Exception as e:
         print(f"Failed to disconnect from Redis: {str(e)}")
 
 
+app = FastAPI(
+    title="Cloud Storage Marketplace API",
+    description="API for aggregating cloud storage pricing plans and managing orders from multiple providers.",
+    version="0.1.0",
+    docs_url=settings.DOCS_URL,
+    redoc_url=settings.REDOC_URL,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
+
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(TimingMiddleware)
+
+
+@app.exception_handler(RedisUnavailableError)
+async def redis_unavailable_handler(request: Request, exc: RedisUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(settings.REDIS_CIRCUIT_RESET_TIMEOUT))},
+    )
+
+
 app.include_router(pricing_plans.router)
 app.include_router(orders.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
@@ -1,37 +1,125 @@
+import asyncio
 import json
+import logging
 from pathlib import Path
-from typing import List
-from uuid import UUID
+from typing import List, Sequence, Tuple
+from uuid import UUID, uuid4
 
-from redis import Redis
+from redis.asyncio import Redis
 
+from src.clients.catalog_loader import PlanColumns, load_plan_columns
+from src.core.config import settings
+from src.core.local_cache import MISSING, plan_cache, publish_invalidation
+from src.core.metrics import cache_lookups, metrics
+from src.core.redis_client import read_client
+from src.core.single_flight import SingleFlight, jittered_ttl
 from src.schemas.pricing_plan import PricingPlan
 
+logger = logging.getLogger(__name__)
+
+provider_flight = SingleFlight("provider_plans")
+provider_cache_hits, provider_cache_misses = cache_lookups("provider_plans")
+
+
+def catalog_path(file_name: str) -> Path:
+    if settings.CATALOG_DIR:
+        return Path(settings.CATALOG_DIR) / file_name
+    return Path(__file__).parent.parent / "clients" / file_name
+
 
 class BaseProviderClient:
-    def __init__(self, file_name: str, redis_client: Redis):
-        self.file_path = Path(__file__).parent.parent / "clients" / file_name
+    def __init__(self, file_name: str | None, redis_client: Redis, name: str | None = None):
+        self.file_path = catalog_path(file_name) if file_name else None
+        self.name = name or Path(file_name).stem.upper()
         self.redis_client = redis_client
-        self.cache_key = f"provider_plans:{file_name}"
+        self.cache_key = f"provider_plans:{{{file_name or self.name.lower()}}}"
+        self.catalog_loads = metrics.counter(
+            "provider_catalog_loads_total", "Provider catalog loads from source", {"provider": self.name}
+        )
+
+    async def get_pricing_plans(self) -> List[PricingPlan]:
+        return list((await self.get_plan_columns()).plans())
+
+    async def get_plan_columns(self) -> PlanColumns:
+        columns = plan_cache.get(self.cache_key)
+        if columns is not MISSING:
+            return columns
+
+        columns = await self._get_cached_columns()
+        if columns is not None:
+            provider_cache_hits.inc()
+            plan_cache.set(self.cache_key, columns)
+            return columns
+        provider_cache_misses.inc()
+
+        return await provider_flight.do(self.cache_key, self._load_and_cache)
 
-    def get_pricing_plans(self) -> List[PricingPlan]:
-        cached = self.redis_client.get(self.cache_key)
-        if cached:
-            return [PricingPlan(**plan) for plan in json.loads(cached)]
+    async def _get_cached_columns(self) -> PlanColumns | None:
+        reader = read_client(self.redis_client)
+        cached = await reader.get(self.cache_key)
+        if not cached:
+            return None
+        meta = json.loads(cached)
+        if isinstance(meta, list):
+            return PlanColumns.from_records(meta)
+        pipeline = reader.pipeline(transaction=False)
+        for i in range(meta["chunks"]):
+            pipeline.get(self.chunk_key(meta["generation"], i))
+        chunks = await pipeline.execute()
+        if any(chunk is None for chunk in chunks):
+            return None
+        return PlanColumns.from_chunks(chunks)
 
+    def chunk_key(self, generation: str, i: int) -> str:
+        return f"{self.cache_key}:{generation}:{i}"
+
+    def stage_columns(self, pipeline, columns: PlanColumns) -> int:
+        ttl = jittered_ttl(settings.REDIS_CACHE_TIMEOUT, settings.CACHE_TTL_JITTER)
+        generation = uuid4().hex[:12]
+        chunk_count = 0
+        for i, chunk in enumerate(columns.chunks(settings.PROVIDER_CACHE_CHUNK_SIZE)):
+            pipeline.setex(self.chunk_key(generation, i), ttl, chunk)
+            chunk_count += 1
+        meta = {"generation": generation, "chunks": chunk_count, "rows": len(columns)}
+        pipeline.setex(self.cache_key, ttl, json.dumps(meta))
+        return chunk_count
+
+    async def fetch_plan_columns(self) -> PlanColumns:
+        return await asyncio.to_thread(self.load_plan_columns)
+
+    async def _load_and_cache(self) -> PlanColumns:
+        columns = await self.fetch_plan_columns()
+        self.catalog_loads.inc()
+        pipeline = self.redis_client.pipeline()
+        chunk_count = self.stage_columns(pipeline, columns)
+        await pipeline.execute()
+        await publish_invalidation(self.redis_client, self.cache_key)
+        plan_cache.set(self.cache_key, columns)
+        logger.info(f"Loaded {len(columns)} plans for provider {self.name} in {chunk_count} chunks")
+        return columns
+
+    def load_plan_columns(self) -> PlanColumns:
+        if self.file_path is None:
+            raise ValueError(f"Provider {self.name} has no catalog file")
         try:
-            with open(self.file_path, "r") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return load_plan_columns(self.file_path)
+        except (OSError, ValueError) as e:
             raise ValueError(
                 f"Failed to load provider plans from {self.file_path}: {str(e)}"
             )
 
-        plans = [PricingPlan(**plan) for plan in data]
-        self.redis_client.setex(
-            self.cache_key, 3600, json.dumps([plan.dict() for plan in plans])
-        )
-        return plans
+    def load_plans(self) -> List[PricingPlan]:
+        return list(self.load_plan_columns().plans())
 
-    def confirm_payment(self, order_id: UUID) -> bool:
+    async def confirm_payment(self, order_id: UUID, idempotency_key: str) -> bool:
         return True
+
+    async def confirm_payments(self, payments: Sequence[Tuple[UUID, str]]) -> List[bool]:
+        return list(
+            await asyncio.gather(
+                *(self.confirm_payment(order_id, key) for order_id, key in payments)
+            )
+        )
+
+    async def close(self) -> None:
+        pass
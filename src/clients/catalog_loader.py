@@ -0,0 +1,202 @@
+import hashlib
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from src.core.config import PROVIDER_SET, settings
+from src.schemas.pricing_plan import PlanRecord, PricingPlan
+
+
+class PlanColumns:
+    def __init__(
+        self,
+        providers: Sequence[str] = (),
+        provider_ids: array | None = None,
+        storage_gb: array | None = None,
+        price_per_gb: array | None = None,
+    ):
+        self.providers: List[str] = list(providers)
+        self._provider_index = {name: i for i, name in enumerate(self.providers)}
+        self.provider_ids = provider_ids if provider_ids is not None else array("H")
+        self.storage_gb = storage_gb if storage_gb is not None else array("q")
+        self.price_per_gb = price_per_gb if price_per_gb is not None else array("d")
+
+    def __len__(self) -> int:
+        return len(self.storage_gb)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.provider_ids, self.storage_gb, self.price_per_gb)
+        )
+
+    def provider_id(self, provider: str) -> int:
+        provider_id = self._provider_index.get(provider)
+        if provider_id is None:
+            provider_id = len(self.providers)
+            self.providers.append(provider)
+            self._provider_index[provider] = provider_id
+        return provider_id
+
+    def append(self, provider: str, storage_gb: int, price_per_gb: float) -> None:
+        self.provider_ids.append(self.provider_id(provider))
+        self.storage_gb.append(storage_gb)
+        self.price_per_gb.append(price_per_gb)
+
+    def append_record(self, record: Dict[str, Any]) -> None:
+        provider = record.get("provider")
+        if provider not in PROVIDER_SET:
+            raise ValueError(f"Provider must be one of {settings.PROVIDERS}")
+        storage_gb = record.get("storage_gb")
+        if isinstance(storage_gb, bool) or not isinstance(storage_gb, int) or storage_gb <= 0:
+            raise ValueError("Storage GB must be positive")
+        price_per_gb = record.get("price_per_gb")
+        if isinstance(price_per_gb, bool) or not isinstance(price_per_gb, (int, float)) or price_per_gb <= 0:
+            raise ValueError("Price per GB must be positive")
+        self.append(provider, storage_gb, float(price_per_gb))
+
+    def extend(self, other: "PlanColumns") -> None:
+        remap = [self.provider_id(name) for name in other.providers]
+        self.provider_ids.extend(remap[i] for i in other.provider_ids)
+        self.storage_gb.extend(other.storage_gb)
+        self.price_per_gb.extend(other.price_per_gb)
+
+    def plan(self, i: int) -> PricingPlan:
+        return PricingPlan.trusted(
+            self.providers[self.provider_ids[i]], self.storage_gb[i], self.price_per_gb[i]
+        )
+
+    def plans(self) -> Iterator[PricingPlan]:
+        for i in range(len(self)):
+            yield self.plan(i)
+
+    def to_dict(self, start: int = 0, stop: int | None = None) -> Dict[str, Any]:
+        return {
+            "providers": self.providers,
+            "ids": self.provider_ids[start:stop].tolist(),
+            "g": self.storage_gb[start:stop].tolist(),
+            "p": self.price_per_gb[start:stop].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanColumns":
+        return cls(
+            data["providers"],
+            array("H", data["ids"]),
+            array("q", data["g"]),
+            array("d", data["p"]),
+        )
+
+    def to_chunk(self, start: int, stop: int) -> str:
+        return json.dumps(self.to_dict(start, stop), separators=(",", ":"))
+
+    def chunks(self, size: int) -> Iterator[str]:
+        for start in range(0, len(self), size):
+            yield self.to_chunk(start, start + size)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[str]) -> "PlanColumns":
+        return cls.concat(cls.from_dict(json.loads(chunk)) for chunk in chunks)
+
+    @classmethod
+    def from_plans(cls, plans: Iterable[PricingPlan | PlanRecord]) -> "PlanColumns":
+        columns = cls()
+        for plan in plans:
+            columns.append(plan.provider, plan.storage_gb, plan.price_per_gb)
+        return columns
+
+    @classmethod
+    def concat(cls, parts: Iterable["PlanColumns"]) -> "PlanColumns":
+        columns = cls()
+        for part in parts:
+            columns.extend(part)
+        return columns
+
+    def digest(self) -> str:
+        digest = hashlib.sha1(json.dumps(self.providers).encode())
+        for column in (self.provider_ids, self.storage_gb, self.price_per_gb):
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "PlanColumns":
+        columns = cls()
+        for row, record in enumerate(records):
+            try:
+                columns.append_record(record)
+            except (AttributeError, ValueError) as e:
+                raise ValueError(f"Invalid plan at row {row}: {str(e)}")
+        return columns
+
+
+def iter_json_lines(file) -> Iterator[Dict[str, Any]]:
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_array(file, buffer_size: int) -> Iterator[Dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def peek() -> str:
+        # Next non-whitespace character, reading more input as needed; "" at end of file
+        nonlocal buffer, position, eof
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position:position + 1]
+            buffer, position = file.read(buffer_size), 0
+            eof = not buffer
+
+    if peek() != "[":
+        raise ValueError("Expected a JSON array of plans")
+    position += 1
+    separator = "]" if peek() == "]" else ","
+    if separator == "]":
+        position += 1
+    while separator == ",":
+        if not peek():
+            raise ValueError("Unexpected end of catalog file")
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                record, end = None, len(buffer)
+            if end < len(buffer) or eof:
+                break
+            chunk = file.read(buffer_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+        yield record
+        position = end
+        separator = peek()
+        position += 1
+        if separator not in (",", "]"):
+            raise ValueError(f"Expected ',' or ']' after plan, got {separator or 'end of file'!r}")
+    if peek():
+        raise ValueError("Unexpected data after the plan array")
+
+
+def iter_catalog_records(
+    path: Path, buffer_size: int = settings.CATALOG_READ_BUFFER_SIZE
+) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", buffering=buffer_size) as f:
+        if path.suffix == ".jsonl":
+            yield from iter_json_lines(f)
+        else:
+            yield from iter_json_array(f, buffer_size)
+
+
+def load_plan_columns(
+    path: Path, buffer_size: int = settings.CATALOG_READ_BUFFER_SIZE
+) -> PlanColumns:
+    return PlanColumns.from_records(iter_catalog_records(path, buffer_size))
@@ -1,12 +1,16 @@
-from pathlib import Path
+import logging
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 
 from fastapi import Depends
-from redis import Redis
+from redis.asyncio import Redis
 
 from src.core.config import settings
 from src.core.redis_client import get_redis_client
 
-from .base_provider import BaseProviderClient
+from .base_provider import BaseProviderClient, catalog_path
+
+logger = logging.getLogger(__name__)
 
 
 class ProviderClient(BaseProviderClient):
@@ -19,17 +23,63 @@ def get_provider_client(
     provider_name: str, redis_client: Redis = Depends(get_redis_client)
 ):
     provider_name_clean = provider_name.replace(".json", "")
-    file_path = Path(__file__).parent / f"{provider_name_clean.lower()}.json"
+    file_path = catalog_path(f"{provider_name_clean.lower()}.json")
     if not file_path.exists():
         raise FileNotFoundError(f"Provider config file not found: {file_path}")
     return ProviderClient(provider_name_clean, redis_client)
 
 
-def get_provider_clients_with_list(redis_client: Redis = Depends(get_redis_client)):
-    return [get_provider_client(f"{p}.json", redis_client) for p in settings.PROVIDERS]
+class ProviderRegistry:
+    def __init__(self):
+        self._clients: Dict[str, BaseProviderClient] = {}
+        self._mapping: Mapping[str, BaseProviderClient] = MappingProxyType(self._clients)
+        self._ordered: Tuple[BaseProviderClient, ...] = ()
+
+    def register(self, client: BaseProviderClient) -> BaseProviderClient:
+        if client.name in self._clients:
+            logger.info(f"Replacing registered provider client {client.name}")
+        self._clients[client.name] = client
+        self._ordered = tuple(self._clients.values())
+        return client
+
+    def start(self, redis_client: Redis) -> None:
+        for provider in settings.PROVIDERS:
+            if provider not in self._clients:
+                self.register(get_provider_client(f"{provider}.json", redis_client))
+        logger.info(f"Provider registry ready with {list(self._clients)}")
+
+    async def close(self) -> None:
+        for client in self._ordered:
+            await client.close()
+        self._clients.clear()
+        self._ordered = ()
+
+    def get(self, name: str) -> BaseProviderClient:
+        client = self._clients.get(name)
+        if client is None:
+            raise ValueError(f"Provider {name} is not registered")
+        return client
+
+    def clients(self) -> Tuple[BaseProviderClient, ...]:
+        return self._ordered
+
+    def mapping(self) -> Mapping[str, BaseProviderClient]:
+        return self._mapping
+
+    def file_clients(self) -> Tuple[BaseProviderClient, ...]:
+        return tuple(client for client in self._ordered if client.file_path is not None)
+
+
+provider_registry = ProviderRegistry()
+
+
+def get_provider_clients_with_list(
+    redis_client: Redis = Depends(get_redis_client),
+) -> Tuple[BaseProviderClient, ...]:
+    return provider_registry.clients()
 
 
-def get_provider_clients_with_dict(redis_client: Redis = Depends(get_redis_client)):
-    return {
-        p: get_provider_client(f"{p}.json", redis_client) for p in settings.PROVIDERS
-    }
+def get_provider_clients_with_dict(
+    redis_client: Redis = Depends(get_redis_client),
+) -> Mapping[str, BaseProviderClient]:
+    return provider_registry.mapping()
@@ -0,0 +1,52 @@
+from typing import List, Sequence, Tuple
+from uuid import UUID
+
+import httpx
+from redis.asyncio import Redis
+
+from src.clients.base_provider import BaseProviderClient
+from src.clients.catalog_loader import PlanColumns
+from src.core.config import settings
+
+
+class RemoteProviderClient(BaseProviderClient):
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        redis_client: Redis,
+        plans_path: str = "/plans",
+        payments_path: str = "/payments/confirm",
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        super().__init__(None, redis_client, name=name)
+        self.plans_path = plans_path
+        self.payments_path = payments_path
+        self.http_client = http_client or httpx.AsyncClient(
+            base_url=base_url,
+            timeout=settings.PROVIDER_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS),
+        )
+
+    async def fetch_plan_columns(self) -> PlanColumns:
+        response = await self.http_client.get(self.plans_path)
+        response.raise_for_status()
+        return PlanColumns.from_records(response.json())
+
+    async def confirm_payment(self, order_id: UUID, idempotency_key: str) -> bool:
+        return (await self.confirm_payments([(order_id, idempotency_key)]))[0]
+
+    async def confirm_payments(self, payments: Sequence[Tuple[UUID, str]]) -> List[bool]:
+        response = await self.http_client.post(
+            self.payments_path,
+            json={
+                "payments": [
+                    {"order_id": str(order_id), "idempotency_key": key} for order_id, key in payments
+                ]
+            },
+        )
+        response.raise_for_status()
+        return [bool(confirmed) for confirmed in response.json()["confirmed"]]
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
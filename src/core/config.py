@@ -1,15 +1,17 @@
-from typing import List
+from typing import List, Literal
 
-from pydantic import Field, validator
-from pydantic_settings import BaseSettings
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+
     REDIS_HOST: str = Field(
-        default="localhost", env="REDIS_HOST", description="Redis server host"
+        default="localhost", description="Redis server host"
     )
     REDIS_PORT: int = Field(
-        default=6379, env="REDIS_PORT", ge=1, description="Redis server port"
+        default=6379, ge=1, description="Redis server port"
     )
     REDIS_DECODE_RESPONSES: bool = Field(
         default=True, description="Decode Redis responses as strings"
@@ -27,16 +29,208 @@ class Settings(BaseSettings):
         default=10, ge=1, description="Max Redis connections"
     )
     REDIS_SSL: bool = Field(default=False, description="Use SSL for Redis connection")
+    REDIS_CLUSTER: bool = Field(
+        default=False, description="Treat REDIS_HOST:REDIS_PORT as a seed node of a Redis Cluster"
+    )
+    REDIS_REPLICAS: List[str] = Field(
+        default=[], description="host:port of read replicas of a standalone primary"
+    )
+    REDIS_READ_FROM_REPLICAS: bool = Field(
+        default=True, description="Serve cache and order listing reads from replicas when available"
+    )
+    REDIS_MIGRATE_LEGACY_KEYS: bool = Field(
+        default=True,
+        description="Move orders stored under pre-hash-tag key names on first read, for ORDER_CACHE_TIMEOUT after the upgrade",
+    )
     REDIS_RETRY_ATTEMPTS: int = Field(
         default=3, ge=1, description="Number of Redis connection retry attempts"
     )
     REDIS_RETRY_DELAY: float = Field(
         default=1.0, ge=0, description="Delay between Redis retries (seconds)"
     )
+    REDIS_RETRY_BACKOFF_MAX: float = Field(
+        default=10.0, ge=0, description="Upper bound for Redis retry backoff (seconds)"
+    )
+    REDIS_POOL_TIMEOUT: float = Field(
+        default=5.0, gt=0, description="Max wait for a pooled Redis connection (seconds)"
+    )
+    REDIS_HEALTH_CHECK_INTERVAL: float = Field(
+        default=5.0, gt=0, description="Interval between background Redis pings (seconds)"
+    )
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = Field(
+        default=3, ge=1, description="Failed health checks before the Redis circuit opens"
+    )
+    REDIS_CIRCUIT_RESET_TIMEOUT: float = Field(
+        default=30.0, gt=0, description="Time before an open Redis circuit is retried (seconds)"
+    )
+    ORDER_COMPLETION_DELAY: float = Field(
+        default=30.0, ge=0, description="Delay before a pending order is completed (seconds)"
+    )
+    ORDER_COMPLETION_BATCH_SIZE: int = Field(
+        default=500, ge=1, description="Max orders claimed by a completion worker at once"
+    )
+    ORDER_COMPLETION_POLL_INTERVAL: float = Field(
+        default=0.5, gt=0, description="Completion worker idle poll interval (seconds)"
+    )
+    ORDER_COMPLETION_LEASE: float = Field(
+        default=60.0, gt=0, description="Time before an unacknowledged claim is retried (seconds)"
+    )
+    ORDER_COMPLETION_RETRY_DELAY: float = Field(
+        default=5.0, ge=0, description="Delay before a failed completion is retried (seconds)"
+    )
+    ORDER_COMPLETION_MAX_ATTEMPTS: int = Field(
+        default=5, ge=1, description="Completion attempts before an order is dead-lettered"
+    )
+    ORDER_CODEC: Literal["hash", "json"] = Field(
+        default="hash", description="Order storage format: compact Redis hash or JSON string"
+    )
+    ORDER_BATCH_MAX_SIZE: int = Field(
+        default=500, ge=1, description="Max orders accepted by POST /orders/batch"
+    )
+    ORDER_LOOKUP_MAX_IDS: int = Field(
+        default=50000, ge=1, description="Max identifiers accepted by POST /orders/lookup"
+    )
+    ORDER_PAGE_MAX_SIZE: int = Field(
+        default=1000, ge=1, description="Max orders returned by one GET /orders page"
+    )
+    ORDER_EVENTS_CHANNEL: str = Field(
+        default="order_events", description="Redis pub/sub channel for order status transitions"
+    )
+    ORDER_EVENTS_HEARTBEAT: float = Field(
+        default=15.0, gt=0, description="Keep-alive interval on idle order event streams (seconds)"
+    )
+    PROVIDER_TIMEOUT: float = Field(
+        default=2.0, gt=0, description="Max time to fetch one provider catalog (seconds)"
+    )
+    PROVIDER_HEDGE_DELAY: float = Field(
+        default=0.5, gt=0, description="Delay before a hedged second catalog request (seconds)"
+    )
+    PROVIDER_HTTP_MAX_CONNECTIONS: int = Field(
+        default=20, ge=1, description="Pooled HTTP connections per remote provider client"
+    )
+    PARTIAL_CATALOG_TTL: int = Field(
+        default=30, ge=1, description="Cache timeout for catalogs missing a provider (seconds)"
+    )
+    CACHE_STALE_TTL: int = Field(
+        default=300, ge=0, description="How long expired plans may be served while refreshing (seconds)"
+    )
+    CACHE_TTL_JITTER: float = Field(
+        default=0.1, ge=0, lt=1, description="Relative random jitter applied to plan cache TTLs"
+    )
+    CACHE_EARLY_EXPIRATION_BETA: float = Field(
+        default=1.0, ge=0, description="Probabilistic early refresh factor (0 disables)"
+    )
+    CACHE_LOCK_TIMEOUT: float = Field(
+        default=10.0, gt=0, description="Lease held by the worker rebuilding a cache entry (seconds)"
+    )
+    CACHE_LOCK_POLL_INTERVAL: float = Field(
+        default=0.05, gt=0, description="Poll interval while waiting for another worker's rebuild (seconds)"
+    )
+    LOCAL_CACHE_MAX_SIZE: int = Field(
+        default=256, ge=1, description="Max entries in the in-process plan cache"
+    )
+    PLAN_BODY_CACHE_SIZE: int = Field(
+        default=64, ge=1, description="Encoded /pricing-plans bodies kept per catalog version (LRU)"
+    )
+    LOCAL_CACHE_TTL: float = Field(
+        default=60.0, gt=0, description="TTL for in-process plan cache entries (seconds)"
+    )
+    CACHE_INVALIDATION_CHANNEL: str = Field(
+        default="cache_invalidation", description="Redis pub/sub channel for cache invalidation"
+    )
+    PROVIDER_CACHE_CHUNK_SIZE: int = Field(
+        default=10_000, ge=1, description="Plans per Redis chunk in the provider plans cache"
+    )
+    CATALOG_DIR: str = Field(
+        default="", description="Directory holding provider catalog files (empty uses src/clients)"
+    )
+    CATALOG_SNAPSHOT_PATH: str = Field(
+        default="catalog.snapshot",
+        description="Memory-mapped catalog snapshot loaded at startup when present (empty disables)",
+    )
+    CATALOG_READ_BUFFER_SIZE: int = Field(
+        default=1 << 16, ge=1024, description="Read buffer for streaming provider catalog files (bytes)"
+    )
+    CATALOG_WATCH: bool = Field(
+        default=True, description="Watch provider catalog files and hot-reload on change"
+    )
+    CATALOG_POLL_INTERVAL: float = Field(
+        default=1.0, gt=0, description="Provider catalog mtime poll interval when inotify is unavailable (seconds)"
+    )
+    OPTIMIZE_MAX_REQUIRED_GB: int = Field(
+        default=1_000_000, ge=1, description="Largest storage requirement accepted by the plan optimizer (GB)"
+    )
+    OPTIMIZE_MAX_PLANS: int = Field(
+        default=32, ge=1, description="Upper bound for the max_plans optimizer parameter"
+    )
+    OPTIMIZE_MAX_DP_CELLS: int = Field(
+        default=50_000_000,
+        ge=1,
+        description="Work budget of the max_plans solver (layers x plans x units); larger problems are solved in coarser storage steps",
+    )
+    OPTIMIZE_CACHE_SIZE: int = Field(
+        default=1024, ge=1, description="Optimizer results memoised per catalog version"
+    )
+    PAYMENT_BATCH_WINDOW: float = Field(
+        default=0.01, ge=0, description="Time payment confirmations are collected per provider before dispatch (seconds)"
+    )
+    PAYMENT_BATCH_MAX_SIZE: int = Field(
+        default=100, ge=1, description="Max payment confirmations sent to a provider in one call"
+    )
+    PAYMENT_TIMEOUT: float = Field(
+        default=5.0, gt=0, description="Max time to wait for a provider payment gateway (seconds)"
+    )
+    PAYMENT_IDEMPOTENCY_TTL: int = Field(
+        default=86400, ge=1, description="How long payment idempotency keys and results are kept (seconds)"
+    )
+    METRICS_SPANS: bool = Field(
+        default=False, description="Record per-request phase timings and emit a Server-Timing header"
+    )
+    LOG_LEVEL: str = Field(default="INFO", description="Application log level")
+    SERVER_HOST: str = Field(default="0.0.0.0", description="Address the production server binds to")
+    SERVER_PORT: int = Field(default=8000, ge=1, description="Port the production server listens on")
+    SERVER_WORKERS: int = Field(
+        default=0, ge=0, description="Server worker processes (0 sizes to the CPU count)"
+    )
+    SERVER_BACKLOG: int = Field(default=2048, ge=1, description="Listen socket backlog")
+    SERVER_KEEP_ALIVE_TIMEOUT: int = Field(
+        default=5, ge=1, description="Idle keep-alive connection timeout (seconds)"
+    )
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: float = Field(
+        default=30.0, gt=0, description="Time to finish in-flight requests and pending payments on shutdown (seconds)"
+    )
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enforce per-client token bucket limits")
+    RATE_LIMIT_RATE: float = Field(
+        default=50.0, gt=0, description="Sustained requests per second allowed per client"
+    )
+    RATE_LIMIT_BURST: int = Field(default=100, ge=1, description="Token bucket size per client")
+    RATE_LIMIT_API_KEY_HEADER: str = Field(
+        default="X-API-Key", description="Header identifying a client; the client IP is used without it"
+    )
+    RATE_LIMIT_LOCAL_HEADROOM: float = Field(
+        default=0.5, ge=0, le=1,
+        description="Share of the burst a client must have left for a worker to admit it without a Redis check",
+    )
+    RATE_LIMIT_SYNC_INTERVAL: float = Field(
+        default=1.0, gt=0, description="Max time a worker admits a client on its local estimate (seconds)"
+    )
+    RATE_LIMIT_LOCAL_MAX_CLIENTS: int = Field(
+        default=10_000, ge=1, description="Clients tracked by the in-process rate limit pre-check"
+    )
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = Field(
+        default=["/health", "/metrics"], description="Paths never rate limited or shed"
+    )
+    LOAD_SHED_POOL_WAIT: float = Field(
+        default=0.05, gt=0, description="Smoothed Redis pool checkout wait above which requests are shed; unused with REDIS_CLUSTER (seconds)"
+    )
+    LOAD_SHED_RETRY_AFTER: int = Field(
+        default=1, ge=1, description="Retry-After sent with shed requests (seconds)"
+    )
     DOCS_URL: str = Field(default="/docs", description="URL for API documentation")
     REDOC_URL: str = Field(default="/redoc", description="URL for ReDoc documentation")
 
-    @validator("PROVIDERS")
+    @field_validator("PROVIDERS")
+    @classmethod
     def validate_providers(cls, v):
         if not v:
             raise ValueError("PROVIDERS list cannot be empty")
@@ -44,9 +238,15 @@ class Settings(BaseSettings):
             raise ValueError("PROVIDERS list must contain unique values")
         return v
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    @field_validator("REDIS_REPLICAS")
+    @classmethod
+    def validate_replicas(cls, v):
+        for address in v:
+            host, _, port = address.rpartition(":")
+            if not host or not port.isdigit():
+                raise ValueError(f"Replica address must be host:port, got {address!r}")
+        return v
 
 
 settings = Settings()
+PROVIDER_SET = frozenset(settings.PROVIDERS)
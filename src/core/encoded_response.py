@@ -0,0 +1,102 @@
+import gzip
+import json
+from typing import Dict, Iterable, Set
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESSION_MIN_SIZE = 1024
+
+
+def encode_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+class EncodedBody:
+    def __init__(
+        self,
+        etag: str,
+        body: bytes,
+        media_type: str = "application/json",
+        headers: Dict[str, str] | None = None,
+    ):
+        self.etag = etag
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def variant(self, encoding: str) -> bytes:
+        body = self._variants.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.body)
+            else:
+                body = gzip.compress(self.body, compresslevel=6)
+            self._variants[encoding] = body
+        return body
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, size: int) -> str:
+    if size < COMPRESSION_MIN_SIZE:
+        return "identity"
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates: Iterable[str] = (tag.strip() for tag in if_none_match.split(","))
+    opaque = etag.removeprefix("W/")
+    return any(tag == "*" or tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def encoded_response(request: Request, encoded: EncodedBody) -> Response:
+    headers = {"ETag": encoded.etag, "Vary": "Accept-Encoding", **encoded.headers}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, encoded.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), len(encoded.body))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=encoded.variant(encoding), media_type=encoded.media_type, headers=headers
+    )
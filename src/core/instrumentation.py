@@ -0,0 +1,97 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+
+from src.core.config import settings
+from src.core.metrics import Histogram, metrics
+
+current_spans: ContextVar[Dict[str, float] | None] = ContextVar("current_spans", default=None)
+
+requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being served")
+_request_histograms: Dict[Tuple[str, str, str], Histogram] = {}
+_span_histograms: Dict[str, Histogram] = {}
+
+
+def request_histogram(method: str, route: str, status: int) -> Histogram:
+    key = (method, route, f"{status // 100}xx")
+    histogram = _request_histograms.get(key)
+    if histogram is None:
+        histogram = metrics.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            {"method": key[0], "route": key[1], "status": key[2]},
+        )
+        _request_histograms[key] = histogram
+    return histogram
+
+
+def span_histogram(name: str) -> Histogram:
+    histogram = _span_histograms.get(name)
+    if histogram is None:
+        histogram = metrics.histogram(
+            "request_span_duration_seconds", "Time spent per request phase", {"span": name}
+        )
+        _span_histograms[name] = histogram
+    return histogram
+
+
+def record_span(name: str, seconds: float) -> None:
+    timings = current_spans.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if current_spans.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def server_timing(timings: Dict[str, float]) -> bytes:
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()).encode()
+
+
+class TimingMiddleware:
+    def __init__(self, app, spans: bool = settings.METRICS_SPANS):
+        self.app = app
+        self.spans = spans
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        timings: Dict[str, float] | None = {} if self.spans else None
+        token = current_spans.set(timings)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", server_timing(timings)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            requests_in_flight.dec()
+            current_spans.reset(token)
+            route = scope.get("route")
+            request_histogram(
+                scope["method"], route.path if route is not None else "unmatched", status
+            ).observe(time.perf_counter() - started)
+            if timings:
+                for name, seconds in timings.items():
+                    span_histogram(name).observe(seconds)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+from uuid import uuid4
+
+import redis
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+WORKER_ID = uuid4().hex
+
+
+class LocalCache:
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        labels = {"cache": name}
+        self.hits = metrics.counter("local_cache_hits_total", "L1 cache hits", labels)
+        self.misses = metrics.counter("local_cache_misses_total", "L1 cache misses", labels)
+        self.evictions = metrics.counter(
+            "local_cache_evictions_total", "L1 entries evicted by LRU or TTL", labels
+        )
+        self.invalidations = metrics.counter(
+            "local_cache_invalidations_total", "L1 entries dropped by invalidation", labels
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses.inc()
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.evictions.inc()
+            self.misses.inc()
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits.inc()
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions.inc()
+
+    def invalidate(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations.inc()
+
+    def clear(self) -> None:
+        self.invalidations.inc(len(self._entries))
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "evictions": self.evictions.value,
+            "invalidations": self.invalidations.value,
+        }
+
+
+plan_cache = LocalCache(
+    "plans", settings.LOCAL_CACHE_MAX_SIZE, settings.LOCAL_CACHE_TTL
+)
+local_caches: Dict[str, LocalCache] = {plan_cache.name: plan_cache}
+
+
+async def publish_invalidation(redis_client: Redis, *keys: str) -> None:
+    for key in keys:
+        for cache in local_caches.values():
+            cache.invalidate(key)
+        await redis_client.publish(
+            settings.CACHE_INVALIDATION_CHANNEL, f"{WORKER_ID} {key}"
+        )
+
+
+class CacheInvalidationListener:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.received = metrics.counter(
+            "cache_invalidation_messages_total", "Invalidation messages received from other workers"
+        )
+
+    def start(self, redis_client: Redis) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def handle_message(self, data: str) -> None:
+        origin, _, key = data.partition(" ")
+        if origin == WORKER_ID:
+            return
+        self.received.inc()
+        for cache in local_caches.values():
+            cache.invalidate(key)
+
+    async def _listen(self, redis_client: Redis) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        data = message["data"]
+                        self.handle_message(data.decode() if isinstance(data, bytes) else data)
+            except redis.RedisError as e:
+                logger.error(f"Cache invalidation listener failed: {str(e)}")
+                for cache in local_caches.values():
+                    cache.clear()
+                await asyncio.sleep(settings.REDIS_RETRY_DELAY)
+            finally:
+                await pubsub.aclose()
+
+
+invalidation_listener = CacheInvalidationListener()
@@ -0,0 +1,9 @@
+import logging
+
+from src.core.config import settings
+
+
+def configure_logging(level: str = settings.LOG_LEVEL) -> None:
+    logging.basicConfig(
+        level=level.upper(), format="%(asctime)s %(levelname)s %(process)d %(name)s: %(message)s"
+    )
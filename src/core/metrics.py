@@ -0,0 +1,173 @@
+import bisect
+import threading
+from typing import Dict, Iterable, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: LabelSet = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge(Counter):
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: LabelSet = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+def metric_type(metric: Counter | Histogram) -> str:
+    if isinstance(metric, Histogram):
+        return "histogram"
+    return "gauge" if isinstance(metric, Gauge) else "counter"
+
+
+def format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelSet], Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, labels: dict | None, **kwargs):
+        label_set = tuple(sorted((labels or {}).items()))
+        key = (name, label_set)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, description, label_set, **kwargs)
+                    self._metrics[key] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: dict | None = None) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str, labels: dict | None = None) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: dict | None = None,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets=buckets)
+
+    def collect(self) -> list:
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        lines = []
+        described = set()
+        for metric in sorted(self.collect(), key=lambda metric: metric.name):
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric_type(metric)}")
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), metric.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"{metric.name}_bucket{format_labels(metric.labels + (('le', le),))} {cumulative}"
+                    )
+                lines.append(f"{metric.name}_sum{format_labels(metric.labels)} {metric.sum!r}")
+                lines.append(f"{metric.name}_count{format_labels(metric.labels)} {metric.count}")
+            else:
+                lines.append(f"{metric.name}{format_labels(metric.labels)} {float(metric.value)!r}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self, prefix: str = "") -> dict:
+        result = {}
+        for metric in self.collect():
+            if not metric.name.startswith(prefix):
+                continue
+            name = metric.name
+            if metric.labels:
+                name += "{" + ",".join(f"{k}={v}" for k, v in metric.labels) + "}"
+            result[name] = metric.snapshot()
+        return result
+
+
+metrics = MetricsRegistry()
+
+
+def cache_lookups(cache: str) -> Tuple[Counter, Counter]:
+    return (
+        metrics.counter("cache_lookups_total", "Redis cache lookups by result", {"cache": cache, "result": "hit"}),
+        metrics.counter("cache_lookups_total", "Redis cache lookups by result", {"cache": cache, "result": "miss"}),
+    )
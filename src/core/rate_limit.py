@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Callable, Dict, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.encoded_response import encode_json
+from src.core.local_cache import MISSING, LocalCache
+from src.core.metrics import Counter, metrics
+from src.core.redis_client import RedisUnavailableError, get_redis_pool, redis_manager
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local debt = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - debt
+tokens = math.max(tokens, -burst)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(2 * burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+Decision = Tuple[bool, float, float]
+
+_decisions: Dict[str, Counter] = {
+    result: metrics.counter(
+        "rate_limit_decisions_total", "Admission decisions by outcome", {"result": result}
+    )
+    for result in ("local", "allowed", "limited", "shed", "unchecked")
+}
+
+
+def bucket_key(identity: str) -> str:
+    return f"ratelimit:{identity}"
+
+
+class LocalBucket:
+    __slots__ = ("tokens", "synced_at", "debt")
+
+    def __init__(self, tokens: float, synced_at: float):
+        self.tokens = tokens
+        self.synced_at = synced_at
+        self.debt = 0
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        rate: float = settings.RATE_LIMIT_RATE,
+        burst: int = settings.RATE_LIMIT_BURST,
+        headroom: float = settings.RATE_LIMIT_LOCAL_HEADROOM,
+        sync_interval: float = settings.RATE_LIMIT_SYNC_INTERVAL,
+        max_clients: int = settings.RATE_LIMIT_LOCAL_MAX_CLIENTS,
+    ):
+        self.redis_client = redis_client
+        self.rate = rate
+        self.burst = burst
+        self.headroom = headroom * burst
+        self.sync_interval = sync_interval
+        self.local = LocalCache("rate_limit", max_clients, burst / rate + sync_interval)
+        self._script = None
+
+    def script(self, redis_client: Redis):
+        if self._script is None or self._script.registered_client is not redis_client:
+            self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def _estimate(self, bucket: LocalBucket, now: float) -> float:
+        return min(self.burst, bucket.tokens + (now - bucket.synced_at) * self.rate) - bucket.debt
+
+    async def check(self, identity: str, now: float | None = None) -> Decision:
+        now = time.time() if now is None else now
+        bucket = self.local.get(identity)
+        if (
+            bucket is not MISSING
+            and now - bucket.synced_at < self.sync_interval
+            and self._estimate(bucket, now) - 1 >= self.headroom
+        ):
+            bucket.debt += 1
+            _decisions["local"].inc()
+            return True, self._estimate(bucket, now), 0.0
+
+        debt = bucket.debt if bucket is not MISSING else 0
+        try:
+            redis_client = self.redis_client or redis_manager.get_client()
+            allowed, tokens, retry_after = await self.script(redis_client)(
+                keys=[bucket_key(identity)], args=[self.rate, self.burst, now, debt]
+            )
+        except (RedisUnavailableError, RedisError) as e:
+            logger.warning(f"Rate limit check skipped for {identity}: {str(e)}")
+            _decisions["unchecked"].inc()
+            return True, 0.0, 0.0
+        tokens, retry_after = float(tokens), float(retry_after)
+        self.local.set(identity, LocalBucket(tokens, now))
+        _decisions["allowed" if allowed else "limited"].inc()
+        return bool(allowed), tokens, retry_after
+
+
+def client_identity(scope, api_key_header: bytes) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == api_key_header:
+            return "key:" + hashlib.sha1(value).hexdigest()[:16]
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def pool_wait() -> float:
+    return get_redis_pool().recent_wait()
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        limiter: TokenBucketLimiter | None = None,
+        enabled: bool = settings.RATE_LIMIT_ENABLED,
+        shed_pool_wait: float = settings.LOAD_SHED_POOL_WAIT,
+        load: Callable[[], float] | None = None,
+    ):
+        self.app = app
+        self.limiter = limiter or TokenBucketLimiter()
+        self.enabled = enabled
+        self.shed_pool_wait = shed_pool_wait
+        if load is None and redis_manager.cluster:
+            # Cluster nodes fail fast at max_connections instead of queueing checkouts
+            logger.warning("Pool-wait load shedding is disabled in Redis Cluster mode")
+        elif load is None:
+            load = pool_wait
+        self.load = load
+        self.exempt = tuple(settings.RATE_LIMIT_EXEMPT_PATHS)
+        self.api_key_header = settings.RATE_LIMIT_API_KEY_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        if self.load is not None and self.load() > self.shed_pool_wait:
+            _decisions["shed"].inc()
+            await reject(send, "Server is overloaded, retry later", settings.LOAD_SHED_RETRY_AFTER)
+            return
+
+        allowed, tokens, retry_after = await self.limiter.check(
+            client_identity(scope, self.api_key_header)
+        )
+        if not allowed:
+            await reject(send, "Rate limit exceeded", retry_after)
+            return
+        await self.app(scope, receive, send)
+
+
+async def reject(send, detail: str, retry_after: float) -> None:
+    body = encode_json({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
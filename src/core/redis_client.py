@@ -1,33 +1,352 @@
+import asyncio
+import logging
+import math
 import time
 from functools import lru_cache
+from itertools import count
+from typing import Dict, Iterable, List, Tuple
 
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterPipeline, LoadBalancingStrategy, RedisCluster
 
+from src.core.circuit_breaker import CircuitBreaker
 from src.core.config import settings
+from src.core.instrumentation import record_span
+from src.core.metrics import Counter, Histogram, metrics
 
+logger = logging.getLogger(__name__)
 
-@lru_cache()
-def get_redis_pool():
-    return redis.ConnectionPool(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
+pool_checkout_wait = metrics.histogram(
+    "redis_pool_checkout_wait_seconds", "Time spent waiting for a pooled Redis connection"
+)
+pings_avoided = metrics.counter(
+    "redis_pings_avoided_total", "Dependency resolutions served without a Redis ping"
+)
+health_checks = metrics.counter("redis_health_checks_total", "Background Redis health pings")
+health_check_failures = metrics.counter(
+    "redis_health_check_failures_total", "Failed background Redis health pings"
+)
+
+POOL_WAIT_SMOOTHING = 0.2
+POOL_WAIT_DECAY = 1.0
+CONNECTION_ERRORS = (redis.ConnectionError, redis.RedisClusterException)
+HEALTH_CHECK_ERRORS = (redis.RedisError, redis.RedisClusterException)
+
+_command_metrics: Dict[str, Tuple[Counter, Histogram]] = {}
+
+
+def command_metrics(command: str) -> Tuple[Counter, Histogram]:
+    entry = _command_metrics.get(command)
+    if entry is None:
+        labels = {"command": command}
+        entry = (
+            metrics.counter("redis_commands_total", "Redis commands sent, including pipelined ones", labels),
+            metrics.histogram("redis_command_duration_seconds", "Redis round-trip latency", labels),
+        )
+        _command_metrics[command] = entry
+    return entry
+
+
+def command_name(args) -> str:
+    name = args[0]
+    return (name.decode() if isinstance(name, bytes) else str(name)).upper()
+
+
+def pipeline_histogram(commands: Iterable[tuple], transaction: bool) -> Histogram:
+    for args in commands:
+        command_metrics(command_name(args))[0].inc()
+    counter, histogram = command_metrics("MULTI" if transaction else "PIPELINE")
+    counter.inc()
+    return histogram
+
+
+async def observe(histogram: Histogram, call):
+    started = time.perf_counter()
+    try:
+        return await call
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed)
+        record_span("redis", elapsed)
+
+
+class RedisUnavailableError(Exception):
+    pass
+
+
+class InstrumentedConnectionPool(aioredis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_average = 0.0
+        self.wait_sampled_at = time.monotonic()
+
+    async def get_connection(self, command_name=None, *keys, **options):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            waited = time.perf_counter() - started
+            pool_checkout_wait.observe(waited)
+            self._record_wait(waited)
+
+    def _record_wait(self, waited: float) -> None:
+        now = time.monotonic()
+        decayed = self.recent_wait(now)
+        self.wait_average = decayed + POOL_WAIT_SMOOTHING * (waited - decayed)
+        self.wait_sampled_at = now
+
+    def recent_wait(self, now: float | None = None) -> float:
+        elapsed = (time.monotonic() if now is None else now) - self.wait_sampled_at
+        return self.wait_average * math.exp(-max(elapsed, 0.0) / POOL_WAIT_DECAY)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        histogram = pipeline_histogram(
+            (args for args, _ in self.command_stack), self.is_transaction or self.explicit_transaction
+        )
+        return await observe(histogram, super().execute(raise_on_error))
+
+
+class InstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        counter, histogram = command_metrics(command_name(args))
+        counter.inc()
+        return await observe(histogram, super().execute_command(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedClusterPipeline(ClusterPipeline):
+    async def execute(self, raise_on_error: bool = True, allow_redirections: bool = True):
+        histogram = pipeline_histogram(
+            (command.args for command in self._execution_strategy._command_queue), bool(self._transaction)
+        )
+        return await observe(histogram, super().execute(raise_on_error, allow_redirections))
+
+
+class InstrumentedRedisCluster(RedisCluster):
+    async def execute_command(self, *args, **kwargs):
+        counter, histogram = command_metrics(command_name(args))
+        counter.inc()
+        return await observe(histogram, super().execute_command(*args, **kwargs))
+
+    def pipeline(self, transaction: bool | None = None, shard_hint: str | None = None) -> InstrumentedClusterPipeline:
+        if shard_hint:
+            raise redis.RedisClusterException("shard_hint is not supported in cluster mode")
+        return InstrumentedClusterPipeline(self, transaction)
+
+
+def connection_pool(host: str, port: int, **options) -> InstrumentedConnectionPool:
+    return InstrumentedConnectionPool(
+        host=host,
+        port=port,
         decode_responses=settings.REDIS_DECODE_RESPONSES,
         max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
         retry_on_timeout=True,
+        **options,
     )
 
 
-def get_redis_client() -> redis.Redis:
-    pool = get_redis_pool()
-    for attempt in range(settings.REDIS_RETRY_ATTEMPTS):
+def cluster_client(
+    host: str = settings.REDIS_HOST, port: int = settings.REDIS_PORT, **options
+) -> InstrumentedRedisCluster:
+    return InstrumentedRedisCluster(
+        host=host,
+        port=port,
+        decode_responses=settings.REDIS_DECODE_RESPONSES,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        **options,
+    )
+
+
+def cross_slot_pipeline(redis_client: aioredis.Redis):
+    # A cluster only runs MULTI over keys of one slot, so writes spanning several orders or
+    # queues are sent as a plain pipeline there and stay transactional on a single node
+    return redis_client.pipeline(transaction=not isinstance(redis_client, RedisCluster))
+
+
+@lru_cache()
+def get_redis_pool() -> aioredis.BlockingConnectionPool:
+    return connection_pool(settings.REDIS_HOST, settings.REDIS_PORT)
+
+
+class RedisReplica:
+    def __init__(self, address: str):
+        host, _, port = address.rpartition(":")
+        self.address = address
+        self.client = InstrumentedRedis(connection_pool=connection_pool(host, int(port)))
+        self.breaker = CircuitBreaker(
+            settings.REDIS_CIRCUIT_FAILURE_THRESHOLD, settings.REDIS_CIRCUIT_RESET_TIMEOUT
+        )
+
+    async def check_health(self) -> bool:
         try:
-            client = redis.Redis(connection_pool=pool)
-            client.ping()
-            return client
-        except redis.ConnectionError as e:
-            if attempt == settings.REDIS_RETRY_ATTEMPTS - 1:
-                raise Exception(
-                    f"Failed to connect to Redis after {settings.REDIS_RETRY_ATTEMPTS} attempts: {str(e)}"
+            await self.client.ping()
+        except redis.RedisError as e:
+            self.breaker.record_failure(e)
+            logger.warning(f"Redis replica {self.address} health check failed: {str(e)}")
+            return False
+        self.breaker.record_success()
+        return True
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        await self.client.connection_pool.disconnect()
+
+
+class RedisClientManager:
+    def __init__(self):
+        self.client: aioredis.Redis | None = None
+        self.reader_client: RedisCluster | None = None
+        self.cluster = settings.REDIS_CLUSTER
+        self.read_from_replicas = settings.REDIS_READ_FROM_REPLICAS
+        self.replicas: List[RedisReplica] = (
+            [] if self.cluster else [RedisReplica(address) for address in settings.REDIS_REPLICAS]
+        )
+        self._replica_turn = count()
+        self.breaker = CircuitBreaker(
+            settings.REDIS_CIRCUIT_FAILURE_THRESHOLD, settings.REDIS_CIRCUIT_RESET_TIMEOUT
+        )
+        self._health_task: asyncio.Task | None = None
+
+    def _ensure_client(self) -> aioredis.Redis:
+        if self.client is None:
+            if self.cluster:
+                self.client = cluster_client()
+            else:
+                self.client = InstrumentedRedis(connection_pool=get_redis_pool())
+        return self.client
+
+    async def connect(self) -> aioredis.Redis:
+        client = self._ensure_client()
+        delay = settings.REDIS_RETRY_DELAY
+        for attempt in range(settings.REDIS_RETRY_ATTEMPTS):
+            try:
+                await client.ping()
+                self.breaker.record_success()
+                break
+            except CONNECTION_ERRORS as e:
+                self.breaker.record_failure(e)
+                if attempt == settings.REDIS_RETRY_ATTEMPTS - 1:
+                    raise RedisUnavailableError(
+                        f"Failed to connect to Redis after {settings.REDIS_RETRY_ATTEMPTS} attempts: {str(e)}"
+                    )
+                logger.warning(f"Redis ping failed, retrying in {delay:.2f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.REDIS_RETRY_BACKOFF_MAX)
+        await self.check_replicas()
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+        return client
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        if self.reader_client is not None:
+            await self.reader_client.aclose()
+            self.reader_client = None
+        for replica in self.replicas:
+            await replica.close()
+        if not self.cluster:
+            await get_redis_pool().disconnect()
+
+    async def check_health(self) -> bool:
+        health_checks.inc()
+        try:
+            await self._ensure_client().ping()
+        except HEALTH_CHECK_ERRORS as e:
+            health_check_failures.inc()
+            self.breaker.record_failure(e)
+            logger.error(f"Redis health check failed: {str(e)}")
+            return False
+        self.breaker.record_success()
+        return True
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            await replica.check_health()
+
+    async def _health_check_loop(self) -> None:
+        delay = settings.REDIS_HEALTH_CHECK_INTERVAL
+        while True:
+            await asyncio.sleep(delay)
+            await self.check_replicas()
+            if await self.check_health():
+                delay = settings.REDIS_HEALTH_CHECK_INTERVAL
+            else:
+                delay = min(
+                    settings.REDIS_RETRY_DELAY * 2 ** (self.breaker.failures - 1),
+                    settings.REDIS_RETRY_BACKOFF_MAX,
+                )
+
+    def get_client(self) -> aioredis.Redis:
+        if not self.breaker.allow_request():
+            raise RedisUnavailableError(
+                f"Redis circuit is open: {self.breaker.last_error}"
+            )
+        pings_avoided.inc()
+        return self._ensure_client()
+
+    def reader(self, redis_client: aioredis.Redis) -> aioredis.Redis:
+        if redis_client is not self.client or not self.read_from_replicas:
+            return redis_client
+        if self.cluster:
+            if self.reader_client is None:
+                self.reader_client = cluster_client(
+                    load_balancing_strategy=LoadBalancingStrategy.ROUND_ROBIN_REPLICAS
                 )
-            time.sleep(settings.REDIS_RETRY_DELAY)
-    raise Exception("Failed to connect to Redis")
+            return self.reader_client
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._replica_turn) % len(self.replicas)]
+            if replica.breaker.allow_request():
+                return replica.client
+        return redis_client
+
+    def snapshot(self) -> dict:
+        if self.cluster:
+            nodes = self.client.get_nodes() if self.client is not None else []
+            pool = {"nodes": [node.name for node in nodes]}
+        else:
+            standalone_pool = get_redis_pool()
+            pool = {
+                "max_connections": standalone_pool.max_connections,
+                "in_use": len(getattr(standalone_pool, "_in_use_connections", ())),
+                "checkout_wait_seconds": pool_checkout_wait.snapshot(),
+            }
+        return {
+            "circuit": self.breaker.snapshot(),
+            "pool": pool,
+            "cluster": self.cluster,
+            "replicas": {replica.address: replica.breaker.snapshot() for replica in self.replicas},
+            "pings_avoided": pings_avoided.value,
+            "health_checks": health_checks.value,
+            "health_check_failures": health_check_failures.value,
+        }
+
+
+redis_manager = RedisClientManager()
+
+
+async def get_redis_client() -> aioredis.Redis:
+    return redis_manager.get_client()
+
+
+def read_client(redis_client: aioredis.Redis) -> aioredis.Redis:
+    # Replica-backed client for reads that tolerate replication lag; clients the manager
+    # does not own (tests, benchmarks) are returned unchanged
+    return redis_manager.reader(redis_client)
@@ -0,0 +1,83 @@
+import asyncio
+import math
+import random
+import time
+from typing import Awaitable, Callable, Dict, TypeVar
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from src.core.metrics import metrics
+
+T = TypeVar("T")
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, asyncio.Future] = {}
+        labels = {"group": name}
+        self.leaders = metrics.counter(
+            "single_flight_leaders_total", "Calls that started a computation", labels
+        )
+        self.followers = metrics.counter(
+            "single_flight_followers_total", "Calls that joined an in-flight computation", labels
+        )
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._flights
+
+    def spawn(self, key: str, fn: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        future = self._flights.get(key)
+        if future is not None:
+            self.followers.inc()
+            return future
+        self.leaders.inc()
+        future = asyncio.ensure_future(fn())
+        self._flights[key] = future
+
+        def forget(done: asyncio.Future) -> None:
+            if self._flights.get(key) is done:
+                del self._flights[key]
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(forget)
+        return future
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.spawn(key, fn))
+
+
+class RedisLease:
+    def __init__(self, redis_client: Redis, key: str, ttl: float):
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid4().hex
+
+    async def acquire(self) -> bool:
+        return bool(
+            await self.redis_client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000))
+        )
+
+    async def release(self) -> None:
+        await self.redis_client.eval(RELEASE_LEASE_SCRIPT, 1, self.key, self.token)
+
+
+def jittered_ttl(ttl: float, jitter: float) -> int:
+    return max(1, int(ttl * (1 + random.uniform(-jitter, jitter))))
+
+
+def should_refresh_early(
+    expires_at: float, delta: float, beta: float, now: float | None = None
+) -> bool:
+    now = time.time() if now is None else now
+    return now - delta * beta * math.log(random.random() or 1e-12) >= expires_at
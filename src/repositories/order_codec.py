@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict
+from uuid import UUID
+
+from redis.asyncio.client import Pipeline
+
+from src.schemas.order import Order
+
+STATUS_CODES = {"payment_pending": "w", "pending": "p", "completed": "c", "failed": "f"}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+# Only touches orders that still exist; a bare HSET would recreate an expired hash holding just "s"
+WRITE_STATUS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 's', ARGV[1])
+return redis.call('EXPIRE', KEYS[1], ARGV[2])
+"""
+
+
+def parse_created_at(value: Any) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def build_order(order_id: UUID | str, fields: Dict[str, Any], trusted: bool) -> Order:
+    if fields.get("created_at") is None:
+        fields.pop("created_at", None)
+    if not trusted:
+        return Order(order_id=order_id, **fields)
+    created_at = fields.get("created_at")
+    return Order.trusted(
+        order_id if isinstance(order_id, UUID) else UUID(order_id),
+        fields["provider"],
+        int(fields["storage_gb"]),
+        fields["status"],
+        parse_created_at(created_at) if created_at is not None else None,
+    )
+
+
+class JsonOrderCodec:
+    name = "json"
+
+    def encode(self, order: Order) -> str:
+        return order.model_dump_json()
+
+    def write(self, pipeline: Pipeline, key: str, order: Order, ttl: int) -> None:
+        pipeline.set(key, self.encode(order), ex=ttl)
+
+    def write_status(self, pipeline: Pipeline, key: str, order: Order, ttl: int) -> None:
+        self.write(pipeline, key, order, ttl)
+
+    def read(self, pipeline: Pipeline, key: str) -> None:
+        pipeline.get(key)
+
+    def decode(self, order_id: UUID | str, raw: Any, trusted: bool = False) -> Order | None:
+        if not raw:
+            return None
+        fields = json.loads(raw)
+        fields.pop("order_id", None)
+        return build_order(order_id, fields, trusted)
+
+
+class HashOrderCodec:
+    name = "hash"
+
+    def encode(self, order: Order) -> Dict[str, str | int]:
+        return {
+            "p": order.provider,
+            "g": order.storage_gb,
+            "s": STATUS_CODES.get(order.status, order.status),
+            "t": order.created_at.timestamp(),
+        }
+
+    def write(self, pipeline: Pipeline, key: str, order: Order, ttl: int) -> None:
+        pipeline.hset(key, mapping=self.encode(order))
+        pipeline.expire(key, ttl)
+
+    def write_status(self, pipeline: Pipeline, key: str, order: Order, ttl: int) -> None:
+        pipeline.eval(WRITE_STATUS_SCRIPT, 1, key, STATUS_CODES.get(order.status, order.status), ttl)
+
+    def read(self, pipeline: Pipeline, key: str) -> None:
+        pipeline.hgetall(key)
+
+    def decode(self, order_id: UUID | str, raw: Any, trusted: bool = False) -> Order | None:
+        if not raw or "p" not in raw or "g" not in raw:
+            return None
+        fields = {
+            "provider": raw["p"],
+            "storage_gb": raw["g"],
+            "status": STATUS_NAMES.get(raw["s"], raw["s"]),
+            "created_at": float(raw["t"]) if "t" in raw else None,
+        }
+        return build_order(order_id, fields, trusted)
+
+
+ORDER_CODECS = {codec.name: codec for codec in (JsonOrderCodec(), HashOrderCodec())}
+
+
+def get_order_codec(name: str) -> JsonOrderCodec | HashOrderCodec:
+    try:
+        return ORDER_CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown order codec: {name}")
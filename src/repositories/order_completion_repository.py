@@ -0,0 +1,59 @@
+from typing import List
+from uuid import UUID
+
+import redis.asyncio as redis
+from fastapi import Depends
+
+from src.core.redis_client import cross_slot_pipeline, get_redis_client
+
+COMPLETION_QUEUE_KEY = "orders:completion_due"
+COMPLETION_ATTEMPTS_KEY = "orders:completion_attempts"
+COMPLETION_DEAD_KEY = "orders:completion_dead"
+
+CLAIM_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[1], ARGV[3], id)
+end
+return ids
+"""
+
+
+class OrderCompletionRepository:
+    def __init__(self, redis_client: redis.Redis = Depends(get_redis_client)):
+        self.redis_client = redis_client
+        self._claim_due = redis_client.register_script(CLAIM_DUE_SCRIPT)
+
+    async def schedule(self, order_id: UUID, due_at: float) -> None:
+        await self.redis_client.zadd(COMPLETION_QUEUE_KEY, {str(order_id): due_at})
+
+    async def claim_due(self, now: float, batch_size: int, lease: float) -> List[str]:
+        return await self._claim_due(
+            keys=[COMPLETION_QUEUE_KEY], args=[now, batch_size, now + lease]
+        )
+
+    async def ack(self, order_ids: List[str]) -> None:
+        if not order_ids:
+            return
+        pipeline = cross_slot_pipeline(self.redis_client)
+        pipeline.zrem(COMPLETION_QUEUE_KEY, *order_ids)
+        pipeline.hdel(COMPLETION_ATTEMPTS_KEY, *order_ids)
+        await pipeline.execute()
+
+    async def retry(self, order_id: str, due_at: float, max_attempts: int) -> bool:
+        attempts = await self.redis_client.hincrby(COMPLETION_ATTEMPTS_KEY, order_id, 1)
+        pipeline = cross_slot_pipeline(self.redis_client)
+        if attempts >= max_attempts:
+            pipeline.zrem(COMPLETION_QUEUE_KEY, order_id)
+            pipeline.zadd(COMPLETION_DEAD_KEY, {order_id: due_at})
+            pipeline.hdel(COMPLETION_ATTEMPTS_KEY, order_id)
+        else:
+            pipeline.zadd(COMPLETION_QUEUE_KEY, {order_id: due_at})
+        await pipeline.execute()
+        return attempts < max_attempts
+
+    async def depth(self) -> int:
+        return await self.redis_client.zcard(COMPLETION_QUEUE_KEY)
+
+    async def due_count(self, now: float) -> int:
+        return await self.redis_client.zcount(COMPLETION_QUEUE_KEY, "-inf", now)
@@ -1,27 +1,274 @@
-import json
+import asyncio
+import base64
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
 from uuid import UUID
 
-import redis
+import redis.asyncio as redis
 from fastapi import Depends
+from redis.asyncio.cluster import RedisCluster
+from redis.exceptions import ResponseError
 
-from src.core.redis_client import get_redis_client
+from src.core.config import settings
+from src.core.redis_client import cross_slot_pipeline, get_redis_client, read_client
+from src.repositories.order_codec import STATUS_CODES, get_order_codec
+from src.repositories.order_completion_repository import COMPLETION_QUEUE_KEY
 from src.schemas.order import Order
 
+legacy_codec = get_order_codec("json")
+LEGACY_KEYS_DEADLINE_KEY = "orders:legacy_keys_until"
+
+
+def order_key(order_id: UUID | str) -> str:
+    # The hash tag keeps every key of one order on the same cluster slot
+    return f"order:{{{order_id}}}"
+
+
+def legacy_order_key(order_id: UUID | str) -> str:
+    return f"order:{order_id}"
+
+
+def order_index_key(provider: str | None = None, status: str | None = None) -> str:
+    parts = ["orders:index"]
+    if provider:
+        parts.append(f"provider:{provider}")
+    if status:
+        parts.append(f"status:{status}")
+    if len(parts) == 1:
+        parts.append("all")
+    return ":".join(parts)
+
+
+def order_index_keys(order: Order) -> List[str]:
+    return [
+        order_index_key(),
+        order_index_key(provider=order.provider),
+        order_index_key(status=order.status),
+        order_index_key(provider=order.provider, status=order.status),
+    ]
+
+
+def order_event(order: Order) -> str:
+    return f"{order.order_id} {order.status}"
+
+
+class LegacyKeyWindow:
+    # Orders under pre-hash-tag keys expire within ORDER_CACHE_TIMEOUT, so renames are only
+    # attempted for that long after the first worker using hash-tagged keys started
+    def __init__(self):
+        self.deadline: float | None = None
+
+    async def is_open(self, redis_client: redis.Redis) -> bool:
+        if not settings.REDIS_MIGRATE_LEGACY_KEYS or isinstance(redis_client, RedisCluster):
+            return False
+        if self.deadline is None:
+            await redis_client.set(
+                LEGACY_KEYS_DEADLINE_KEY, time.time() + settings.ORDER_CACHE_TIMEOUT, nx=True
+            )
+            deadline = await redis_client.get(LEGACY_KEYS_DEADLINE_KEY)
+            # Deleted between the two commands: treat the window as closed
+            self.deadline = float(deadline) if deadline is not None else 0.0
+        return time.time() < self.deadline
+
+
+legacy_keys = LegacyKeyWindow()
+
+
+def encode_cursor(score: float, order_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}|{order_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        score, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(score), order_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
 
 class OrderRepository:
     def __init__(self, redis_client: redis.Redis = Depends(get_redis_client)):
         self.redis_client = redis_client
+        self.codec = get_order_codec(settings.ORDER_CODEC)
+
+    async def save_order(
+        self, order: Order, ttl: int = 86400, complete_at: float | None = None
+    ) -> None:
+        await self.save_orders([order], ttl, complete_at)
+
+    async def save_orders(
+        self,
+        orders: List[Order],
+        ttl: int = 86400,
+        complete_at: float | None = None,
+        publish: bool = False,
+    ) -> None:
+        if not orders:
+            return
+        pipeline = cross_slot_pipeline(self.redis_client)
+        index_entries: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for order in orders:
+            self.codec.write(pipeline, order_key(order.order_id), order, ttl)
+            for key in order_index_keys(order):
+                index_entries[key][str(order.order_id)] = order.created_at.timestamp()
+        self._write_index_entries(pipeline, index_entries, ttl)
+        if complete_at is not None:
+            pipeline.zadd(
+                COMPLETION_QUEUE_KEY,
+                {str(order.order_id): complete_at for order in orders},
+            )
+        await self._execute(pipeline, orders if publish else [])
+
+    @staticmethod
+    def _write_index_entries(pipeline, index_entries: Dict[str, Dict[str, float]], ttl: int) -> None:
+        expired_before = time.time() - ttl
+        for key, entries in index_entries.items():
+            pipeline.zadd(key, entries)
+            pipeline.zremrangebyscore(key, "-inf", expired_before)
+
+    async def _execute(self, pipeline, published: List[Order]) -> None:
+        if isinstance(self.redis_client, RedisCluster):
+            # PUBLISH cannot be pipelined on a cluster; any node fans it out to subscribers
+            await pipeline.execute()
+            await asyncio.gather(*(
+                self.redis_client.publish(settings.ORDER_EVENTS_CHANNEL, order_event(order))
+                for order in published
+            ))
+            return
+        for order in published:
+            pipeline.publish(settings.ORDER_EVENTS_CHANNEL, order_event(order))
+        await pipeline.execute()
+
+    async def get_order(self, order_id: UUID, trusted: bool = False) -> Order | None:
+        return (await self.get_orders([order_id], trusted))[0]
+
+    async def get_orders(
+        self, order_ids: List[UUID | str], trusted: bool = False, stale: bool = False
+    ) -> List[Order | None]:
+        if not order_ids:
+            return []
+        redis_client = read_client(self.redis_client) if stale else self.redis_client
+        pipeline = redis_client.pipeline(transaction=False)
+        for order_id in order_ids:
+            self.codec.read(pipeline, order_key(order_id))
+        raw_orders = await pipeline.execute(raise_on_error=False)
+
+        orders: List[Order | None] = []
+        legacy_ids = []
+        missing_ids = []
+        for order_id, raw in zip(order_ids, raw_orders):
+            if isinstance(raw, ResponseError) and self.codec is not legacy_codec:
+                legacy_ids.append(order_id)
+                orders.append(None)
+            elif isinstance(raw, Exception):
+                raise raw
+            else:
+                order = self.codec.decode(order_id, raw, trusted)
+                if order is None:
+                    missing_ids.append(order_id)
+                orders.append(order)
+        if legacy_ids:
+            migrated = await self._migrate_legacy_orders(legacy_ids, trusted)
+            orders = [migrated.get(str(order_id), order) for order_id, order in zip(order_ids, orders)]
+        if missing_ids and not stale and await legacy_keys.is_open(self.redis_client):
+            renamed = await self._rename_legacy_keys(missing_ids)
+            if renamed:
+                adopted = dict(zip(map(str, renamed), await self.get_orders(renamed, trusted)))
+                orders = [adopted.get(str(order_id), order) for order_id, order in zip(order_ids, orders)]
+        return orders
+
+    async def _rename_legacy_keys(self, order_ids: List[UUID | str]) -> List[UUID | str]:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for order_id in order_ids:
+            pipeline.renamenx(legacy_order_key(order_id), order_key(order_id))
+        renamed = await pipeline.execute(raise_on_error=False)
+        return [order_id for order_id, result in zip(order_ids, renamed) if result is True]
+
+    async def _migrate_legacy_orders(
+        self, order_ids: List[UUID | str], trusted: bool
+    ) -> dict[str, Order]:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for order_id in order_ids:
+            pipeline.get(order_key(order_id))
+            pipeline.ttl(order_key(order_id))
+        raw = await pipeline.execute()
+
+        migrated = {}
+        pipeline = cross_slot_pipeline(self.redis_client)
+        for order_id, raw_order, ttl in zip(order_ids, raw[::2], raw[1::2]):
+            order = legacy_codec.decode(order_id, raw_order, trusted)
+            if order is None:
+                continue
+            migrated[str(order_id)] = order
+            ttl = ttl if ttl > 0 else settings.ORDER_CACHE_TIMEOUT
+            pipeline.delete(order_key(order_id))
+            self.codec.write(pipeline, order_key(order_id), order, ttl)
+        await pipeline.execute()
+        return migrated
+
+    async def update_order(self, order: Order, ttl: int = 86400) -> None:
+        await self.update_statuses([order], ttl)
+
+    async def update_statuses(self, orders: List[Order], ttl: int = 86400) -> None:
+        if not orders:
+            return
+        pipeline = cross_slot_pipeline(self.redis_client)
+        for order in orders:
+            self.codec.write_status(pipeline, order_key(order.order_id), order, ttl)
+        written = await pipeline.execute()
+
+        # Orders that expired in the meantime get no index entries and no events
+        updated = [order for order, result in zip(orders, written) if result]
+        pipeline = cross_slot_pipeline(self.redis_client)
+        index_entries: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for order in orders:
+            order_id = str(order.order_id)
+            for status in STATUS_CODES:
+                if status != order.status:
+                    pipeline.zrem(order_index_key(status=status), order_id)
+                    pipeline.zrem(order_index_key(provider=order.provider, status=status), order_id)
+        for order in updated:
+            for key in order_index_keys(order)[2:]:
+                index_entries[key][str(order.order_id)] = order.created_at.timestamp()
+        self._write_index_entries(pipeline, index_entries, ttl)
+        await self._execute(pipeline, updated)
 
-    def save_order(self, order: Order, ttl: int = 86400) -> None:
-        order_dict = order.dict()
-        order_dict["order_id"] = str(order_dict["order_id"])
-        self.redis_client.set(f"order:{order.order_id}", json.dumps(order_dict), ex=ttl)
+    async def list_orders(
+        self,
+        provider: str | None = None,
+        status: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[Order], str | None]:
+        key = order_index_key(provider, status)
+        reader = read_client(self.redis_client)
+        max_score: float | str = created_before.timestamp() if created_before else "+inf"
+        min_score: float | str = created_after.timestamp() if created_after else "-inf"
+        cursor_score, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+        if cursor_score is not None and (max_score == "+inf" or cursor_score < max_score):
+            max_score = cursor_score
 
-    def get_order(self, order_id: UUID) -> Order | None:
-        order_data = self.redis_client.get(f"order:{order_id}")
-        if order_data:
-            return Order(**json.loads(order_data))
-        return None
+        entries: List[Tuple[str, float]] = []
+        offset = 0
+        while len(entries) <= limit:
+            batch = await reader.zrange(
+                key, max_score, min_score, desc=True, byscore=True,
+                offset=offset, num=limit + 1, withscores=True,
+            )
+            if not batch:
+                break
+            offset += len(batch)
+            entries.extend(
+                (order_id, score)
+                for order_id, score in batch
+                if not (score == cursor_score and order_id >= cursor_id)
+            )
 
-    def update_order(self, order: Order, ttl: int = 86400) -> None:
-        self.save_order(order, ttl)
+        page = entries[:limit]
+        next_cursor = encode_cursor(page[-1][1], page[-1][0]) if len(entries) > limit else None
+        orders = await self.get_orders([order_id for order_id, _ in page], trusted=True, stale=True)
+        return [order for order in orders if order is not None], next_cursor
@@ -0,0 +1,47 @@
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4
+
+import redis.asyncio as redis
+from fastapi import Depends
+
+from src.core.config import settings
+from src.core.redis_client import cross_slot_pipeline, get_redis_client
+
+PAYMENT_RESULTS = {True: "c", False: "f"}
+
+
+def payment_key(order_id: UUID | str) -> str:
+    return f"payment:{order_id}"
+
+
+class PaymentRepository:
+    def __init__(self, redis_client: redis.Redis = Depends(get_redis_client)):
+        self.redis_client = redis_client
+
+    async def reserve(
+        self, order_ids: List[UUID | str], ttl: int = settings.PAYMENT_IDEMPOTENCY_TTL
+    ) -> List[Tuple[str, bool | None]]:
+        if not order_ids:
+            return []
+        pipeline = cross_slot_pipeline(self.redis_client)
+        for order_id in order_ids:
+            key = payment_key(order_id)
+            pipeline.hsetnx(key, "k", uuid4().hex)
+            pipeline.expire(key, ttl)
+            pipeline.hmget(key, "k", "r")
+        raw = await pipeline.execute()
+        return [
+            (idempotency_key, None if result is None else result == PAYMENT_RESULTS[True])
+            for idempotency_key, result in raw[2::3]
+        ]
+
+    async def record(
+        self, results: Dict[str, bool], ttl: int = settings.PAYMENT_IDEMPOTENCY_TTL
+    ) -> None:
+        if not results:
+            return
+        pipeline = cross_slot_pipeline(self.redis_client)
+        for order_id, confirmed in results.items():
+            pipeline.hset(payment_key(order_id), "r", PAYMENT_RESULTS[confirmed])
+            pipeline.expire(payment_key(order_id), ttl)
+        await pipeline.execute()
@@ -1,29 +1,99 @@
 import json
-from typing import List
+import time
+from typing import Any, Dict, Sequence
 
 from fastapi import Depends
-from redis import Redis
+from redis.asyncio import Redis
 
+from src.clients.catalog_loader import PlanColumns
 from src.core.config import settings
-from src.core.redis_client import get_redis_client
-from src.schemas.pricing_plan import PricingPlan
+from src.core.instrumentation import span
+from src.core.local_cache import MISSING, plan_cache, publish_invalidation
+from src.core.metrics import cache_lookups
+from src.core.redis_client import get_redis_client, read_client
+from src.core.single_flight import RedisLease, jittered_ttl
+from src.schemas.pricing_plan import PlanRecord, PricingPlan
+
+# One hash tag so the catalog, its version and the rebuild lease share a cluster slot
+CATALOG_VERSION_KEY = "pricing_plans:{catalog}:version"
+CATALOG_KEY = "pricing_plans:{catalog}"
+CATALOG_LOCK_KEY = "pricing_plans:{catalog}:lock"
+
+catalog_hits, catalog_misses = cache_lookups("pricing_plans")
 
 
 class PricingPlanRepository:
     def __init__(self, redis_client: Redis = Depends(get_redis_client)):
         self.redis_client = redis_client
 
-    def get_cached_plans(self, min_storage: int) -> List[PricingPlan] | None:
-        cache_key = f"pricing_plans:min_storage_{min_storage}"
-        cached_plans = self.redis_client.get(cache_key)
-        if cached_plans:
-            return [PricingPlan.parse_raw(plan) for plan in json.loads(cached_plans)]
+    async def get_catalog_version(self) -> str | None:
+        version = plan_cache.get(CATALOG_VERSION_KEY)
+        if version is not MISSING:
+            return version
+        version = await read_client(self.redis_client).get(CATALOG_VERSION_KEY)
+        if version:
+            catalog_hits.inc()
+            plan_cache.set(CATALOG_VERSION_KEY, version)
+        else:
+            catalog_misses.inc()
+        return version
+
+    async def get_cached_catalog(self, use_local: bool = True) -> Dict[str, Any] | None:
+        if use_local:
+            catalog = plan_cache.get(CATALOG_KEY)
+            if catalog is not MISSING:
+                return catalog
+        cached_catalog = await read_client(self.redis_client).get(CATALOG_KEY)
+        if cached_catalog:
+            catalog_hits.inc()
+            with span("parse"):
+                data = json.loads(cached_catalog)
+                if "columns" in data:
+                    plans = PlanColumns.from_dict(data["columns"])
+                else:
+                    plans = PlanColumns.from_plans(PlanRecord(**plan) for plan in data["plans"])
+            catalog = {
+                "version": data["version"],
+                "plans": plans,
+                "failed_providers": data.get("failed_providers", []),
+                "expires_at": data.get("expires_at", time.time()),
+                "delta": data.get("delta", 0.0),
+            }
+            plan_cache.set(CATALOG_KEY, catalog)
+            return catalog
+        catalog_misses.inc()
         return None
 
-    def cache_plans(self, min_storage: int, plans: List[PricingPlan]) -> None:
-        cache_key = f"pricing_plans:min_storage_{min_storage}"
-        self.redis_client.setex(
-            cache_key,
-            settings.REDIS_CACHE_TIMEOUT,
-            json.dumps([plan.json() for plan in plans]),
-        )
+    async def cache_catalog(
+        self,
+        version: str,
+        plans: Sequence[PricingPlan] | PlanColumns,
+        failed_providers: Sequence[str] = (),
+        delta: float = 0.0,
+    ) -> Dict[str, Any]:
+        if not isinstance(plans, PlanColumns):
+            plans = PlanColumns.from_plans(plans)
+        ttl = settings.PARTIAL_CATALOG_TTL if failed_providers else settings.REDIS_CACHE_TIMEOUT
+        ttl = jittered_ttl(ttl, settings.CACHE_TTL_JITTER)
+        catalog = {
+            "version": version,
+            "plans": plans,
+            "failed_providers": list(failed_providers),
+            "expires_at": time.time() + ttl,
+            "delta": delta,
+        }
+        payload = {key: value for key, value in catalog.items() if key != "plans"}
+        payload["columns"] = plans.to_dict()
+        stored_ttl = ttl + settings.CACHE_STALE_TTL
+        pipeline = self.redis_client.pipeline()
+        pipeline.setex(CATALOG_KEY, stored_ttl, json.dumps(payload))
+        pipeline.setex(CATALOG_VERSION_KEY, stored_ttl, version)
+        await pipeline.execute()
+        await publish_invalidation(self.redis_client, CATALOG_KEY, CATALOG_VERSION_KEY)
+        local_ttl = min(ttl, settings.LOCAL_CACHE_TTL)
+        plan_cache.set(CATALOG_KEY, catalog, local_ttl)
+        plan_cache.set(CATALOG_VERSION_KEY, version, local_ttl)
+        return catalog
+
+    def rebuild_lease(self) -> RedisLease:
+        return RedisLease(self.redis_client, CATALOG_LOCK_KEY, settings.CACHE_LOCK_TIMEOUT)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from src.core.local_cache import local_caches
+from src.core.metrics import metrics
+from src.core.redis_client import redis_manager
+from src.services.catalog_manager import catalog_manager
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("")
+async def get_health():
+    snapshot = redis_manager.snapshot()
+    snapshot["providers"] = metrics.snapshot(prefix="provider_")
+    snapshot["caches"] = {name: cache.snapshot() for name, cache in local_caches.items()}
+    snapshot["catalog"] = catalog_manager.snapshot()
+    snapshot["status"] = "ok" if snapshot["circuit"]["state"] != "open" else "degraded"
+    return snapshot
@@ -0,0 +1,82 @@
+import logging
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from redis.exceptions import RedisError
+
+from src.core.local_cache import local_caches
+from src.core.metrics import cache_lookups, metrics
+from src.core.redis_client import RedisUnavailableError, read_client, redis_manager
+from src.repositories.order_completion_repository import COMPLETION_DEAD_KEY, COMPLETION_QUEUE_KEY
+from src.repositories.order_repository import order_index_key
+from src.schemas.order import ORDER_STATUSES
+from src.services.payment_dispatcher import payment_dispatcher
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REDIS_CACHES = ("provider_plans", "pricing_plans")
+
+completion_queue_depth = metrics.gauge(
+    "order_completion_queue_depth", "Orders scheduled in the completion queue"
+)
+completion_due = metrics.gauge("order_completion_due", "Scheduled orders whose completion is due")
+completion_dead = metrics.gauge("order_completion_dead_letters", "Orders the completion worker gave up on")
+payment_queue_depth = metrics.gauge(
+    "payment_dispatcher_queue_depth", "Payment confirmations waiting for their batch window"
+)
+payment_in_flight = metrics.gauge(
+    "payment_dispatcher_batches_in_flight", "Payment batches awaiting a provider gateway"
+)
+orders_by_status = {
+    status: metrics.gauge("orders_by_status", "Orders created within the retention window by status", {"status": status})
+    for status in ORDER_STATUSES
+}
+
+
+def hit_ratio(hits: float, misses: float) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def collect_cache_ratios() -> None:
+    for cache in REDIS_CACHES:
+        hits, misses = cache_lookups(cache)
+        metrics.gauge("cache_hit_ratio", "Redis cache hit ratio", {"cache": cache}).set(
+            hit_ratio(hits.value, misses.value)
+        )
+    for name, cache in local_caches.items():
+        metrics.gauge("local_cache_hit_ratio", "L1 cache hit ratio", {"cache": name}).set(
+            hit_ratio(cache.hits.value, cache.misses.value)
+        )
+
+
+async def collect_queue_metrics() -> None:
+    payment_queue_depth.set(payment_dispatcher.depth)
+    payment_in_flight.set(payment_dispatcher.in_flight)
+    try:
+        pipeline = read_client(redis_manager.get_client()).pipeline(transaction=False)
+        pipeline.zcard(COMPLETION_QUEUE_KEY)
+        pipeline.zcount(COMPLETION_QUEUE_KEY, "-inf", time.time())
+        pipeline.zcard(COMPLETION_DEAD_KEY)
+        for status in ORDER_STATUSES:
+            pipeline.zcard(order_index_key(status=status))
+        depth, due, dead, *counts = await pipeline.execute()
+    except (RedisUnavailableError, RedisError) as e:
+        logger.warning(f"Skipping Redis queue metrics: {str(e)}")
+        return
+    completion_queue_depth.set(depth)
+    completion_due.set(due)
+    completion_dead.set(dead)
+    for status, count in zip(ORDER_STATUSES, counts):
+        orders_by_status[status].set(count)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    await collect_queue_metrics()
+    collect_cache_ratios()
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
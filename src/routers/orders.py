@@ -1,8 +1,25 @@
+from datetime import datetime
+from typing import AsyncIterator
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 
-from src.schemas.order import Order, OrderCreate
+from src.core.config import PROVIDER_SET, settings
+from src.core.encoded_response import encode_json
+
+from src.schemas.order import (
+    ORDER_STATUSES,
+    STATUS_SET,
+    Order,
+    OrderBatchCreate,
+    OrderBatchResult,
+    OrderCreate,
+    OrderLookup,
+    OrderLookupResult,
+    OrderPage,
+)
+from src.services.order_events import order_events
 from src.services.order_service import OrderService, get_order_service
 
 router = APIRouter(prefix="/orders", tags=["orders"])
@@ -11,20 +28,103 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 @router.post("", response_model=Order)
 async def create_order(
     order_data: OrderCreate,
-    background_tasks: BackgroundTasks,
     service: OrderService = Depends(get_order_service),
 ):
     try:
-        order = service.create_order(order_data.provider, order_data.storage_gb)
-        background_tasks.add_task(service.complete_order, order.order_id)
+        order = await service.create_order(order_data.provider, order_data.storage_gb)
         return order
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/batch", response_model=OrderBatchResult)
+async def create_orders_batch(
+    batch: OrderBatchCreate, service: OrderService = Depends(get_order_service)
+):
+    results = await service.create_orders(batch.orders)
+    created = sum(1 for result in results if result.order is not None)
+    return OrderBatchResult(created=created, failed=len(results) - created, results=results)
+
+
+@router.post("/lookup", response_model=OrderLookupResult)
+async def lookup_orders(
+    lookup: OrderLookup, service: OrderService = Depends(get_order_service)
+):
+    orders, missing = await service.lookup_orders(lookup.order_ids)
+    return OrderLookupResult(orders=orders, missing=missing)
+
+
+@router.get("", response_model=OrderPage)
+async def list_orders(
+    provider: str | None = Query(None, description="Only orders for this provider"),
+    status: str | None = Query(None, description="Only orders with this status"),
+    created_after: datetime | None = Query(None, description="Created at or after"),
+    created_before: datetime | None = Query(None, description="Created at or before"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=settings.ORDER_PAGE_MAX_SIZE),
+    service: OrderService = Depends(get_order_service),
+):
+    if provider is not None and provider not in PROVIDER_SET:
+        raise HTTPException(
+            status_code=422, detail=f"Provider must be one of {settings.PROVIDERS}"
+        )
+    if status is not None and status not in STATUS_SET:
+        raise HTTPException(status_code=422, detail=f"Status must be one of {ORDER_STATUSES}")
+    try:
+        orders, next_cursor = await service.list_orders(
+            provider, status, created_after, created_before, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OrderPage(orders=orders, next_cursor=next_cursor)
+
+
 @router.get("/{order_id}", response_model=Order)
 async def get_order(order_id: UUID, service: OrderService = Depends(get_order_service)):
-    order = service.get_order(order_id)
+    order = await service.get_order(order_id)
     if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
+
+
+def status_event(order_id: UUID, status: str) -> dict:
+    return {"order_id": str(order_id), "status": status}
+
+
+async def sse_stream(order_id: UUID, service: OrderService) -> AsyncIterator[bytes]:
+    async for status in order_events.follow(order_id, lambda: service.get_order(order_id)):
+        if status is None:
+            yield b": keep-alive\n\n"
+        else:
+            yield b"event: status\ndata: " + encode_json(status_event(order_id, status)) + b"\n\n"
+
+
+@router.get("/{order_id}/events")
+async def order_events_stream(order_id: UUID, service: OrderService = Depends(get_order_service)):
+    if await service.get_order(order_id) is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return StreamingResponse(
+        sse_stream(order_id, service),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{order_id}/ws")
+async def order_events_socket(
+    websocket: WebSocket, order_id: UUID, service: OrderService = Depends(get_order_service)
+):
+    await websocket.accept()
+    if await service.get_order(order_id) is None:
+        await websocket.close(code=4404, reason="Order not found")
+        return
+    try:
+        async for status in order_events.follow(order_id, lambda: service.get_order(order_id)):
+            if status is None:
+                await websocket.send_text('{"event":"heartbeat"}')
+            else:
+                event = {"event": "status", **status_event(order_id, status)}
+                await websocket.send_text(encode_json(event).decode())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -1,8 +1,13 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 
-from src.schemas.pricing_plan import PricingPlan
+from src.core.config import PROVIDER_SET, settings
+from src.core.encoded_response import encoded_response
+from src.core.redis_client import RedisUnavailableError
+from src.schemas.pricing_plan import PlanCombination, PlanQuery, PricingPlan
 from src.services.pricing_plan_service import (
     PricingPlanService,
     get_pricing_plan_service,
@@ -11,19 +16,78 @@ from src.services.pricing_plan_service import (
 router = APIRouter(prefix="/pricing-plans", tags=["pricing-plans"])
 
 
-@router.get("", response_model=List[PricingPlan])
-async def get_pricing_plans(
+def get_plan_query(
     min_storage: int = Query(
         ...,
         description="Minimum storage capacity in GB (must be non-negative)",
         ge=0,
         example=100,
     ),
+    max_budget: float | None = Query(None, gt=0, description="Maximum total plan cost"),
+    min_price: float | None = Query(None, ge=0, description="Minimum price per GB"),
+    max_price: float | None = Query(None, gt=0, description="Maximum price per GB"),
+    providers: List[str] | None = Query(None, description="Restrict to these providers"),
+    limit: int | None = Query(None, ge=1, description="Return only the N cheapest plans"),
+) -> PlanQuery:
+    try:
+        return PlanQuery(
+            min_storage=min_storage,
+            max_budget=max_budget,
+            min_price=min_price,
+            max_price=max_price,
+            providers=providers,
+            limit=limit,
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+@router.get("", response_model=List[PricingPlan])
+async def get_pricing_plans(
+    request: Request,
+    query: PlanQuery = Depends(get_plan_query),
     service: PricingPlanService = Depends(get_pricing_plan_service),
 ):
     try:
-        return service.get_filtered_and_sorted_plans(min_storage)
+        encoded = await service.get_encoded_plans(query)
+    except (HTTPException, RedisUnavailableError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch pricing plans: {str(e)}"
         )
+    return encoded_response(request, encoded)
+
+
+@router.get("/optimize", response_model=PlanCombination)
+async def optimize_pricing_plans(
+    required_gb: int = Query(
+        ...,
+        description="Storage capacity to cover in GB",
+        ge=1,
+        le=settings.OPTIMIZE_MAX_REQUIRED_GB,
+        example=5000,
+    ),
+    provider: str | None = Query(None, description="Only combine plans from this provider"),
+    max_plans: int | None = Query(
+        None, ge=1, le=settings.OPTIMIZE_MAX_PLANS, description="Maximum number of plan units"
+    ),
+    service: PricingPlanService = Depends(get_pricing_plan_service),
+):
+    if provider is not None and provider not in PROVIDER_SET:
+        raise HTTPException(
+            status_code=422, detail=f"Provider must be one of {settings.PROVIDERS}"
+        )
+    try:
+        combination = await service.optimize_plans(required_gb, provider, max_plans)
+    except (HTTPException, RedisUnavailableError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to optimize pricing plans: {str(e)}"
+        )
+    if combination is None:
+        raise HTTPException(
+            status_code=404, detail=f"No combination of plans covers {required_gb} GB"
+        )
+    return combination
@@ -1,21 +1,28 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 
-from src.core.config import settings
+from src.core.config import PROVIDER_SET, settings
+
+ORDER_STATUSES = ["payment_pending", "pending", "completed", "failed"]
+STATUS_SET = frozenset(ORDER_STATUSES)
 
 
 class BaseOrder(BaseModel):
     provider: str = Field(..., description="Storage provider name")
     storage_gb: int = Field(..., description="Storage capacity in GB")
 
-    @validator("provider")
+    @field_validator("provider")
+    @classmethod
     def validate_provider(cls, v):
-        if v not in settings.PROVIDERS:
+        if v not in PROVIDER_SET:
             raise ValueError(f"Provider must be one of {settings.PROVIDERS}")
         return v
 
-    @validator("storage_gb")
+    @field_validator("storage_gb")
+    @classmethod
     def validate_storage_gb(cls, v):
         if v <= 0:
             raise ValueError("Storage GB must be positive")
@@ -24,17 +31,80 @@ class BaseOrder(BaseModel):
 
 class Order(BaseOrder):
     order_id: UUID = Field(..., description="Unique order identifier")
-    status: str = Field(..., description="Order status (pending or completed)")
+    status: str = Field(
+        ..., description="Order status (payment_pending, pending, completed or failed)"
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Order creation time (UTC)",
+    )
 
-    @validator("status")
+    @field_validator("status")
+    @classmethod
     def validate_status(cls, v):
-        if v not in ["pending", "completed"]:
-            raise ValueError("Status must be 'pending' or 'completed'")
+        if v not in STATUS_SET:
+            raise ValueError(f"Status must be one of {ORDER_STATUSES}")
         return v
 
-    class Config:
-        json_encoders = {UUID: str}
+    @classmethod
+    def trusted(
+        cls,
+        order_id: UUID,
+        provider: str,
+        storage_gb: int,
+        status: str,
+        created_at: datetime | None = None,
+    ) -> "Order":
+        return cls.model_construct(
+            provider=provider,
+            storage_gb=storage_gb,
+            order_id=order_id,
+            status=status,
+            created_at=created_at or datetime.now(timezone.utc),
+        )
 
 
 class OrderCreate(BaseOrder):
     pass
+
+
+class OrderBatchCreate(BaseModel):
+    orders: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.ORDER_BATCH_MAX_SIZE,
+        description="Orders to create, each with the same fields as POST /orders",
+    )
+
+
+class OrderLookup(BaseModel):
+    order_ids: List[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.ORDER_LOOKUP_MAX_IDS,
+        description="Order identifiers to fetch",
+    )
+
+
+class OrderLookupResult(BaseModel):
+    orders: List[Order]
+    missing: List[UUID] = Field(..., description="Requested identifiers that were not found")
+
+
+class OrderPage(BaseModel):
+    orders: List[Order]
+    next_cursor: str | None = Field(
+        default=None, description="Cursor for the next page, absent on the last page"
+    )
+
+
+class OrderBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    order: Order | None = Field(default=None, description="Created order")
+    error: str | None = Field(default=None, description="Why the item was rejected")
+
+
+class OrderBatchResult(BaseModel):
+    created: int = Field(..., description="Number of orders created")
+    failed: int = Field(..., description="Number of items rejected")
+    results: List[OrderBatchItemResult]
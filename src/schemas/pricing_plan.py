@@ -1,6 +1,14 @@
-from pydantic import BaseModel, Field, validator
+from typing import List, NamedTuple
 
-from src.core.config import settings
+from pydantic import BaseModel, Field, field_validator
+
+from src.core.config import PROVIDER_SET, settings
+
+
+class PlanRecord(NamedTuple):
+    provider: str
+    storage_gb: int
+    price_per_gb: float
 
 
 class PricingPlan(BaseModel):
@@ -8,20 +16,68 @@ class PricingPlan(BaseModel):
     storage_gb: int = Field(..., description="Storage capacity in GB")
     price_per_gb: float = Field(..., description="Price per GB of storage")
 
-    @validator("provider")
+    @field_validator("provider")
+    @classmethod
     def validate_provider(cls, v):
-        if v not in settings.PROVIDERS:
+        if v not in PROVIDER_SET:
             raise ValueError(f"Provider must be one of {settings.PROVIDERS}")
         return v
 
-    @validator("storage_gb")
+    @field_validator("storage_gb")
+    @classmethod
     def validate_storage_gb(cls, v):
         if v <= 0:
             raise ValueError("Storage GB must be positive")
         return v
 
-    @validator("price_per_gb")
+    @field_validator("price_per_gb")
+    @classmethod
     def validate_price_per_gb(cls, v):
         if v <= 0:
             raise ValueError("Price per GB must be positive")
         return v
+
+    @classmethod
+    def trusted(cls, provider: str, storage_gb: int, price_per_gb: float) -> "PricingPlan":
+        return cls.model_construct(provider=provider, storage_gb=storage_gb, price_per_gb=price_per_gb)
+
+
+class PlanQuery(BaseModel):
+    min_storage: int = Field(default=0, ge=0, description="Minimum storage capacity in GB")
+    max_budget: float | None = Field(default=None, gt=0, description="Maximum total plan cost")
+    min_price: float | None = Field(default=None, ge=0, description="Minimum price per GB")
+    max_price: float | None = Field(default=None, gt=0, description="Maximum price per GB")
+    providers: List[str] | None = Field(default=None, description="Restrict to these providers")
+    limit: int | None = Field(default=None, ge=1, description="Return only the N cheapest plans")
+
+    @field_validator("providers")
+    @classmethod
+    def validate_providers(cls, v):
+        if v is not None:
+            unknown = sorted(set(v) - PROVIDER_SET)
+            if unknown:
+                raise ValueError(f"Unknown providers {unknown}; must be among {settings.PROVIDERS}")
+        return v
+
+    @property
+    def is_threshold_only(self) -> bool:
+        return (
+            self.max_budget is None
+            and self.min_price is None
+            and self.max_price is None
+            and self.providers is None
+            and self.limit is None
+        )
+
+
+class PlanSelection(BaseModel):
+    plan: PricingPlan = Field(..., description="Selected pricing plan")
+    quantity: int = Field(..., ge=1, description="Number of units of the plan")
+
+
+class PlanCombination(BaseModel):
+    required_gb: int = Field(..., description="Requested storage capacity in GB")
+    total_storage_gb: int = Field(..., description="Storage provided by the combination in GB")
+    total_cost: float = Field(..., description="Total cost of the combination")
+    plan_count: int = Field(..., description="Number of plan units in the combination")
+    plans: List[PlanSelection] = Field(..., description="Selected plans with quantities")
@@ -0,0 +1,59 @@
+import argparse
+import importlib.util
+import logging
+import os
+from typing import Any, Dict, List
+
+import uvicorn
+
+from src.core.config import settings
+from src.core.log_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers() -> int:
+    return settings.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": "uvloop" if available("uvloop") else "asyncio",
+        "http": "httptools" if available("httptools") else "h11",
+        "lifespan": "on",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEP_ALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        "access_log": args.access_log,
+        "log_level": settings.LOG_LEVEL.lower(),
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Cloud Storage Marketplace API")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    configure_logging()
+    options = server_options(parse_args(argv))
+    logger.info(
+        f"Starting {options['workers']} workers on {options['host']}:{options['port']} "
+        f"(loop={options['loop']}, http={options['http']})"
+    )
+    uvicorn.run("main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
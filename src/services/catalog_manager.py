@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from redis.asyncio import Redis
+
+from src.clients.base_provider import BaseProviderClient
+from src.clients.catalog_loader import PlanColumns
+from src.clients.provider_client import provider_registry
+from src.core.config import settings
+from src.core.local_cache import plan_cache, publish_invalidation
+from src.core.metrics import metrics
+from src.core.redis_client import cross_slot_pipeline
+from src.repositories.pricing_plan_repository import CATALOG_VERSION_KEY, PricingPlanRepository
+from src.services.catalog_snapshot import CatalogSnapshot, load_snapshot, write_snapshot
+from src.services.plan_index import PlanIndexStore, catalog_version, plan_index_store
+from src.services.plan_table import PlanTable
+
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+catalog_reloads = metrics.counter(
+    "catalog_reloads_total", "Catalog versions published by the catalog manager"
+)
+catalog_reload_seconds = metrics.histogram(
+    "catalog_reload_seconds", "Time to rescan, rebuild and publish the provider catalog"
+)
+
+
+def file_digest(path, buffer_size: int = settings.CATALOG_READ_BUFFER_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(buffer_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProviderCatalogFile:
+    def __init__(self, client: BaseProviderClient):
+        self.client = client
+        self.path = client.file_path
+        self.signature: Tuple[int, int] | None = None
+        self.content_hash: str | None = None
+        self.columns: PlanColumns | None = None
+
+    def refresh(self, force: bool = False) -> bool:
+        stat = self.path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature and not force:
+            return False
+        content_hash = file_digest(self.path)
+        if content_hash == self.content_hash and self.columns is not None:
+            self.signature = signature
+            return False
+        self.columns = self.client.load_plan_columns()
+        self.content_hash = content_hash
+        self.signature = signature
+        return True
+
+    def seed(self, snapshot: CatalogSnapshot) -> bool:
+        entry = snapshot.files.get(self.client.name)
+        if entry is None or entry["path"] != str(self.path):
+            return False
+        self.signature = tuple(entry["signature"])
+        self.content_hash = entry["content_hash"]
+        self.columns = snapshot.columns(self.client.name)
+        return True
+
+    def snapshot_entry(self, start: int) -> Dict[str, Any]:
+        return {
+            "name": self.client.name,
+            "path": str(self.path),
+            "signature": list(self.signature),
+            "content_hash": self.content_hash,
+            "start": start,
+            "stop": start + len(self.columns),
+        }
+
+
+def build_snapshot(path: str | Path, clients: Sequence[BaseProviderClient]) -> CatalogSnapshot:
+    files = [ProviderCatalogFile(client) for client in clients]
+    entries = []
+    rows = 0
+    for catalog_file in files:
+        catalog_file.refresh(force=True)
+        entries.append(catalog_file.snapshot_entry(rows))
+        rows += len(catalog_file.columns)
+    columns = PlanColumns.concat(catalog_file.columns for catalog_file in files)
+    write_snapshot(path, catalog_version(columns), PlanTable.from_columns(columns), entries)
+    return load_snapshot(path)
+
+
+class CatalogManager:
+    def __init__(
+        self,
+        index_store: PlanIndexStore = plan_index_store,
+        poll_interval: float = settings.CATALOG_POLL_INTERVAL,
+    ):
+        self.index_store = index_store
+        self.poll_interval = poll_interval
+        self.files: List[ProviderCatalogFile] = []
+        self.redis_client: Redis | None = None
+        self.version: str | None = None
+        self.loaded_at: datetime | None = None
+        self.reload_seconds: float | None = None
+        self.source: str | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._sync_task: asyncio.Task | None = None
+
+    async def start(
+        self,
+        redis_client: Redis,
+        clients: Sequence[BaseProviderClient] | None = None,
+        snapshot_path: str = settings.CATALOG_SNAPSHOT_PATH,
+    ) -> None:
+        self.redis_client = redis_client
+        if clients is None:
+            clients = provider_registry.file_clients()
+        self.files = [ProviderCatalogFile(client) for client in clients]
+        snapshot = load_snapshot(snapshot_path) if snapshot_path else None
+        if snapshot is not None:
+            await self.warm_start(snapshot)
+        else:
+            await self.reload(force=True)
+        if settings.CATALOG_WATCH:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._sync_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._sync_task = None
+
+    @property
+    def watcher(self) -> str:
+        if not settings.CATALOG_WATCH:
+            return "disabled"
+        return "inotify" if awatch is not None else "polling"
+
+    def _refresh_files(self, force: bool) -> List[ProviderCatalogFile]:
+        changed = []
+        for catalog_file in self.files:
+            try:
+                if catalog_file.refresh(force):
+                    changed.append(catalog_file)
+            except (OSError, ValueError) as e:
+                logger.error(f"Keeping previous catalog for provider {catalog_file.client.name}: {str(e)}")
+        return changed
+
+    async def reload(self, force: bool = False) -> bool:
+        async with self._lock:
+            started = time.perf_counter()
+            changed = await asyncio.to_thread(self._refresh_files, force)
+            if not changed and self.version is not None:
+                return False
+            await self._publish(changed, started)
+            return True
+
+    async def warm_start(self, snapshot: CatalogSnapshot) -> None:
+        async with self._lock:
+            started = time.perf_counter()
+            seeded = [catalog_file.seed(snapshot) for catalog_file in self.files]
+            changed = await asyncio.to_thread(self._refresh_files, False)
+            if changed or not all(seeded) or len(self.files) != len(snapshot.files):
+                logger.info(f"Catalog snapshot {snapshot.version} is stale, rebuilding from provider files")
+                await self._publish(changed, started)
+                return
+
+            self.index_store.rebuild(snapshot.version, snapshot.table)
+            for catalog_file in self.files:
+                plan_cache.set(catalog_file.client.cache_key, catalog_file.columns)
+            plan_cache.set(CATALOG_VERSION_KEY, snapshot.version)
+            self._loaded(snapshot.version, started, "snapshot", len(snapshot.table))
+            self._sync_task = asyncio.create_task(self._sync_redis(snapshot.version))
+
+    async def _sync_redis(self, version: str) -> None:
+        repository = PricingPlanRepository(self.redis_client)
+        lease = repository.rebuild_lease()
+        try:
+            async with self._lock:
+                if self.version != version or await self.redis_client.get(CATALOG_VERSION_KEY) == version:
+                    return
+                if not await lease.acquire():
+                    return
+                try:
+                    pipeline = cross_slot_pipeline(self.redis_client)
+                    for catalog_file in self.files:
+                        catalog_file.client.stage_columns(pipeline, catalog_file.columns)
+                    await pipeline.execute()
+                    columns = PlanColumns.concat(catalog_file.columns for catalog_file in self.files)
+                    await repository.cache_catalog(version, columns)
+                finally:
+                    await lease.release()
+                logger.info(f"Published snapshot catalog {version} to Redis")
+        except Exception as e:
+            logger.error(f"Publishing snapshot catalog failed: {str(e)}")
+
+    async def _publish(self, changed: List[ProviderCatalogFile], started: float) -> None:
+        columns = PlanColumns.concat(
+            catalog_file.columns for catalog_file in self.files if catalog_file.columns is not None
+        )
+        failed = [
+            catalog_file.client.name for catalog_file in self.files if catalog_file.columns is None
+        ]
+        version = catalog_version(columns)
+
+        if changed:
+            pipeline = cross_slot_pipeline(self.redis_client)
+            for catalog_file in changed:
+                catalog_file.client.stage_columns(pipeline, catalog_file.columns)
+            await pipeline.execute()
+            keys = [catalog_file.client.cache_key for catalog_file in changed]
+            await publish_invalidation(self.redis_client, *keys)
+            for catalog_file in changed:
+                plan_cache.set(catalog_file.client.cache_key, catalog_file.columns)
+
+        elapsed = time.perf_counter() - started
+        catalog = await PricingPlanRepository(self.redis_client).cache_catalog(
+            version, columns, failed, elapsed
+        )
+        self.index_store.rebuild(**catalog)
+        self._loaded(version, started, "files", len(columns))
+
+    def _loaded(self, version: str, started: float, source: str, rows: int) -> None:
+        previous, self.version = self.version, version
+        self.source = source
+        self.reload_seconds = time.perf_counter() - started
+        self.loaded_at = datetime.now(timezone.utc)
+        catalog_reloads.inc()
+        catalog_reload_seconds.observe(self.reload_seconds)
+        logger.info(
+            f"Published catalog {version} from {source} ({rows} plans, was {previous}) "
+            f"in {self.reload_seconds * 1000:.1f} ms"
+        )
+
+    async def _reload_safely(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Catalog reload failed: {str(e)}")
+
+    async def _watch(self) -> None:
+        if awatch is not None:
+            directories = {str(catalog_file.path.parent) for catalog_file in self.files}
+            async for _ in awatch(*directories):
+                await self._reload_safely()
+        else:
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                await self._reload_safely()
+
+    def snapshot(self) -> dict:
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "reload_seconds": self.reload_seconds,
+            "source": self.source,
+            "reloads": catalog_reloads.value,
+            "watcher": self.watcher,
+            "providers": {
+                catalog_file.client.name: {
+                    "content_hash": catalog_file.content_hash,
+                    "rows": len(catalog_file.columns) if catalog_file.columns is not None else None,
+                }
+                for catalog_file in self.files
+            },
+        }
+
+
+catalog_manager = CatalogManager()
@@ -0,0 +1,100 @@
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.clients.catalog_loader import PlanColumns
+from src.services.plan_table import PlanTable
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"PLANSNAP"
+SNAPSHOT_FORMAT = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct("<8sII")
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class CatalogSnapshot:
+    def __init__(self, path: Path, header: Dict[str, Any], buffer: mmap.mmap, data_offset: int):
+        self.path = path
+        self.version: str = header["version"]
+        self.files: Dict[str, Dict[str, Any]] = {entry["name"]: entry for entry in header["files"]}
+        self.nbytes = len(buffer)
+        arrays = {
+            name: np.frombuffer(
+                buffer, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=data_offset + spec["offset"]
+            )
+            for name, spec in header["arrays"].items()
+        }
+        self.table = PlanTable.from_arrays(header["providers"], arrays)
+
+    def columns(self, name: str) -> PlanColumns:
+        entry = self.files[name]
+        rows = slice(entry["start"], entry["stop"])
+        return PlanColumns(
+            self.table.providers,
+            memoryview(self.table.provider_ids[rows]),
+            memoryview(self.table.storage_gb[rows]),
+            memoryview(self.table.price_per_gb[rows]),
+        )
+
+
+def write_snapshot(path: str | Path, version: str, table: PlanTable, files: List[Dict[str, Any]]) -> int:
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(array) for name, array in table.arrays().items()}
+    layout = {}
+    size = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "offset": size, "length": len(array)}
+        size = aligned(size + array.nbytes)
+    header = json.dumps(
+        {"version": version, "providers": list(table.providers), "files": files, "arrays": layout},
+        separators=(",", ":"),
+    ).encode()
+    data_offset = aligned(PREAMBLE.size + len(header))
+
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_offset + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_offset + size)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return data_offset + size
+
+
+def load_snapshot(path: str | Path) -> CatalogSnapshot | None:
+    path = Path(path)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring unreadable catalog snapshot {path}: {str(e)}")
+        return None
+    try:
+        magic, snapshot_format, header_length = PREAMBLE.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC or snapshot_format != SNAPSHOT_FORMAT:
+            raise ValueError(f"unsupported snapshot format {snapshot_format}")
+        header = json.loads(buffer[PREAMBLE.size:PREAMBLE.size + header_length])
+        snapshot = CatalogSnapshot(path, header, buffer, aligned(PREAMBLE.size + header_length))
+    except (struct.error, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Ignoring unreadable catalog snapshot {path}: {str(e)}")
+        return None
+    if hasattr(mmap, "MADV_WILLNEED"):
+        buffer.madvise(mmap.MADV_WILLNEED)
+    return snapshot
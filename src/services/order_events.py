@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Set
+from uuid import UUID
+
+import redis.asyncio as redis
+from redis.asyncio import Redis
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.schemas.order import Order
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+RESYNC = None
+
+watcher_count = metrics.gauge("order_event_watchers", "Clients watching order status in this worker")
+events_received = metrics.counter(
+    "order_events_received_total", "Order status events received over pub/sub"
+)
+events_delivered = metrics.counter(
+    "order_events_delivered_total", "Order status events pushed to local watchers"
+)
+
+
+class OrderWatcher:
+    __slots__ = ("order_id", "updates", "changed")
+
+    def __init__(self, order_id: str):
+        self.order_id = order_id
+        self.updates: List[str | None] = []
+        self.changed = asyncio.Event()
+
+    def push(self, status: str | None) -> None:
+        self.updates.append(status)
+        self.changed.set()
+
+    async def next(self, timeout: float) -> List[str | None]:
+        if not self.updates:
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        updates, self.updates = self.updates, []
+        self.changed.clear()
+        return updates
+
+
+class OrderEventHub:
+    def __init__(self):
+        self._watchers: Dict[str, Set[OrderWatcher]] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self, redis_client: Redis) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(redis_client))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def watching(self) -> int:
+        return sum(len(watchers) for watchers in self._watchers.values())
+
+    @contextmanager
+    def watch(self, order_id: UUID | str) -> Iterator[OrderWatcher]:
+        key = str(order_id)
+        watcher = OrderWatcher(key)
+        self._watchers.setdefault(key, set()).add(watcher)
+        watcher_count.inc()
+        try:
+            yield watcher
+        finally:
+            watcher_count.dec()
+            watchers = self._watchers[key]
+            watchers.discard(watcher)
+            if not watchers:
+                del self._watchers[key]
+
+    def dispatch(self, data: str) -> None:
+        order_id, _, status = data.partition(" ")
+        events_received.inc()
+        watchers = self._watchers.get(order_id)
+        if watchers:
+            for watcher in watchers:
+                watcher.push(status)
+            events_delivered.inc(len(watchers))
+
+    def resync(self) -> None:
+        for watchers in self._watchers.values():
+            for watcher in watchers:
+                watcher.push(RESYNC)
+
+    async def follow(
+        self,
+        order_id: UUID,
+        fetch: Callable[[], Awaitable[Order | None]],
+        heartbeat: float = settings.ORDER_EVENTS_HEARTBEAT,
+    ) -> AsyncIterator[str | None]:
+        with self.watch(order_id) as watcher:
+            status = None
+            updates: List[str | None] = [RESYNC]
+            while True:
+                for update in updates:
+                    if update is RESYNC:
+                        order = await fetch()
+                        if order is None:
+                            return
+                        update = order.status
+                    if update != status:
+                        status = update
+                        yield status
+                    if status in TERMINAL_STATUSES:
+                        return
+                updates = await watcher.next(heartbeat)
+                if not updates:
+                    yield None
+
+    async def _listen(self, redis_client: Redis) -> None:
+        recovering = False
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.ORDER_EVENTS_CHANNEL)
+                if recovering:
+                    self.resync()
+                    recovering = False
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        data = message["data"]
+                        self.dispatch(data.decode() if isinstance(data, bytes) else data)
+            except redis.RedisError as e:
+                logger.error(f"Order event listener failed: {str(e)}")
+                recovering = True
+                await asyncio.sleep(settings.REDIS_RETRY_DELAY)
+            finally:
+                await pubsub.aclose()
+
+
+order_events = OrderEventHub()
@@ -1,14 +1,19 @@
-import asyncio
 import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Tuple
 from uuid import UUID, uuid4
 
 from fastapi import Depends
+from pydantic import ValidationError
 
-from src.clients.provider_client import ProviderClient, get_provider_clients_with_dict
+from src.clients.base_provider import BaseProviderClient
+from src.clients.provider_client import get_provider_clients_with_dict
+from src.core.config import settings
 from src.repositories.order_repository import OrderRepository
-from src.schemas.order import Order
+from src.schemas.order import Order, OrderBatchItemResult, OrderCreate
+from src.services.payment_dispatcher import PaymentDispatcher, payment_dispatcher
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -16,12 +21,14 @@ class OrderService:
     def __init__(
         self,
         order_repository: OrderRepository,
-        provider_clients: dict[str, ProviderClient],
+        provider_clients: Mapping[str, BaseProviderClient],
+        payments: PaymentDispatcher = payment_dispatcher,
     ):
         self.order_repository = order_repository
         self.provider_clients = provider_clients
+        self.payments = payments
 
-    def create_order(self, provider: str, storage_gb: int) -> Order:
+    async def create_order(self, provider: str, storage_gb: int) -> Order:
         if provider not in self.provider_clients:
             raise ValueError(f"Invalid provider: {provider}")
         order_id = uuid4()
@@ -29,28 +36,96 @@ class OrderService:
             order_id=order_id,
             provider=provider,
             storage_gb=storage_gb,
-            status="pending",
+            status="payment_pending",
         )
-        self.order_repository.save_order(order)
-        self.provider_clients[provider].confirm_payment(order_id)
+        await self.order_repository.save_order(
+            order, complete_at=time.time() + settings.ORDER_COMPLETION_DELAY
+        )
+        self.payments.submit(order.model_copy())
         logger.info(f"Created order {order_id} for provider {provider}")
         return order
 
-    def get_order(self, order_id: UUID) -> Order | None:
-        return self.order_repository.get_order(order_id)
+    async def create_orders(self, items: List[Dict[str, Any]]) -> List[OrderBatchItemResult]:
+        results: Dict[int, OrderBatchItemResult] = {}
+        orders: Dict[int, Order] = {}
+        for index, item in enumerate(items):
+            try:
+                order_data = OrderCreate(**item)
+                if order_data.provider not in self.provider_clients:
+                    raise ValueError(f"Invalid provider: {order_data.provider}")
+            except ValidationError as e:
+                results[index] = OrderBatchItemResult(index=index, error=validation_message(e))
+                continue
+            except ValueError as e:
+                results[index] = OrderBatchItemResult(index=index, error=str(e))
+                continue
+            orders[index] = Order.trusted(
+                order_id=uuid4(),
+                provider=order_data.provider,
+                storage_gb=order_data.storage_gb,
+                status="payment_pending",
+            )
+
+        await self.order_repository.save_orders(
+            list(orders.values()), complete_at=time.time() + settings.ORDER_COMPLETION_DELAY
+        )
+        for index, order in orders.items():
+            self.payments.submit(order.model_copy())
+            results[index] = OrderBatchItemResult(index=index, order=order)
+
+        logger.info(f"Created {len(orders)} of {len(items)} batch orders")
+        return [results[index] for index in range(len(items))]
+
+    async def get_order(self, order_id: UUID) -> Order | None:
+        return await self.order_repository.get_order(order_id, trusted=True)
+
+    async def lookup_orders(
+        self, order_ids: List[UUID], chunk_size: int = 1000
+    ) -> Tuple[List[Order], List[UUID]]:
+        found: List[Order] = []
+        missing: List[UUID] = []
+        for start in range(0, len(order_ids), chunk_size):
+            chunk = order_ids[start:start + chunk_size]
+            orders = await self.order_repository.get_orders(chunk, trusted=True)
+            for order_id, order in zip(chunk, orders):
+                if order is None:
+                    missing.append(order_id)
+                else:
+                    found.append(order)
+        return found, missing
+
+    async def list_orders(
+        self,
+        provider: str | None = None,
+        status: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[Order], str | None]:
+        if provider is not None and provider not in self.provider_clients:
+            raise ValueError(f"Invalid provider: {provider}")
+        return await self.order_repository.list_orders(
+            provider, status, created_after, created_before, cursor, limit
+        )
 
     async def complete_order(self, order_id: UUID) -> None:
-        await asyncio.sleep(30)
-        order = self.order_repository.get_order(order_id)
+        order = await self.order_repository.get_order(order_id)
         if order:
             order.status = "completed"
-            self.order_repository.update_order(order)
+            await self.order_repository.update_order(order)
             logger.info(f"Completed order {order_id}")
 
 
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
 def get_order_service(
     order_repository: OrderRepository = Depends(),
-    provider_clients: dict[str, ProviderClient] = Depends(
+    provider_clients: Mapping[str, BaseProviderClient] = Depends(
         get_provider_clients_with_dict
     ),
 ):
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Mapping, Set, Tuple
+
+from redis.asyncio import Redis
+
+from src.clients.base_provider import BaseProviderClient
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.repositories.order_repository import OrderRepository
+from src.repositories.payment_repository import PaymentRepository
+from src.schemas.order import Order
+
+logger = logging.getLogger(__name__)
+
+payment_batches = metrics.counter(
+    "payment_batches_total", "Batched payment confirmation calls sent to providers"
+)
+payment_gateway_seconds = metrics.histogram(
+    "payment_gateway_seconds", "Provider payment gateway latency per batch"
+)
+payment_outcomes = {
+    outcome: metrics.counter(
+        "payment_confirmations_total", "Payment confirmations by outcome", {"outcome": outcome}
+    )
+    for outcome in ("confirmed", "declined", "unresolved")
+}
+
+Pending = Tuple[Order, asyncio.Future]
+
+
+def outcome_name(outcome: bool | None) -> str:
+    if outcome is None:
+        return "unresolved"
+    return "confirmed" if outcome else "declined"
+
+
+class PaymentDispatcher:
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        clients: Mapping[str, BaseProviderClient] | None = None,
+        window: float = settings.PAYMENT_BATCH_WINDOW,
+        max_batch_size: int = settings.PAYMENT_BATCH_MAX_SIZE,
+        timeout: float = settings.PAYMENT_TIMEOUT,
+    ):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.clients: Mapping[str, BaseProviderClient] = {}
+        self.order_repository: OrderRepository | None = None
+        self.payment_repository: PaymentRepository | None = None
+        self._queues: Dict[str, List[Pending]] = defaultdict(list)
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        if redis_client is not None:
+            self.start(redis_client, clients or {})
+
+    def start(self, redis_client: Redis, clients: Mapping[str, BaseProviderClient]) -> None:
+        self.clients = clients
+        self.order_repository = OrderRepository(redis_client)
+        self.payment_repository = PaymentRepository(redis_client)
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, order: Order) -> asyncio.Future:
+        if self.payment_repository is None:
+            raise RuntimeError("Payment dispatcher is not started")
+        if order.provider not in self.clients:
+            raise ValueError(f"Invalid provider: {order.provider}")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues[order.provider]
+        queue.append((order, future))
+        if len(queue) >= self.max_batch_size:
+            self._flush(order.provider)
+        elif order.provider not in self._timers:
+            self._timers[order.provider] = loop.call_later(self.window, self._flush, order.provider)
+        return future
+
+    def _flush(self, provider: str) -> None:
+        timer = self._timers.pop(provider, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._queues.pop(provider, None)
+        if not batch:
+            return
+        task = asyncio.create_task(self._dispatch(provider, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, provider: str, batch: List[Pending]) -> None:
+        orders = [order for order, _ in batch]
+        try:
+            outcomes = await self.confirm(provider, orders)
+            await self.order_repository.update_statuses(
+                [order for order, outcome in zip(orders, outcomes) if outcome is not None]
+            )
+        except Exception as e:
+            logger.error(f"Failed to confirm {len(orders)} payments for provider {provider}: {str(e)}")
+            outcomes = [None] * len(orders)
+        for (_, future), outcome in zip(batch, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+    async def confirm(self, provider: str, orders: List[Order]) -> List[bool | None]:
+        reserved = await self.payment_repository.reserve([order.order_id for order in orders])
+        outcomes: List[bool | None] = [result for _, result in reserved]
+        unsent = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        if unsent:
+            payments = [(orders[i].order_id, reserved[i][0]) for i in unsent]
+            started = time.perf_counter()
+            try:
+                confirmed = await asyncio.wait_for(
+                    self.clients[provider].confirm_payments(payments), self.timeout
+                )
+            except Exception as e:
+                logger.error(
+                    f"Payment gateway of provider {provider} failed for {len(payments)} orders: "
+                    f"{str(e) or type(e).__name__}"
+                )
+                confirmed = [None] * len(payments)
+            payment_gateway_seconds.observe(time.perf_counter() - started)
+            payment_batches.inc()
+            results = {}
+            for i, result in zip(unsent, confirmed):
+                outcomes[i] = None if result is None else bool(result)
+                if outcomes[i] is not None:
+                    results[str(orders[i].order_id)] = outcomes[i]
+            await self.payment_repository.record(results)
+
+        for order, outcome in zip(orders, outcomes):
+            payment_outcomes[outcome_name(outcome)].inc()
+            if outcome is not None:
+                order.status = "pending" if outcome else "failed"
+        return outcomes
+
+    async def drain(self) -> None:
+        for provider in list(self._queues):
+            self._flush(provider)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def stop(self) -> None:
+        await self.drain()
+
+
+payment_dispatcher = PaymentDispatcher()
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from src.clients.catalog_loader import PlanColumns
+from src.core.config import settings
+from src.core.local_cache import MISSING, LocalCache
+from src.core.encoded_response import EncodedBody, encode_json
+from src.schemas.pricing_plan import PlanQuery, PricingPlan
+from src.services.plan_optimizer import PlanOptimizer
+from src.services.plan_table import PlanTable
+
+
+def catalog_version(plans: Sequence[PricingPlan] | PlanColumns) -> str:
+    if not isinstance(plans, PlanColumns):
+        plans = PlanColumns.from_plans(plans)
+    return plans.digest()
+
+
+class PlanIndex:
+    def __init__(
+        self,
+        version: str,
+        plans: Sequence[PricingPlan] | PlanColumns | PlanTable,
+        failed_providers: Sequence[str] = (),
+        expires_at: float = float("inf"),
+        delta: float = 0.0,
+    ):
+        self.version = version
+        self.table = plans if isinstance(plans, PlanTable) else PlanTable.from_plans(plans)
+        self.failed_providers = tuple(failed_providers)
+        self.expires_at = expires_at
+        self.delta = delta
+        self._encoded = LocalCache("plan_bodies", settings.PLAN_BODY_CACHE_SIZE, float("inf"))
+        self._optimizer: PlanOptimizer | None = None
+
+    @property
+    def optimizer(self) -> PlanOptimizer:
+        if self._optimizer is None:
+            self._optimizer = PlanOptimizer(self.table)
+        return self._optimizer
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def position(self, min_storage: int) -> int:
+        return self.table.position(min_storage)
+
+    def query(self, min_storage: int) -> List[PricingPlan]:
+        return self.table.plans(self.table.cheapest_from(self.position(min_storage)))
+
+    def search(self, query: PlanQuery) -> List[PricingPlan]:
+        return self.table.plans(self.table.select(query))
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.failed_providers:
+            return {}
+        return {
+            "X-Partial-Results": "true",
+            "X-Failed-Providers": ",".join(self.failed_providers),
+        }
+
+    def encoded(self, min_storage: int) -> EncodedBody:
+        position = self.position(min_storage)
+        encoded = self._encoded.get(position)
+        if encoded is MISSING:
+            body = encode_json(self.table.records(self.table.cheapest_from(position)))
+            encoded = EncodedBody(
+                f'W/"{self.version[:16]}-{position}"', body, headers=self._headers()
+            )
+            self._encoded.set(position, encoded)
+        return encoded
+
+    def encoded_search(self, query: PlanQuery) -> EncodedBody:
+        if query.is_threshold_only:
+            return self.encoded(query.min_storage)
+        body = encode_json(self.table.records(self.table.select(query)))
+        query_hash = hashlib.sha1(query.model_dump_json().encode()).hexdigest()[:12]
+        return EncodedBody(
+            f'W/"{self.version[:16]}-{query_hash}"', body, headers=self._headers()
+        )
+
+
+class PlanIndexStore:
+    def __init__(self):
+        self._index: Optional[PlanIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[PlanIndex]:
+        return self._index
+
+    def get(self, version: str | None) -> Optional[PlanIndex]:
+        index = self._index
+        if version is not None and index is not None and index.version == version:
+            return index
+        return None
+
+    def rebuild(
+        self,
+        version: str,
+        plans: Sequence[PricingPlan] | PlanColumns | PlanTable,
+        failed_providers: Sequence[str] = (),
+        expires_at: float = float("inf"),
+        delta: float = 0.0,
+    ) -> PlanIndex:
+        with self._lock:
+            index = self.get(version)
+            if index is None:
+                index = PlanIndex(version, plans, failed_providers, expires_at, delta)
+                self._index = index
+            else:
+                index.expires_at = expires_at
+                index.delta = delta
+            return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+
+
+plan_index_store = PlanIndexStore()
@@ -0,0 +1,238 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.core.config import settings
+from src.core.local_cache import MISSING
+from src.schemas.pricing_plan import PlanCombination, PlanSelection
+from src.services.plan_table import PlanTable
+
+Solution = Tuple[float, Dict[int, int]]
+
+COST_TOLERANCE = 1e-9
+
+
+def pareto_frontier(storage: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    if not len(storage):
+        return np.arange(0)
+    order = np.lexsort((cost, -storage))
+    ordered_cost = cost[order]
+    cheapest_larger = np.concatenate(([np.inf], np.minimum.accumulate(ordered_cost)[:-1]))
+    return order[ordered_cost < cheapest_larger]
+
+
+def _cheaper(candidate, current):
+    return candidate < current * (1 - COST_TOLERANCE)
+
+
+def _walk(parent: np.ndarray, weights: np.ndarray, position: int, counts: Dict[int, int]) -> None:
+    while position > 0:
+        item = int(parent[position])
+        if item < 0:
+            raise RuntimeError(f"Broken combination trace at {position}")
+        counts[item] = counts.get(item, 0) + 1
+        position -= int(weights[item])
+
+
+def min_cost_cover(weights: np.ndarray, costs: np.ndarray, target: int) -> Solution | None:
+    if target <= 0:
+        return 0.0, {}
+    if not len(weights):
+        return None
+    best = int(np.argmin(costs / weights))
+    w_best, c_best = int(weights[best]), float(costs[best])
+    useful = costs < c_best * np.ceil(weights / w_best)
+    useful[best] = True
+    items = np.flatnonzero(useful)
+    w_max = int(weights[items].max())
+
+    limit = min(target + w_max - 1, (w_best - 1) * w_max)
+    dp = np.full(limit + 1, np.inf)
+    dp[0] = 0.0
+    parent = np.full(limit + 1, -1, dtype=np.int32)
+    for item in items[np.argsort(weights[items], kind="stable")]:
+        w, c = int(weights[item]), float(costs[item])
+        if w > limit:
+            continue
+        if item != best and not _cheaper(c, dp[w : 2 * w].min()):
+            continue
+        rows = -(-(limit + 1) // w)
+        padded = np.full(rows * w, np.inf)
+        padded[: limit + 1] = dp
+        view = padded.reshape(rows, w)
+        offsets = (np.arange(rows) * c)[:, None]
+        relaxed = (np.minimum.accumulate(view - offsets, axis=0) + offsets).ravel()[: limit + 1]
+        improved = _cheaper(relaxed, dp)
+        np.copyto(dp, relaxed, where=improved)
+        np.copyto(parent, item, where=improved)
+
+    reach = np.arange(limit + 1)
+    best_copies = np.maximum(0, -(-(target - reach) // w_best))
+    totals = dp + best_copies * c_best
+    position = int(np.argmin(totals))
+    if not np.isfinite(totals[position]):
+        return None
+    counts: Dict[int, int] = {}
+    _walk(parent, weights, position, counts)
+    if best_copies[position]:
+        counts[best] = counts.get(best, 0) + int(best_copies[position])
+    return float(totals[position]), counts
+
+
+def min_cost_cover_bounded(
+    weights: np.ndarray, costs: np.ndarray, target: int, max_items: int, max_cells: int | None = None
+) -> Solution | None:
+    if target <= 0:
+        return 0.0, {}
+    if not len(weights) or int(weights.max()) * max_items < target:
+        return None
+    step = -(-max_items * len(weights) * target // max_cells) if max_cells else 1
+    if step > 1:
+        return _min_cost_cover_coarse(weights, costs, target, max_items, step)
+    dtype = np.int16 if len(weights) < np.iinfo(np.int16).max else np.int32
+    dp = np.full(target + 1, np.inf)
+    dp[0] = 0.0
+    parents: List[np.ndarray] = []
+    covers: List[Tuple[int, int]] = []
+    for _ in range(max_items):
+        suffix = np.minimum.accumulate(dp[:target][::-1])[::-1]
+        layer = dp.copy()
+        parent = np.full(target, -1, dtype=dtype)
+        cover = (-1, -1)
+        for item, (w, c) in enumerate(zip(weights.tolist(), costs.tolist())):
+            if w < target:
+                candidate = dp[: target - w] + c
+                improved = _cheaper(candidate, layer[w:target])
+                np.copyto(layer[w:target], candidate, where=improved)
+                np.copyto(parent[w:target], item, where=improved)
+            start = max(0, target - w)
+            if _cheaper(suffix[start] + c, layer[target]):
+                layer[target] = suffix[start] + c
+                source = start + int(np.argmin(dp[start:target]))
+                cover = (item, source)
+        parents.append(parent)
+        covers.append(cover)
+        dp = layer
+
+    if not np.isfinite(dp[target]):
+        return None
+    counts: Dict[int, int] = {}
+    position = target
+    for layer_index in range(max_items - 1, -1, -1):
+        if position == target:
+            item, source = covers[layer_index]
+        else:
+            item = int(parents[layer_index][position])
+            source = position - int(weights[item]) if item >= 0 else position
+        if item < 0:
+            continue
+        counts[item] = counts.get(item, 0) + 1
+        position = source
+        if position == 0:
+            break
+    return float(dp[target]), counts
+
+
+def _min_cost_cover_coarse(
+    weights: np.ndarray, costs: np.ndarray, target: int, max_items: int, step: int
+) -> Solution:
+    # Weights rounded down and the target rounded up, so any coarse cover is a real cover;
+    # falls back to copies of the largest plan when rounding made the target unreachable
+    target_steps = -(-target // step)
+    coarse = np.minimum(weights // step, target_steps)
+    items = np.flatnonzero(coarse > 0)
+    items = items[pareto_frontier(coarse[items], costs[items])]
+    solution = min_cost_cover_bounded(coarse[items], costs[items], target_steps, max_items)
+    if solution is None:
+        largest = int(np.argmax(weights))
+        copies = -(-target // int(weights[largest]))
+        return float(costs[largest]) * copies, {largest: copies}
+    cost, counts = solution
+    return cost, {int(items[item]): count for item, count in counts.items()}
+
+
+class PlanOptimizer:
+    def __init__(self, table: PlanTable, cache_size: int = settings.OPTIMIZE_CACHE_SIZE):
+        self.table = table
+        self.cache_size = cache_size
+        self._frontiers: Dict[str | None, np.ndarray] = {}
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def candidates(self, provider: str | None = None) -> np.ndarray:
+        rows = self._frontiers.get(provider)
+        if rows is None:
+            table = self.table
+            rows = np.arange(len(table))
+            if provider is not None:
+                if provider in table.providers:
+                    rows = rows[table.provider_ids == table.providers.index(provider)]
+                else:
+                    rows = rows[:0]
+            rows = rows[pareto_frontier(table.storage_gb[rows], table.total_cost[rows])]
+            self._frontiers[provider] = rows
+        return rows
+
+    def cached(self, required_gb: int, provider: str | None = None, max_plans: int | None = None):
+        with self._lock:
+            key = (required_gb, provider, max_plans)
+            if key not in self._results:
+                return MISSING
+            self._results.move_to_end(key)
+            return self._results[key]
+
+    def solve(
+        self, required_gb: int, provider: str | None = None, max_plans: int | None = None
+    ) -> PlanCombination | None:
+        result = self.cached(required_gb, provider, max_plans)
+        if result is MISSING:
+            result = self._solve(required_gb, provider, max_plans)
+            with self._lock:
+                self._results[(required_gb, provider, max_plans)] = result
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return result
+
+    def _solve(
+        self, required_gb: int, provider: str | None, max_plans: int | None
+    ) -> PlanCombination | None:
+        table = self.table
+        rows = self.candidates(provider)
+        if not len(rows):
+            return None
+
+        scale = int(np.gcd.reduce(table.storage_gb[rows]))
+        target = -(-required_gb // scale)
+        weights = np.minimum(table.storage_gb[rows] // scale, target)
+        costs = table.total_cost[rows]
+        frontier = pareto_frontier(weights, costs)
+        rows, weights, costs = rows[frontier], weights[frontier], costs[frontier]
+
+        if max_plans is not None and int(weights.max()) * max_plans < target:
+            return None
+        solution = min_cost_cover(weights, costs, target)
+        if max_plans is not None and solution and sum(solution[1].values()) > max_plans:
+            solution = min_cost_cover_bounded(
+                weights, costs, target, max_plans, settings.OPTIMIZE_MAX_DP_CELLS
+            )
+        if solution is None:
+            return None
+
+        _, counts = solution
+        selected = sorted(counts, key=lambda item: -int(table.storage_gb[rows[item]]))
+        plans = table.plans(rows[selected])
+        selections = [
+            PlanSelection(plan=plan, quantity=counts[item]) for item, plan in zip(selected, plans)
+        ]
+        return PlanCombination(
+            required_gb=required_gb,
+            total_storage_gb=sum(s.plan.storage_gb * s.quantity for s in selections),
+            total_cost=math.fsum(
+                s.plan.storage_gb * s.plan.price_per_gb * s.quantity for s in selections
+            ),
+            plan_count=sum(s.quantity for s in selections),
+            plans=selections,
+        )
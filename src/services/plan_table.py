@@ -0,0 +1,108 @@
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from src.clients.catalog_loader import PlanColumns
+from src.schemas.pricing_plan import PlanQuery, PricingPlan
+
+
+class PlanTable:
+    ARRAYS = (
+        "provider_ids",
+        "storage_gb",
+        "price_per_gb",
+        "total_cost",
+        "by_cost",
+        "sorted_storage",
+        "_cost_provider_ids",
+        "_cost_storage",
+        "_cost_price",
+        "_cost_total",
+    )
+
+    def __init__(
+        self,
+        providers: Sequence[str],
+        provider_ids: Iterable[int],
+        storage_gb: Iterable[int],
+        price_per_gb: Iterable[float],
+    ):
+        self.providers = tuple(providers)
+        self.provider_ids = np.asarray(provider_ids, dtype=np.uint16)
+        self.storage_gb = np.asarray(storage_gb, dtype=np.int64)
+        self.price_per_gb = np.asarray(price_per_gb, dtype=np.float64)
+        self.total_cost = self.storage_gb * self.price_per_gb
+
+        self.by_cost = np.argsort(self.total_cost, kind="stable")
+        self.sorted_storage = np.sort(self.storage_gb, kind="stable")
+        self._cost_provider_ids = self.provider_ids[self.by_cost]
+        self._cost_storage = self.storage_gb[self.by_cost]
+        self._cost_price = self.price_per_gb[self.by_cost]
+        self._cost_total = self.total_cost[self.by_cost]
+
+    @classmethod
+    def from_columns(cls, columns: PlanColumns) -> "PlanTable":
+        return cls(
+            columns.providers,
+            np.frombuffer(columns.provider_ids, dtype=np.uint16),
+            np.frombuffer(columns.storage_gb, dtype=np.int64),
+            np.frombuffer(columns.price_per_gb, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_arrays(cls, providers: Sequence[str], arrays: Dict[str, np.ndarray]) -> "PlanTable":
+        table = cls.__new__(cls)
+        table.providers = tuple(providers)
+        for name in cls.ARRAYS:
+            setattr(table, name, arrays[name])
+        return table
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_plans(cls, plans: Sequence[PricingPlan] | PlanColumns) -> "PlanTable":
+        if isinstance(plans, PlanColumns):
+            return cls.from_columns(plans)
+        return cls.from_columns(PlanColumns.from_plans(plans))
+
+    def __len__(self) -> int:
+        return len(self.storage_gb)
+
+    def position(self, min_storage: int) -> int:
+        return int(np.searchsorted(self.sorted_storage, min_storage, side="left"))
+
+    def cheapest_from(self, position: int) -> np.ndarray:
+        if position >= len(self):
+            return self.by_cost[:0]
+        return self.by_cost[self._cost_storage >= self.sorted_storage[position]]
+
+    def select(self, query: PlanQuery) -> np.ndarray:
+        mask = self._cost_storage >= query.min_storage
+        if query.max_budget is not None:
+            mask &= self._cost_total <= query.max_budget
+        if query.min_price is not None:
+            mask &= self._cost_price >= query.min_price
+        if query.max_price is not None:
+            mask &= self._cost_price <= query.max_price
+        if query.providers is not None:
+            ids = [i for i, name in enumerate(self.providers) if name in query.providers]
+            mask &= np.isin(self._cost_provider_ids, ids)
+        ranks = np.flatnonzero(mask)
+        if query.limit is not None:
+            ranks = ranks[: query.limit]
+        return self.by_cost[ranks]
+
+    def records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        providers = self.providers
+        return [
+            {"provider": providers[provider_id], "storage_gb": storage_gb, "price_per_gb": price_per_gb}
+            for provider_id, storage_gb, price_per_gb in zip(
+                self.provider_ids[rows].tolist(),
+                self.storage_gb[rows].tolist(),
+                self.price_per_gb[rows].tolist(),
+            )
+        ]
+
+    def plans(self, rows: np.ndarray) -> List[PricingPlan]:
+        return [PricingPlan.trusted(**record) for record in self.records(rows)]
@@ -1,46 +1,156 @@
+import asyncio
 import logging
+import time
 from typing import List
 
 from fastapi import Depends
 
 from src.clients.base_provider import BaseProviderClient
 from src.clients.provider_client import get_provider_clients_with_list
-from src.repositories.pricing_plan_repository import PricingPlanRepository
-from src.schemas.pricing_plan import PricingPlan
+from src.core.config import settings
+from src.core.encoded_response import EncodedBody
+from src.core.instrumentation import span
+from src.core.local_cache import MISSING
+from src.core.metrics import metrics
+from src.core.single_flight import SingleFlight, should_refresh_early
+from src.repositories.pricing_plan_repository import CATALOG_KEY, PricingPlanRepository
+from src.schemas.pricing_plan import PlanCombination, PlanQuery, PricingPlan
+from src.services.plan_index import (
+    PlanIndex,
+    PlanIndexStore,
+    catalog_version,
+    plan_index_store,
+)
+from src.services.provider_fanout import ProviderFanout
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CATALOG_REFRESH_KEY = f"{CATALOG_KEY}:refresh"
+
+catalog_flight = SingleFlight("catalog")
+optimize_flight = SingleFlight("optimize")
+catalog_recomputations = metrics.counter(
+    "catalog_recomputations_total", "Catalog rebuilds from provider data"
+)
+
 
 class PricingPlanService:
     def __init__(
         self,
         pricing_plan_repository: PricingPlanRepository,
         provider_clients: List[BaseProviderClient],
+        index_store: PlanIndexStore = plan_index_store,
+        fanout: ProviderFanout | None = None,
+        flight: SingleFlight = catalog_flight,
     ):
         self.providers = provider_clients
         self.pricing_plan_repository = pricing_plan_repository
+        self.plan_index_store = index_store
+        self.fanout = fanout or ProviderFanout()
+        self.flight = flight
 
-    def get_filtered_and_sorted_plans(self, min_storage: int) -> List[PricingPlan]:
-        cached_plans = self.pricing_plan_repository.get_cached_plans(min_storage)
-        if cached_plans:
-            logger.info(f"Returning cached plans for min_storage={min_storage}")
-            return cached_plans
-        all_plans = []
-        for provider in self.providers:
-            try:
-                all_plans.extend(provider.get_pricing_plans())
-            except Exception as e:
-                logger.error(f"Failed to get pricing plans from provider: {str(e)}")
-                continue
-        filtered_plans = [plan for plan in all_plans if plan.storage_gb >= min_storage]
-        sorted_plans = sorted(
-            filtered_plans, key=lambda plan: plan.storage_gb * plan.price_per_gb
+    async def get_filtered_and_sorted_plans(self, min_storage: int) -> List[PricingPlan]:
+        index = await self.get_plan_index()
+        return index.query(min_storage)
+
+    async def search_plans(self, query: PlanQuery) -> List[PricingPlan]:
+        index = await self.get_plan_index()
+        return index.search(query)
+
+    async def get_encoded_plans(self, query: int | PlanQuery) -> EncodedBody:
+        with span("catalog"):
+            index = await self.get_plan_index()
+        with span("serialize"):
+            if isinstance(query, PlanQuery):
+                return index.encoded_search(query)
+            return index.encoded(query)
+
+    async def optimize_plans(
+        self, required_gb: int, provider: str | None = None, max_plans: int | None = None
+    ) -> PlanCombination | None:
+        index = await self.get_plan_index()
+        optimizer = index.optimizer
+        result = optimizer.cached(required_gb, provider, max_plans)
+        if result is not MISSING:
+            return result
+        return await optimize_flight.do(
+            f"{index.version}:{required_gb}:{provider}:{max_plans}",
+            lambda: asyncio.to_thread(optimizer.solve, required_gb, provider, max_plans),
         )
 
-        self.pricing_plan_repository.cache_plans(min_storage, sorted_plans)
-        logger.info(f"Cached {len(sorted_plans)} plans for min_storage={min_storage}")
-        return sorted_plans
+    async def get_plan_index(self) -> PlanIndex:
+        version = await self.pricing_plan_repository.get_catalog_version()
+        index = self.plan_index_store.get(version)
+        if index is None and version:
+            cached_catalog = await self.pricing_plan_repository.get_cached_catalog()
+            if cached_catalog:
+                logger.info(f"Rebuilding plan index for cached catalog {cached_catalog['version']}")
+                with span("index"):
+                    index = self.plan_index_store.rebuild(**cached_catalog)
+        if index is None:
+            return await self.flight.do(CATALOG_KEY, self._rebuild_catalog)
+
+        if should_refresh_early(
+            index.expires_at, index.delta, settings.CACHE_EARLY_EXPIRATION_BETA
+        ):
+            # A separate key: a refresh resolves to None, which a blocking rebuild must not join
+            self.flight.spawn(CATALOG_REFRESH_KEY, lambda: self._refresh_catalog(index.version))
+        return index
+
+    async def _rebuild_catalog(self) -> PlanIndex:
+        lease = self.pricing_plan_repository.rebuild_lease()
+        if await lease.acquire():
+            try:
+                return await self._build_catalog()
+            finally:
+                await lease.release()
+
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+            cached_catalog = await self.pricing_plan_repository.get_cached_catalog(use_local=False)
+            if cached_catalog:
+                return self.plan_index_store.rebuild(**cached_catalog)
+        logger.warning("Timed out waiting for another worker to rebuild the catalog")
+        return await self._build_catalog()
+
+    async def _refresh_catalog(self, stale_version: str) -> None:
+        lease = self.pricing_plan_repository.rebuild_lease()
+        if not await lease.acquire():
+            return
+        try:
+            cached_catalog = await self.pricing_plan_repository.get_cached_catalog(use_local=False)
+            if (
+                cached_catalog
+                and cached_catalog["version"] != stale_version
+                and cached_catalog["expires_at"] > time.time()
+            ):
+                self.plan_index_store.rebuild(**cached_catalog)
+                return
+            await self._build_catalog()
+        except Exception as e:
+            logger.error(f"Background catalog refresh failed: {str(e)}")
+        finally:
+            await lease.release()
+
+    async def _build_catalog(self) -> PlanIndex:
+        started = time.perf_counter()
+        with span("providers"):
+            columns, failed_providers = await self.fanout.fetch_all(self.providers)
+        version = catalog_version(columns)
+        delta = time.perf_counter() - started
+        catalog = await self.pricing_plan_repository.cache_catalog(
+            version, columns, failed_providers, delta
+        )
+        catalog_recomputations.inc()
+        index = self.plan_index_store.rebuild(**catalog)
+        if failed_providers:
+            logger.warning(
+                f"Cached partial catalog {version} without providers {failed_providers}"
+            )
+        else:
+            logger.info(f"Cached catalog {version} with {len(index)} plans")
+        return index
 
 
 def get_pricing_plan_service(
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Sequence, Tuple, TypeVar
+
+from src.clients.base_provider import BaseProviderClient
+from src.clients.catalog_loader import PlanColumns
+from src.core.config import settings
+from src.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def hedged_call(factory: Callable[[], Awaitable[T]], hedge_delay: float) -> T:
+    tasks = [asyncio.ensure_future(factory())]
+    hedged = False
+    error: BaseException | None = None
+    try:
+        while tasks:
+            timeout = None if hedged else hedge_delay
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                tasks.remove(task)
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not hedged:
+                hedged = True
+                tasks.append(asyncio.ensure_future(factory()))
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class ProviderFanout:
+    def __init__(
+        self,
+        timeout: float = settings.PROVIDER_TIMEOUT,
+        hedge_delay: float = settings.PROVIDER_HEDGE_DELAY,
+    ):
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+
+    async def _fetch(self, provider: BaseProviderClient) -> PlanColumns:
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await asyncio.wait_for(
+                hedged_call(provider.get_plan_columns, self.hedge_delay), self.timeout
+            )
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            metrics.histogram(
+                "provider_latency_seconds",
+                "Provider catalog fetch latency",
+                {"provider": provider.name, "outcome": outcome},
+            ).observe(time.perf_counter() - started)
+
+    async def fetch_all(
+        self, providers: Sequence[BaseProviderClient]
+    ) -> Tuple[PlanColumns, List[str]]:
+        results = await asyncio.gather(
+            *(self._fetch(provider) for provider in providers), return_exceptions=True
+        )
+        parts: List[PlanColumns] = []
+        failed: List[str] = []
+        for provider, result in zip(providers, results):
+            if isinstance(result, BaseException):
+                reason = "timed out" if isinstance(result, asyncio.TimeoutError) else str(result)
+                logger.error(f"Failed to get pricing plans from provider {provider.name}: {reason}")
+                failed.append(provider.name)
+            else:
+                parts.append(result)
+        return PlanColumns.concat(parts), failed
@@ -0,0 +1,36 @@
+import argparse
+import logging
+import sys
+from typing import List
+
+from src.clients.provider_client import provider_registry
+from src.core.config import settings
+from src.core.log_config import configure_logging
+from src.services.catalog_manager import build_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild the catalog snapshot from the provider files")
+    parser.add_argument("--output", default=settings.CATALOG_SNAPSHOT_PATH or "catalog.snapshot")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    configure_logging()
+    args = parse_args(argv)
+    provider_registry.start(None)
+    try:
+        snapshot = build_snapshot(args.output, provider_registry.file_clients())
+    except (OSError, ValueError) as e:
+        logger.error(f"Catalog snapshot was not written: {str(e)}")
+        sys.exit(1)
+    logger.info(
+        f"Wrote catalog snapshot {snapshot.version} to {args.output} "
+        f"({len(snapshot.table)} plans, {snapshot.nbytes} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import signal
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from src.clients.provider_client import provider_registry
+from src.core.config import settings
+from src.core.log_config import configure_logging
+from src.core.metrics import metrics
+from src.core.redis_client import redis_manager
+from src.repositories.order_completion_repository import OrderCompletionRepository
+from src.repositories.order_repository import OrderRepository
+from src.schemas.order import Order
+from src.services.payment_dispatcher import PaymentDispatcher
+
+logger = logging.getLogger(__name__)
+
+orders_completed = metrics.counter("order_completions_total", "Orders moved to completed")
+completion_retries = metrics.counter(
+    "order_completion_retries_total", "Order completions rescheduled after a failure"
+)
+
+
+class OrderCompletionWorker:
+    def __init__(
+        self,
+        order_repository: OrderRepository,
+        completion_repository: OrderCompletionRepository,
+        batch_size: int = settings.ORDER_COMPLETION_BATCH_SIZE,
+        poll_interval: float = settings.ORDER_COMPLETION_POLL_INTERVAL,
+        lease: float = settings.ORDER_COMPLETION_LEASE,
+        payments: PaymentDispatcher | None = None,
+    ):
+        self.order_repository = order_repository
+        self.completion_repository = completion_repository
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.payments = payments
+        self._stopping = asyncio.Event()
+
+    async def process_due(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        order_ids = await self.completion_repository.claim_due(now, self.batch_size, self.lease)
+        if not order_ids:
+            return 0
+        try:
+            orders = await self.order_repository.get_orders(order_ids, trusted=True)
+            awaiting = [order for order in orders if order and order.status == "payment_pending"]
+            unresolved = await self._confirm_payments(awaiting)
+            pending = [order for order in orders if order and order.status == "pending"]
+            for order in pending:
+                order.status = "completed"
+            failed = [order for order in awaiting if order.status == "failed"]
+            await self.order_repository.update_statuses(pending + failed)
+        except Exception as e:
+            logger.error(f"Failed to complete batch of {len(order_ids)} orders: {str(e)}")
+            await self._retry(order_ids, now)
+            return len(order_ids)
+        unresolved_ids = {str(order.order_id) for order in unresolved}
+        await self.completion_repository.ack(
+            [order_id for order_id in order_ids if order_id not in unresolved_ids]
+        )
+        if unresolved:
+            abandoned = set(await self._retry(list(unresolved_ids), now))
+            failed = [order for order in unresolved if str(order.order_id) in abandoned]
+            for order in failed:
+                order.status = "failed"
+            await self.order_repository.update_statuses(failed)
+        orders_completed.inc(len(pending))
+        logger.info(f"Completed {len(pending)} orders")
+        return len(order_ids)
+
+    async def _confirm_payments(self, orders: List[Order]) -> List[Order]:
+        if not orders or self.payments is None:
+            return orders
+        by_provider: Dict[str, List[Order]] = defaultdict(list)
+        for order in orders:
+            by_provider[order.provider].append(order)
+        unresolved: List[Order] = []
+        for provider, provider_orders in by_provider.items():
+            outcomes = await self.payments.confirm(provider, provider_orders)
+            unresolved.extend(
+                order for order, outcome in zip(provider_orders, outcomes) if outcome is None
+            )
+        return unresolved
+
+    async def _retry(self, order_ids: List[str], now: float) -> List[str]:
+        abandoned = []
+        for order_id in order_ids:
+            completion_retries.inc()
+            try:
+                rescheduled = await self.completion_repository.retry(
+                    order_id,
+                    now + settings.ORDER_COMPLETION_RETRY_DELAY,
+                    settings.ORDER_COMPLETION_MAX_ATTEMPTS,
+                )
+            except Exception as e:
+                logger.error(f"Failed to reschedule order {order_id}, lease will expire: {str(e)}")
+                continue
+            if not rescheduled:
+                logger.error(f"Giving up on completing order {order_id}")
+                abandoned.append(order_id)
+        return abandoned
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.process_due()
+            except Exception as e:
+                logger.error(f"Failed to claim due orders: {str(e)}")
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def main() -> None:
+    configure_logging()
+    redis_client = await redis_manager.connect()
+    provider_registry.start(redis_client)
+    worker = OrderCompletionWorker(
+        OrderRepository(redis_client),
+        OrderCompletionRepository(redis_client),
+        payments=PaymentDispatcher(redis_client, provider_registry.mapping()),
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    logger.info("Order completion worker started")
+    try:
+        await worker.run()
+    finally:
+        await provider_registry.close()
+        await redis_manager.close()
+        logger.info("Order completion worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,79 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 import asyncio
+import gzip
 import json
+import os
+import shutil
+import time
 from pathlib import Path
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from uuid import UUID, uuid4
 
+import fakeredis
+import numpy as np
+import httpx
+import redis
+import fakeredis.aioredis
+from redis.crc import key_slot
+
 from main import app
-from src.services.order_service import OrderService
-from src.services.pricing_plan_service import PricingPlanService
+from src.clients.base_provider import BaseProviderClient
+from src.clients.catalog_loader import PlanColumns, load_plan_columns
+from src.clients.provider_client import (
+    ProviderRegistry,
+    get_provider_clients_with_dict,
+    get_provider_clients_with_list,
+)
+from src.clients.remote_provider import RemoteProviderClient
+from src.services.order_events import OrderEventHub
+from src.services.order_service import OrderService, get_order_service
+from src.services.payment_dispatcher import PaymentDispatcher
+from src.services.pricing_plan_service import CATALOG_REFRESH_KEY, PricingPlanService, get_pricing_plan_service
+from src.services.provider_fanout import ProviderFanout
+from src.services.catalog_manager import CatalogManager, build_snapshot
+from src.services.catalog_snapshot import load_snapshot
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.config import settings
+from src.core.encoded_response import EncodedBody, choose_encoding, etag_matches
+from src.core.instrumentation import TimingMiddleware, request_histogram, span, span_histogram
+from src.core.redis_client import (
+    RedisClientManager, RedisReplica, RedisUnavailableError, cluster_client, connection_pool, redis_manager,
+)
+from src.core.rate_limit import RateLimitMiddleware, TokenBucketLimiter, bucket_key
+from src.core.local_cache import MISSING, CacheInvalidationListener, LocalCache, plan_cache
+from src.core.single_flight import SingleFlight, jittered_ttl, should_refresh_early
 from src.schemas.order import Order
-from src.schemas.pricing_plan import PricingPlan
+from src.schemas.pricing_plan import PlanQuery, PricingPlan
+from src.repositories.order_completion_repository import (
+    COMPLETION_DEAD_KEY,
+    OrderCompletionRepository,
+)
+from src.repositories.order_repository import (
+    LegacyKeyWindow, OrderRepository, legacy_keys, legacy_order_key, order_index_key, order_key
+)
+from src.repositories.pricing_plan_repository import (
+    CATALOG_KEY, CATALOG_LOCK_KEY, CATALOG_VERSION_KEY, PricingPlanRepository
+)
+from src.workers.order_completion import OrderCompletionWorker
+from src.services.plan_index import PlanIndex, PlanIndexStore, catalog_version
+from src.services.plan_optimizer import min_cost_cover_bounded
 
 client = TestClient(app)
+fake_server = fakeredis.FakeServer()
+
+@pytest.fixture(scope="module", autouse=True)
+def app_event_loop():
+    # The app lifespan runs against an in-process fakeredis server, so the suite needs no Redis
+    pool = connection_pool(
+        settings.REDIS_HOST, settings.REDIS_PORT,
+        connection_class=fakeredis.aioredis.FakeAsyncRedisConnection, server=fake_server,
+    )
+    with patch("src.core.redis_client.get_redis_pool", return_value=pool), \
+            patch("src.core.rate_limit.get_redis_pool", return_value=pool), client:
+        yield
 
 @pytest.fixture
 def mock_order_service(mocker):
@@ -114,6 +175,7 @@ def test_get_pricing_plans_filter_and_sort(mock_pricing_plan_service, setup_prov
 @pytest.mark.asyncio
 async def test_create_order_pending_and_complete(mock_order_service, mock_redis_client, mocker):
     mocker.patch("src.routers.orders.get_order_service", return_value=mock_order_service)
+    mocker.patch.dict(app.dependency_overrides, {get_order_service: lambda: mock_order_service})
     mocker.patch("src.core.redis_client.get_redis_client", return_value=mock_redis_client)
     order_id = uuid4()
     mocker.patch("src.services.order_service.uuid4", return_value=order_id)
@@ -163,4 +225,1031 @@ def test_get_pricing_plans_empty_result(mock_pricing_plan_service, mock_redis_cl
     mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value = []
     response = client.get("/pricing-plans?min_storage=10000")
     assert response.status_code == 200
-    assert response.json() == []
\ No newline at end of file
+    assert response.json() == []
+
+def test_plan_index_query_matches_filter_and_sort(mock_pricing_plan_service):
+    plans = mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value
+    index = PlanIndex(catalog_version(plans), plans)
+    for min_storage in [0, 50, 51, 150, 999, 1000, 2000, 2001]:
+        expected = sorted(
+            [plan for plan in plans if plan.storage_gb >= min_storage],
+            key=lambda plan: plan.storage_gb * plan.price_per_gb,
+        )
+        assert index.query(min_storage) == expected
+    assert index.query(51) is not index.query(51)
+
+@pytest.mark.asyncio
+async def test_pricing_plan_service_reuses_index_per_catalog_version(mock_pricing_plan_service):
+    plans = mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    provider = AsyncMock()
+    provider.get_plan_columns.return_value = PlanColumns.from_plans(plans)
+    plan_cache.clear()
+    service = PricingPlanService(PricingPlanRepository(redis_client), [provider], PlanIndexStore())
+
+    first = await service.get_filtered_and_sorted_plans(100)
+    second = await service.get_filtered_and_sorted_plans(300)
+    assert provider.get_plan_columns.call_count == 1
+    assert [plan.storage_gb for plan in second] == [300, 600, 1200, 500, 1000, 2000]
+    assert len(first) == 9
+    assert not await redis_client.keys("pricing_plans:min_storage_*")
+
+    plan_cache.clear()
+    other_worker = PricingPlanService(PricingPlanRepository(redis_client), [provider], PlanIndexStore())
+    assert await other_worker.get_filtered_and_sorted_plans(100) == first
+    assert provider.get_plan_columns.call_count == 1
+
+def test_circuit_breaker_opens_and_recovers(mocker):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure(ConnectionError("down"))
+    assert breaker.allow_request()
+    breaker.record_failure(ConnectionError("down"))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    mocker.patch("src.core.circuit_breaker.time.monotonic", return_value=breaker.opened_at + 31)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.snapshot() == {"state": "closed", "consecutive_failures": 0, "trips": 1, "last_error": None}
+
+def test_redis_dependency_does_not_ping():
+    before = client.get("/health").json()
+    # Orders are never served from the local caches, so this request checks out a connection
+    assert client.get(f"/orders/{uuid4()}").status_code == 404
+    after = client.get("/health").json()
+    assert after["status"] == "ok"
+    assert after["circuit"]["state"] == "closed"
+    assert after["pings_avoided"] == before["pings_avoided"] + 1
+    assert after["health_checks"] == before["health_checks"]
+    assert after["pool"]["checkout_wait_seconds"]["count"] > before["pool"]["checkout_wait_seconds"]["count"]
+
+def test_local_cache_lru_ttl_and_counters(mocker):
+    cache = LocalCache("test-lru", max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    mocker.patch("src.core.local_cache.time.monotonic", return_value=10**9)
+    assert cache.get("a") is MISSING
+    assert cache.snapshot() == {
+        "size": 1, "max_size": 2, "hits": 1, "misses": 2, "evictions": 2, "invalidations": 0,
+    }
+
+def test_pricing_plans_hot_path_served_from_local_cache():
+    client.get("/pricing-plans?min_storage=100")
+    before = client.get("/health").json()
+    client.get("/pricing-plans?min_storage=200")
+    after = client.get("/health").json()
+    assert after["caches"]["plans"]["hits"] == before["caches"]["plans"]["hits"] + 1
+    assert after["caches"]["plans"]["misses"] == before["caches"]["plans"]["misses"]
+
+def test_invalidation_message_from_other_worker_drops_local_entry():
+    plan_cache.set("provider_plans:{a.json}", ())
+    listener = CacheInvalidationListener()
+    listener.handle_message("other-worker provider_plans:{a.json}")
+    assert plan_cache.get("provider_plans:{a.json}") is MISSING
+
+def test_pricing_plans_etag_and_not_modified():
+    response = client.get("/pricing-plans?min_storage=100")
+    etag = response.headers["etag"]
+    assert response.headers["content-type"] == "application/json"
+    assert client.get("/pricing-plans?min_storage=101").headers["etag"] != etag
+    assert client.get("/pricing-plans?min_storage=51").json() == response.json()
+
+    not_modified = client.get("/pricing-plans?min_storage=100", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+def test_encoded_body_compression_variants():
+    encoded = EncodedBody('W/"v-0"', b"[" + b",".join([b'{"provider":"A"}'] * 200) + b"]")
+    assert choose_encoding("gzip, deflate", len(encoded.body)) == "gzip"
+    assert choose_encoding("gzip", 10) == "identity"
+    assert choose_encoding("gzip;q=0", len(encoded.body)) == "identity"
+    for refused in ("gzip;q=0.0", "gzip; q=0", "GZIP;Q=0.000", "gzip;q=bogus"):
+        assert choose_encoding(refused, len(encoded.body)) == "identity"
+    assert choose_encoding("br;q=0, gzip;q=0.5", len(encoded.body)) == "gzip"
+    assert gzip.decompress(encoded.variant("gzip")) == encoded.body
+    assert encoded.variant("gzip") is encoded.variant("gzip")
+    assert etag_matches('"other", W/"v-0"', encoded.etag)
+
+@pytest.mark.asyncio
+async def test_order_completion_worker_completes_due_orders(mocker):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    order_repository = OrderRepository(redis_client)
+    completion_repository = OrderCompletionRepository(redis_client)
+    due = [Order(order_id=uuid4(), provider="A", storage_gb=100, status="pending") for _ in range(3)]
+    later = Order(order_id=uuid4(), provider="B", storage_gb=50, status="pending")
+    for order in due:
+        await order_repository.save_order(order, complete_at=1000)
+    await order_repository.save_order(later, complete_at=2000)
+
+    worker = OrderCompletionWorker(order_repository, completion_repository, batch_size=2)
+    assert await worker.process_due(now=1500) == 2
+    assert await worker.process_due(now=1500) == 1
+    assert await worker.process_due(now=1500) == 0
+    assert [order.status for order in await order_repository.get_orders([o.order_id for o in due])] == ["completed"] * 3
+    assert (await order_repository.get_order(later.order_id)).status == "pending"
+    assert await completion_repository.depth() == 1
+
+@pytest.mark.asyncio
+async def test_order_completion_worker_retries_and_dead_letters(mocker):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    order_repository = OrderRepository(redis_client)
+    completion_repository = OrderCompletionRepository(redis_client)
+    order = Order(order_id=uuid4(), provider="A", storage_gb=100, status="pending")
+    await order_repository.save_order(order, complete_at=0)
+    mocker.patch.object(order_repository, "update_statuses", side_effect=RuntimeError("boom"))
+    mocker.patch("src.workers.order_completion.settings.ORDER_COMPLETION_MAX_ATTEMPTS", 2)
+
+    worker = OrderCompletionWorker(order_repository, completion_repository)
+    await worker.process_due(now=1)
+    assert await completion_repository.due_count(now=1) == 0
+    assert await completion_repository.due_count(now=10) == 1
+    await worker.process_due(now=10)
+    assert await completion_repository.depth() == 0
+    assert await redis_client.zscore(COMPLETION_DEAD_KEY, str(order.order_id)) is not None
+
+def test_create_orders_batch_reports_per_item_results():
+    response = client.post("/orders/batch", json={"orders": [
+        {"provider": "A", "storage_gb": 100},
+        {"provider": "INVALID", "storage_gb": 100},
+        {"provider": "B", "storage_gb": -5},
+        {"provider": "B", "storage_gb": 300},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert "Provider must be one of" in body["results"][1]["error"]
+    assert "Storage GB must be positive" in body["results"][2]["error"]
+    created = body["results"][3]["order"]
+    assert created["status"] == "payment_pending"
+    stored = client.get(f"/orders/{created['order_id']}").json()
+    assert stored["status"] in ("payment_pending", "pending")
+    assert {**stored, "status": created["status"]} == created
+
+def test_create_orders_batch_caps_size():
+    oversized = [{"provider": "A", "storage_gb": 1}] * (settings.ORDER_BATCH_MAX_SIZE + 1)
+    assert client.post("/orders/batch", json={"orders": oversized}).status_code == 422
+    assert client.post("/orders/batch", json={"orders": []}).status_code == 422
+
+class StubGateway(BaseProviderClient):
+    def __init__(self, name, latency=0.0, declined=(), error=None):
+        super().__init__(None, None, name=name)
+        self.latency = latency
+        self.declined = set(declined)
+        self.error = error
+        self.calls = []
+
+    async def confirm_payments(self, payments):
+        self.calls.append(list(payments))
+        await asyncio.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return [order_id not in self.declined for order_id, _ in payments]
+
+@pytest.mark.asyncio
+async def test_create_orders_batch_confirms_payments_asynchronously_in_batches():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    gateway_a, gateway_b = StubGateway("A", latency=0.2), StubGateway("B", latency=0.2)
+    dispatcher = PaymentDispatcher(redis_client, {"A": gateway_a, "B": gateway_b}, window=0.01)
+    repository = OrderRepository(redis_client)
+    service = OrderService(repository, {"A": gateway_a, "B": gateway_b}, payments=dispatcher)
+    started = time.perf_counter()
+    results = await service.create_orders([{"provider": "AB"[i % 2], "storage_gb": 1} for i in range(6)])
+    order = await service.create_order("B", 5)
+    assert time.perf_counter() - started < 0.1
+    assert {result.order.status for result in results} | {order.status} == {"payment_pending"}
+    gateway_b.declined.add(order.order_id)
+
+    await dispatcher.drain()
+    assert (len(gateway_a.calls), len(gateway_b.calls)) == (1, 1)
+    assert len(gateway_b.calls[0]) == 4
+    stored = await repository.get_orders([result.order.order_id for result in results] + [order.order_id])
+    assert [o.status for o in stored] == ["pending"] * 6 + ["failed"]
+    failed, _ = await repository.list_orders(status="failed")
+    assert [o.order_id for o in failed] == [order.order_id]
+
+@pytest.mark.asyncio
+async def test_payment_confirmation_reuses_idempotency_key_after_gateway_timeout():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    gateway = StubGateway("A", latency=0.2)
+    dispatcher = PaymentDispatcher(redis_client, {"A": gateway}, timeout=0.05)
+    repository = OrderRepository(redis_client)
+    completion_repository = OrderCompletionRepository(redis_client)
+    service = OrderService(repository, {"A": gateway}, payments=dispatcher)
+    order = await service.create_order("A", 10)
+    await dispatcher.drain()
+    assert (await repository.get_order(order.order_id)).status == "payment_pending"
+
+    gateway.latency = 0
+    worker = OrderCompletionWorker(repository, completion_repository, payments=dispatcher)
+    await worker.process_due(now=time.time() + settings.ORDER_COMPLETION_DELAY)
+    assert (await repository.get_order(order.order_id)).status == "completed"
+    assert await completion_repository.depth() == 0
+    assert gateway.calls[0] == gateway.calls[1]
+
+    await dispatcher.confirm("A", [order])
+    assert len(gateway.calls) == 2
+
+@pytest.mark.asyncio
+async def test_order_completion_worker_fails_orders_when_gateway_keeps_failing(mocker):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    gateway = StubGateway("B", error=RuntimeError("gateway down"))
+    dispatcher = PaymentDispatcher(redis_client, {"B": gateway})
+    repository = OrderRepository(redis_client)
+    completion_repository = OrderCompletionRepository(redis_client)
+    order = Order(order_id=uuid4(), provider="B", storage_gb=1, status="payment_pending")
+    await repository.save_order(order, complete_at=0)
+    mocker.patch("src.workers.order_completion.settings.ORDER_COMPLETION_MAX_ATTEMPTS", 2)
+    worker = OrderCompletionWorker(repository, completion_repository, payments=dispatcher)
+    await worker.process_due(now=1)
+    assert (await repository.get_order(order.order_id)).status == "payment_pending"
+    await worker.process_due(now=1 + settings.ORDER_COMPLETION_RETRY_DELAY)
+    assert (await repository.get_order(order.order_id)).status == "failed"
+    assert await redis_client.zscore(COMPLETION_DEAD_KEY, str(order.order_id)) is not None
+
+@pytest.mark.asyncio
+async def test_order_repository_stores_compact_hash_and_updates_status_in_place():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order = Order(order_id=uuid4(), provider="B", storage_gb=150, status="pending")
+    await repository.save_order(order)
+    assert await redis_client.hgetall(order_key(order.order_id)) == {
+        "p": "B", "g": "150", "s": "p", "t": str(order.created_at.timestamp()),
+    }
+
+    order.status = "completed"
+    await repository.update_statuses([order])
+    assert await redis_client.hget(order_key(order.order_id), "s") == "c"
+    assert await repository.get_order(order.order_id) == order
+    assert await repository.get_order(order.order_id, trusted=True) == order
+
+@pytest.mark.asyncio
+async def test_order_repository_migrates_legacy_json_orders():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order_id = uuid4()
+    await redis_client.set(f"order:{order_id}", json.dumps(
+        {"order_id": str(order_id), "provider": "A", "storage_gb": 100, "status": "pending"}
+    ), ex=500)
+    missing_id = uuid4()
+
+    orders = await repository.get_orders([order_id, missing_id])
+    assert orders[1] is None
+    assert orders[0].model_dump(exclude={"created_at"}) == {
+        "order_id": order_id, "provider": "A", "storage_gb": 100, "status": "pending",
+    }
+    assert await redis_client.type(order_key(order_id)) == "hash"
+    assert 0 < await redis_client.ttl(order_key(order_id)) <= 500
+
+@pytest.mark.asyncio
+async def test_order_repository_skips_legacy_keys_for_stale_reads_and_after_the_window():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order_id = uuid4()
+    await redis_client.set(legacy_order_key(order_id), json.dumps(
+        {"order_id": str(order_id), "provider": "A", "storage_gb": 100, "status": "pending"}
+    ))
+
+    assert await repository.get_orders([order_id], stale=True) == [None]
+    deadline = legacy_keys.deadline
+    legacy_keys.deadline = time.time() - 1
+    try:
+        assert await repository.get_orders([order_id]) == [None]
+    finally:
+        legacy_keys.deadline = deadline
+    assert await redis_client.exists(legacy_order_key(order_id))
+
+    window = LegacyKeyWindow()
+    redis_client.get = AsyncMock(return_value=None)
+    assert not await window.is_open(redis_client)
+    assert window.deadline == 0.0
+
+@pytest.mark.asyncio
+async def test_status_update_does_not_recreate_an_expired_order():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order = Order.trusted(uuid4(), "A", 100, "pending")
+    await repository.save_order(order)
+    await redis_client.delete(order_key(order.order_id))
+
+    await repository.update_order(order.model_copy(update={"status": "completed"}))
+    assert not await redis_client.exists(order_key(order.order_id))
+    for status in ("pending", "completed"):
+        assert await redis_client.zscore(order_index_key(status=status), str(order.order_id)) is None
+    await redis_client.hset(order_key(order.order_id), "s", "c")
+    assert await repository.get_order(order.order_id) is None
+
+def test_lookup_orders_returns_found_and_missing():
+    created = client.post("/orders/batch", json={"orders": [{"provider": "A", "storage_gb": 10}] * 3}).json()
+    order_ids = [result["order"]["order_id"] for result in created["results"]]
+    missing_id = str(uuid4())
+    response = client.post("/orders/lookup", json={"order_ids": order_ids + [missing_id]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [order["order_id"] for order in body["orders"]] == order_ids
+    assert body["missing"] == [missing_id]
+
+def test_list_orders_rejects_unknown_filters():
+    assert client.get("/orders", params={"status": "pending"}).status_code == 200
+    response = client.get("/orders", params={"status": "complete"})
+    assert response.status_code == 422
+    assert "Status must be one of" in response.json()["detail"]
+    assert client.get("/orders", params={"provider": "Z"}).status_code == 422
+
+@pytest.mark.asyncio
+async def test_list_orders_paginates_by_index_with_filters():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    base = datetime.now(timezone.utc)
+    orders = [
+        Order(order_id=uuid4(), provider="AB"[i % 2], storage_gb=10 + i, status="pending",
+              created_at=base - timedelta(seconds=i // 4))
+        for i in range(10)
+    ]
+    await repository.save_orders(orders)
+    orders[0].status = "completed"
+    await repository.update_statuses([orders[0]])
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await repository.list_orders(provider="A", cursor=cursor, limit=2)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert sorted(o.order_id for o in seen) == sorted(o.order_id for o in orders if o.provider == "A")
+    assert [o.created_at for o in seen] == sorted((o.created_at for o in seen), reverse=True)
+
+    completed, _ = await repository.list_orders(provider="A", status="completed")
+    assert [o.order_id for o in completed] == [orders[0].order_id]
+    pending, _ = await repository.list_orders(status="pending", created_after=base - timedelta(seconds=1))
+    assert len(pending) == 7
+    assert not await redis_client.keys("order:*:*")
+
+class StubProvider:
+    def __init__(self, name, plans, delays=(0,), error=None):
+        self.name = name
+        self.plans = plans
+        self.delays = list(delays)
+        self.error = error
+        self.calls = 0
+
+    async def get_plan_columns(self):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.error:
+            raise self.error
+        return PlanColumns.from_plans(self.plans)
+
+@pytest.mark.asyncio
+async def test_provider_fanout_bounds_latency_by_timeout():
+    plan_a = PricingPlan(provider="A", storage_gb=100, price_per_gb=0.02)
+    plan_b = PricingPlan(provider="B", storage_gb=50, price_per_gb=0.03)
+    providers = [
+        StubProvider("A", [plan_a], delays=[0.05]),
+        StubProvider("B", [plan_b], delays=[5]),
+        StubProvider("C", [], error=ValueError("broken catalog")),
+    ]
+    started = time.perf_counter()
+    plans, failed = await ProviderFanout(timeout=0.2, hedge_delay=0.1).fetch_all(providers)
+    assert time.perf_counter() - started < 0.4
+    assert list(plans.plans()) == [plan_a]
+    assert failed == ["B", "C"]
+
+@pytest.mark.asyncio
+async def test_provider_fanout_hedges_slow_first_attempt():
+    plan = PricingPlan(provider="A", storage_gb=100, price_per_gb=0.02)
+    provider = StubProvider("A", [plan], delays=[5, 0.01])
+    started = time.perf_counter()
+    plans, failed = await ProviderFanout(timeout=1, hedge_delay=0.05).fetch_all([provider])
+    assert time.perf_counter() - started < 0.5
+    assert (list(plans.plans()), failed, provider.calls) == ([plan], [], 2)
+
+@pytest.mark.asyncio
+async def test_partial_catalog_is_flagged_and_cached_briefly():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    service = PricingPlanService(
+        PricingPlanRepository(redis_client),
+        [StubProvider("A", [PricingPlan(provider="A", storage_gb=100, price_per_gb=0.02)]),
+         StubProvider("B", [], error=ValueError("down"))],
+        PlanIndexStore(),
+        ProviderFanout(timeout=0.2, hedge_delay=0.1),
+    )
+    encoded = await service.get_encoded_plans(0)
+    assert encoded.headers == {"X-Partial-Results": "true", "X-Failed-Providers": "B"}
+    fresh_ttl = settings.PARTIAL_CATALOG_TTL * (1 + settings.CACHE_TTL_JITTER)
+    assert 0 < await redis_client.ttl(CATALOG_VERSION_KEY) <= fresh_ttl + settings.CACHE_STALE_TTL
+    assert service.plan_index_store.current.expires_at <= time.time() + fresh_ttl
+    plan_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_catalog_misses_recompute_once():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    provider = StubProvider(
+        "A", [PricingPlan(provider="A", storage_gb=100, price_per_gb=0.02)], delays=[0.1]
+    )
+    service = PricingPlanService(
+        PricingPlanRepository(redis_client), [provider], PlanIndexStore(),
+        ProviderFanout(timeout=1, hedge_delay=1), SingleFlight("test"),
+    )
+    results = await asyncio.gather(*(service.get_filtered_and_sorted_plans(0) for _ in range(50)))
+    assert provider.calls == 1
+    assert all(len(plans) == 1 for plans in results)
+    plan_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_catalog_rebuild_is_shared_across_workers():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    provider = StubProvider(
+        "A", [PricingPlan(provider="A", storage_gb=100, price_per_gb=0.02)], delays=[0.1]
+    )
+    workers = [
+        PricingPlanService(
+            PricingPlanRepository(redis_client), [provider], PlanIndexStore(),
+            ProviderFanout(timeout=1, hedge_delay=1), SingleFlight(f"worker-{i}"),
+        )
+        for i in range(2)
+    ]
+    results = await asyncio.gather(
+        *(workers[i % 2].get_filtered_and_sorted_plans(0) for i in range(20))
+    )
+    assert provider.calls == 1
+    assert all(len(plans) == 1 for plans in results)
+    assert await redis_client.get(CATALOG_LOCK_KEY) is None
+    plan_cache.clear()
+
+
+def test_should_refresh_early_only_near_expiry():
+    now = time.time()
+    assert not should_refresh_early(now + 3600, 0.01, 1.0, now=now)
+    assert should_refresh_early(now - 1, 0.01, 1.0, now=now)
+    assert 1 <= jittered_ttl(100, 0.1) <= 110
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_streaming_catalog_loader_matches_json_load(tmp_path, suffix):
+    records = [
+        {"provider": "A", "storage_gb": 100 * (i + 1), "price_per_gb": 0.02 / (i + 1)}
+        for i in range(200)
+    ]
+    path = tmp_path / f"a{suffix}"
+    if suffix == ".jsonl":
+        path.write_text("\n".join(json.dumps(record) for record in records))
+    else:
+        path.write_text(json.dumps(records, indent=2))
+    columns = load_plan_columns(path, buffer_size=64)
+    assert [plan.model_dump() for plan in columns.plans()] == records
+    assert columns.nbytes == 200 * (2 + 8 + 8)
+
+
+def test_streaming_catalog_loader_rejects_invalid_rows(tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps([{"provider": "A", "storage_gb": 1, "price_per_gb": 0.1},
+                                {"provider": "A", "storage_gb": -5, "price_per_gb": 0.1}]))
+    with pytest.raises(ValueError, match="row 1"):
+        load_plan_columns(path)
+    row = '{"provider": "A", "storage_gb": 1, "price_per_gb": 0.1}'
+    for malformed in (f"[{row},", f"[{row} {row}]", f"[{row},,{row}]", f"[{row},]", f"[,{row}]", f"[{row}] x", f"[{row}]]"):
+        path.write_text(malformed)
+        for buffer_size in (1, 7, 4096):
+            with pytest.raises(ValueError):
+                load_plan_columns(path, buffer_size=buffer_size)
+    for valid, rows in (("[]", 0), (f" [ {row} ,\n{row} ]\n", 2)):
+        path.write_text(valid)
+        assert len(load_plan_columns(path, buffer_size=3)) == rows
+
+
+@pytest.mark.asyncio
+async def test_provider_plans_cached_in_redis_chunks(tmp_path, mocker):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    mocker.patch.object(settings, "PROVIDER_CACHE_CHUNK_SIZE", 2)
+    provider = BaseProviderClient("a.json", redis_client)
+    plans = await provider.get_pricing_plans()
+    assert len(plans) == 5
+    meta = json.loads(await redis_client.get("provider_plans:{a.json}"))
+    assert meta["chunks"] == 3 and meta["rows"] == 5
+    plan_cache.clear()
+    mocker.patch.object(provider, "load_plan_columns", side_effect=AssertionError)
+    assert await provider.get_pricing_plans() == plans
+    plan_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_catalog_rebuild_does_not_build_plan_models(mocker):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    providers = [BaseProviderClient("a.json", redis_client), BaseProviderClient("b.json", redis_client)]
+    service = PricingPlanService(PricingPlanRepository(redis_client), providers, PlanIndexStore())
+    mocker.patch.object(PricingPlan, "trusted", side_effect=AssertionError("per-row model"))
+    mocker.patch.object(PricingPlan, "__init__", side_effect=AssertionError("per-row model"))
+    index = await service.get_plan_index()
+    assert len(index) == sum(len(provider.load_plan_columns()) for provider in providers)
+    plan_cache.clear()
+
+def test_plan_index_multi_criteria_search(mock_pricing_plan_service):
+    plans = mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value
+    index = PlanIndex(catalog_version(plans), plans)
+    query = PlanQuery(min_storage=100, max_budget=5, max_price=0.015, providers=["B"], limit=2)
+    expected = sorted(
+        [plan for plan in plans if plan.storage_gb >= 100 and plan.storage_gb * plan.price_per_gb <= 5
+         and plan.price_per_gb <= 0.015 and plan.provider == "B"],
+        key=lambda plan: plan.storage_gb * plan.price_per_gb,
+    )[:2]
+    assert index.search(query) == expected
+    assert json.loads(index.encoded_search(query).body) == [plan.model_dump() for plan in expected]
+    assert index.encoded_search(PlanQuery(min_storage=100)) is index.encoded(100)
+
+
+def test_pricing_plans_endpoint_filters_and_rejects_unknown_providers():
+    plan_cache.clear()
+    response = client.get("/pricing-plans?min_storage=0&providers=A&max_price=0.01&limit=2")
+    assert response.status_code == 200
+    assert [(plan["provider"], plan["storage_gb"]) for plan in response.json()] == [("A", 500), ("A", 1000)]
+    response = client.get("/pricing-plans?min_storage=0&providers=Z")
+    assert response.status_code == 422
+    assert "Unknown providers" in response.json()["detail"][0]["msg"]
+
+
+def test_plan_optimizer_finds_cheapest_cover(mock_pricing_plan_service):
+    plans = mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value
+    optimizer = PlanIndex(catalog_version(plans), plans).optimizer
+    combination = optimizer.solve(4500)
+    assert combination.total_cost == pytest.approx(14.8)
+    assert [(s.plan.storage_gb, s.quantity) for s in combination.plans] == [(2000, 2), (1200, 1)]
+    assert optimizer.solve(4500) is combination
+    assert optimizer.solve(4500, provider="B").total_cost == pytest.approx(19.2)
+    assert optimizer.solve(4500, max_plans=2) is None
+    bounded = optimizer.solve(3000, max_plans=2)
+    assert bounded.plan_count == 2 and bounded.total_cost == pytest.approx(9.8)
+
+
+
+def test_bounded_optimizer_coarsens_over_its_work_budget():
+    weights, costs = np.array([37, 23, 11, 5]), np.array([3.6, 2.3, 1.2, 0.6])
+    exact_cost, _ = min_cost_cover_bounded(weights, costs, 1000, 40)
+    cost, counts = min_cost_cover_bounded(weights, costs, 1000, 40, max_cells=50_000)
+    assert sum(counts.values()) <= 40
+    assert sum(int(weights[item]) * count for item, count in counts.items()) >= 1000
+    assert cost == pytest.approx(sum(float(costs[item]) * count for item, count in counts.items()))
+    assert exact_cost <= cost <= exact_cost * 1.1
+
+    # Rounding 1000 down to 333 steps of 3 leaves the target out of reach: falls back to the largest plan
+    weights, costs = np.array([1000, 1]), np.array([1.0, 0.0001])
+    assert min_cost_cover_bounded(weights, costs, 32000, 32, max_cells=682_667) == (32.0, {0: 32})
+
+def test_optimize_endpoint_validates_and_reports_uncoverable_requirements():
+    plan_cache.clear()
+    response = client.get("/pricing-plans/optimize?required_gb=4500&provider=B")
+    assert response.status_code == 200
+    assert response.json()["plans"] == [
+        {"plan": {"provider": "B", "storage_gb": 1200, "price_per_gb": 0.004}, "quantity": 4}
+    ]
+    assert client.get("/pricing-plans/optimize?required_gb=4500&max_plans=2").status_code == 404
+    assert client.get("/pricing-plans/optimize?required_gb=10&provider=Z").status_code == 422
+    assert client.get("/pricing-plans/optimize?required_gb=0").status_code == 422
+
+
+
+def test_pricing_endpoints_return_503_when_redis_is_unavailable(mocker):
+    service = mocker.MagicMock()
+    service.get_encoded_plans = AsyncMock(side_effect=RedisUnavailableError("Redis circuit is open"))
+    service.optimize_plans = AsyncMock(side_effect=RedisUnavailableError("Redis circuit is open"))
+    mocker.patch.dict(app.dependency_overrides, {get_pricing_plan_service: lambda: service})
+    for path in ("/pricing-plans?min_storage=100", "/pricing-plans/optimize?required_gb=100"):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Redis circuit is open"}
+
+def write_catalog_file(path, plans):
+    path.write_text(json.dumps([plan.model_dump() for plan in plans]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def catalog_files(tmp_path):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    clients = []
+    for name in settings.PROVIDERS:
+        client = BaseProviderClient(f"{name.lower()}.json", redis_client)
+        client.file_path = tmp_path / f"{name.lower()}.json"
+        write_catalog_file(client.file_path, [PricingPlan(provider=name, storage_gb=100, price_per_gb=0.02)])
+        clients.append(client)
+    plan_cache.clear()
+    yield redis_client, clients
+    plan_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_catalog_manager_reparses_only_changed_files(catalog_files, mocker):
+    redis_client, clients = catalog_files
+    mocker.patch.object(settings, "CATALOG_WATCH", False)
+    store = PlanIndexStore()
+    manager = CatalogManager(store)
+    await manager.start(redis_client, clients)
+    first_version = manager.version
+    assert store.current.version == first_version and len(store.current) == 2
+    assert await redis_client.get(CATALOG_VERSION_KEY) == first_version
+
+    loads = [mocker.spy(client, "load_plan_columns") for client in clients]
+    assert not await manager.reload()
+    write_catalog_file(clients[1].file_path, [PricingPlan(provider="B", storage_gb=100, price_per_gb=0.02)])
+    assert not await manager.reload()
+    assert [spy.call_count for spy in loads] == [0, 0]
+
+    write_catalog_file(clients[0].file_path, [PricingPlan(provider="A", storage_gb=500, price_per_gb=0.01)])
+    assert await manager.reload()
+    assert [spy.call_count for spy in loads] == [1, 0]
+    assert manager.version != first_version
+    assert store.current.version == manager.version
+    assert await redis_client.get(CATALOG_VERSION_KEY) == manager.version
+    assert [plan.storage_gb for plan in store.current.query(0)] == [100, 500]
+    assert manager.snapshot()["providers"]["A"]["rows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_catalog_manager_polls_for_changes(catalog_files, mocker):
+    redis_client, clients = catalog_files
+    mocker.patch.object(settings, "CATALOG_WATCH", True)
+    mocker.patch("src.services.catalog_manager.awatch", None)
+    manager = CatalogManager(PlanIndexStore(), poll_interval=0.02)
+    await manager.start(redis_client, clients)
+    first_version = manager.version
+    write_catalog_file(clients[0].file_path, [PricingPlan(provider="A", storage_gb=700, price_per_gb=0.01)])
+    for _ in range(100):
+        if manager.version != first_version:
+            break
+        await asyncio.sleep(0.02)
+    await manager.stop()
+    assert manager.version != first_version
+    assert manager.snapshot()["watcher"] == "polling"
+
+
+@pytest.mark.asyncio
+async def test_catalog_manager_warm_starts_from_snapshot(catalog_files, tmp_path, mocker):
+    redis_client, clients = catalog_files
+    mocker.patch.object(settings, "CATALOG_WATCH", False)
+    snapshot_path = tmp_path / "catalog.snapshot"
+    built = build_snapshot(snapshot_path, clients)
+    plan_cache.clear()
+
+    loads = [mocker.spy(client, "load_plan_columns") for client in clients]
+    store = PlanIndexStore()
+    manager = CatalogManager(store)
+    await manager.start(redis_client, clients, snapshot_path=str(snapshot_path))
+    assert [spy.call_count for spy in loads] == [0, 0]
+    assert manager.snapshot()["source"] == "snapshot"
+    assert manager.version == built.version == store.current.version
+    assert not store.current.table.by_cost.flags.writeable
+    assert [plan.provider for plan in store.current.query(0)] == ["A", "B"]
+    await manager._sync_task
+    assert await redis_client.get(CATALOG_VERSION_KEY) == built.version
+    assert [plan.provider for plan in await clients[1].get_pricing_plans()] == ["B"]
+    await manager.stop()
+
+    write_catalog_file(clients[0].file_path, [PricingPlan(provider="A", storage_gb=500, price_per_gb=0.01)])
+    manager = CatalogManager(PlanIndexStore())
+    await manager.start(redis_client, clients, snapshot_path=str(snapshot_path))
+    assert [spy.call_count for spy in loads] == [1, 0]
+    assert manager.snapshot()["source"] == "files"
+    assert manager.version != built.version
+    assert await redis_client.get(CATALOG_VERSION_KEY) == manager.version
+
+    snapshot_path.write_bytes(b"PLANSNAP" + b"\0" * 4)
+    assert load_snapshot(snapshot_path) is None
+    assert load_snapshot(tmp_path / "missing.snapshot") is None
+
+
+def test_provider_registry_reuses_clients_across_requests(mocker):
+    exists = mocker.spy(Path, "exists")
+    first = get_provider_clients_with_list(None)
+    second = get_provider_clients_with_list(None)
+    assert first is second
+    assert [provider.name for provider in first] == settings.PROVIDERS
+    assert get_provider_clients_with_dict(None)["A"] is first[0]
+    plan_cache.clear()
+    assert client.get("/pricing-plans?min_storage=0").status_code == 200
+    assert exists.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_accepts_remote_provider_clients():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    plan_cache.clear()
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request.url.path)
+        return httpx.Response(200, json=[{"provider": "B", "storage_gb": 300, "price_per_gb": 0.01}])
+
+    remote = RemoteProviderClient(
+        "B", "http://provider-b", redis_client,
+        http_client=httpx.AsyncClient(base_url="http://provider-b", transport=httpx.MockTransport(handler)),
+    )
+    registry = ProviderRegistry()
+    registry.register(remote)
+    assert registry.get("B") is remote and registry.file_clients() == ()
+    assert await registry.get("B").get_pricing_plans() == [PricingPlan(provider="B", storage_gb=300, price_per_gb=0.01)]
+    assert await remote.get_pricing_plans() == await remote.get_pricing_plans()
+    assert requests_seen == ["/plans"]
+    await registry.close()
+    assert remote.http_client.is_closed
+    plan_cache.clear()
+
+def test_metrics_endpoint_exposes_routes_redis_caches_and_queues():
+    plan_cache.clear()
+    assert client.get("/pricing-plans?min_storage=100").status_code == 200
+    assert client.post("/orders", json={"provider": "A", "storage_gb": 10}).status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert any(line.startswith('http_request_duration_seconds_count{method="GET",route="/pricing-plans",status="2xx"}') for line in lines)
+    assert any(line.startswith('redis_commands_total{command="HSET"}') for line in lines)
+    assert any(line.startswith('cache_hit_ratio{cache="pricing_plans"}') for line in lines)
+    assert any(line.startswith('cache_lookups_total{cache="provider_plans",result=') for line in lines)
+    assert any(line.startswith("order_completion_queue_depth ") for line in lines)
+    pending = next(line for line in lines if line.startswith('orders_by_status{status="payment_pending"}'))
+    assert float(pending.split()[-1]) >= 0
+
+@pytest.mark.asyncio
+async def test_timing_middleware_records_optional_spans():
+    timed_app = FastAPI()
+
+    @timed_app.get("/work/{item}")
+    async def work(item: int):
+        with span("compute"):
+            await asyncio.sleep(0.01)
+        return {"item": item}
+
+    transport = httpx.ASGITransport(app=TimingMiddleware(timed_app, spans=True))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.get("/work/1")
+        assert response.headers["server-timing"].startswith("compute;dur=")
+    assert request_histogram("GET", "/work/{item}", 200).count == 1
+    assert span_histogram("compute").count == 1
+
+    transport = httpx.ASGITransport(app=TimingMiddleware(timed_app, spans=False))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        assert "server-timing" not in (await http.get("/work/2")).headers
+    assert request_histogram("GET", "/work/{item}", 200).count == 2
+    assert span_histogram("compute").count == 1
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_refills_and_prechecks_locally():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    limiter = TokenBucketLimiter(redis_client, rate=10.0, burst=4, headroom=0.5, sync_interval=1.0)
+    now = 1000.0
+
+    results = [await limiter.check("ip:1", now=now) for _ in range(5)]
+    assert [allowed for allowed, _, _ in results] == [True, True, True, True, False]
+    assert results[-1][2] == pytest.approx(0.1)
+    assert (await limiter.check("ip:2", now=now))[0]
+    assert (await limiter.check("ip:1", now=now + 0.1))[0]
+
+    assert (await limiter.check("ip:3", now=now))[0]
+    await redis_client.delete(bucket_key("ip:3"))
+    assert (await limiter.check("ip:3", now=now))[0]
+    assert not await redis_client.exists(bucket_key("ip:3"))
+    assert (await limiter.check("ip:3", now=now))[0]
+    assert float(await redis_client.hget(bucket_key("ip:3"), "tokens")) == pytest.approx(2.0)
+
+@pytest.mark.asyncio
+async def test_rate_limit_middleware_returns_429_per_client_and_sheds_load():
+    limited_app = FastAPI()
+
+    @limited_app.get("/orders/{item}")
+    async def get_item(item: int):
+        return {"item": item}
+
+    @limited_app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    load = {"wait": 0.0}
+    middleware = RateLimitMiddleware(
+        limited_app,
+        limiter=TokenBucketLimiter(redis_client, rate=1.0, burst=2, headroom=0.0),
+        shed_pool_wait=0.05,
+        load=lambda: load["wait"],
+    )
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        statuses = [(await http.get("/orders/1", headers={"X-API-Key": "a"})).status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        limited = await http.get("/orders/1", headers={"X-API-Key": "a"})
+        assert limited.json() == {"detail": "Rate limit exceeded"}
+        assert int(limited.headers["retry-after"]) >= 1
+        assert (await http.get("/orders/1", headers={"X-API-Key": "b"})).status_code == 200
+        assert (await http.get("/health", headers={"X-API-Key": "a"})).status_code == 200
+
+        load["wait"] = 0.2
+        shed = await http.get("/orders/1", headers={"X-API-Key": "c"})
+        assert shed.status_code == 429
+        assert shed.headers["retry-after"] == str(settings.LOAD_SHED_RETRY_AFTER)
+        assert (await http.get("/health")).status_code == 200
+
+@pytest.mark.asyncio
+async def test_order_events_fan_out_from_one_subscription():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order = Order(order_id=uuid4(), provider="A", storage_gb=10, status="pending")
+    await repository.save_order(order)
+    hub = OrderEventHub()
+    hub.start(redis_client)
+    try:
+        stream = hub.follow(order.order_id, lambda: repository.get_order(order.order_id), heartbeat=0.02)
+        assert await anext(stream) == "pending"
+        assert await anext(stream) is None
+        with hub.watch(order.order_id) as watcher, hub.watch(order.order_id):
+            assert hub.watching == 3
+            for _ in range(100):
+                if (await redis_client.pubsub_numsub(settings.ORDER_EVENTS_CHANNEL))[0][1] == 1:
+                    break
+                await asyncio.sleep(0.01)
+            order.status = "completed"
+            await repository.update_statuses([order])
+            assert await watcher.next(1.0) == ["completed"]
+            status = None
+            while status is None:
+                status = await anext(stream)
+            assert status == "completed"
+            with pytest.raises(StopAsyncIteration):
+                await anext(stream)
+        assert (await redis_client.pubsub_numsub(settings.ORDER_EVENTS_CHANNEL))[0][1] == 1
+        assert hub.watching == 0
+    finally:
+        await hub.stop()
+
+def test_order_event_stream_and_websocket(mock_order_service, mocker):
+    mocker.patch.dict(app.dependency_overrides, {get_order_service: lambda: mock_order_service})
+    order = Order(order_id=uuid4(), provider="A", storage_gb=100, status="completed")
+    mocker.patch.object(mock_order_service, "get_order", new=AsyncMock(return_value=order))
+    with client.stream("GET", f"/orders/{order.order_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.read().decode()
+    assert body == f'event: status\ndata: {{"order_id":"{order.order_id}","status":"completed"}}\n\n'
+
+    order.status = "pending"
+    with client.websocket_connect(f"/orders/{order.order_id}/ws") as websocket:
+        assert websocket.receive_json() == {"event": "status", "order_id": str(order.order_id), "status": "pending"}
+        publisher = fakeredis.FakeRedis(server=fake_server)
+        publisher.publish(settings.ORDER_EVENTS_CHANNEL, f"{order.order_id} completed")
+        publisher.close()
+        assert websocket.receive_json()["status"] == "completed"
+
+    mock_order_service.get_order.return_value = None
+    assert client.get(f"/orders/{order.order_id}/events").status_code == 404
+
+def test_trusted_models_match_validated_models():
+    plan = PricingPlan.trusted("A", 100, 0.01)
+    assert plan == PricingPlan(provider="A", storage_gb=100, price_per_gb=0.01)
+    assert plan.model_dump_json() == '{"provider":"A","storage_gb":100,"price_per_gb":0.01}'
+
+    validated = Order(order_id=uuid4(), provider="B", storage_gb=50, status="pending")
+    trusted = Order.trusted(validated.order_id, "B", 50, "pending", validated.created_at)
+    assert trusted == validated
+    assert trusted.model_dump_json() == validated.model_dump_json()
+    trusted.status = "completed"
+    assert trusted.model_dump()["status"] == "completed"
+
+    with pytest.raises(ValueError):
+        Order(order_id=uuid4(), provider="Z", storage_gb=50, status="pending")
+    with pytest.raises(ValueError):
+        PlanQuery(providers=["A", "Z"])
+
+def test_related_keys_share_a_cluster_slot():
+    order_id = uuid4()
+    assert key_slot(order_key(order_id).encode()) == key_slot(str(order_id).encode())
+    assert len({key_slot(key.encode()) for key in (CATALOG_KEY, CATALOG_VERSION_KEY, CATALOG_LOCK_KEY)}) == 1
+    provider = BaseProviderClient("a.json", fakeredis.aioredis.FakeRedis())
+    assert key_slot(provider.chunk_key("gen", 3).encode()) == key_slot(provider.cache_key.encode())
+
+@pytest.mark.asyncio
+async def test_lag_tolerant_reads_use_healthy_replicas(mocker):
+    primary = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    replica = RedisReplica("127.0.0.1:6390")
+    replica.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    mocker.patch.object(redis_manager, "client", primary)
+    mocker.patch.object(redis_manager, "replicas", [replica])
+    await primary.set(CATALOG_VERSION_KEY, "primary")
+    await replica.client.set(CATALOG_VERSION_KEY, "replica")
+
+    plan_cache.clear()
+    assert await PricingPlanRepository(primary).get_catalog_version() == "replica"
+    repository = OrderRepository(primary)
+    order = Order(order_id=uuid4(), provider="A", storage_gb=10, status="pending")
+    await repository.save_order(order)
+    assert await repository.get_order(order.order_id) == order
+    assert (await repository.list_orders())[0] == []
+
+    for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD):
+        replica.breaker.record_failure(ConnectionError("replica down"))
+    plan_cache.clear()
+    assert await PricingPlanRepository(primary).get_catalog_version() == "primary"
+    assert [o.order_id for o in (await repository.list_orders())[0]] == [order.order_id]
+    plan_cache.clear()
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("redis-server") is None, reason="needs redis-server for a local cluster")
+async def test_repositories_on_local_redis_cluster():
+    from benchmarks.redis_cluster import local_cluster
+
+    with local_cluster(shards=3, replicas=1, base_port=7100) as port:
+        redis_client = cluster_client("127.0.0.1", port)
+        try:
+            repository = OrderRepository(redis_client)
+            orders = [Order(order_id=uuid4(), provider="AB"[i % 2], storage_gb=10 + i, status="pending") for i in range(20)]
+            await repository.save_orders(orders, complete_at=time.time())
+            orders[0].status = "completed"
+            await repository.update_statuses([orders[0]])
+            assert await repository.get_orders([o.order_id for o in orders]) == orders
+            page, _ = await repository.list_orders(status="completed")
+            assert [o.order_id for o in page] == [orders[0].order_id]
+
+            completion = OrderCompletionRepository(redis_client)
+            due = await completion.claim_due(time.time() + 1, 100, 60)
+            assert len(due) == 20
+            await completion.ack(due)
+            assert await completion.depth() == 0
+
+            plan_cache.clear()
+            pricing = PricingPlanRepository(redis_client)
+            lease = pricing.rebuild_lease()
+            assert await lease.acquire()
+            await pricing.cache_catalog("v1", load_plan_columns(BaseProviderClient("a.json", redis_client).file_path))
+            await lease.release()
+            plan_cache.clear()
+            assert await pricing.get_catalog_version() == "v1"
+        finally:
+            await redis_client.aclose()
+            plan_cache.clear()
+
+@pytest.mark.asyncio
+async def test_catalog_miss_during_background_refresh_gets_an_index(mock_pricing_plan_service):
+    plans = mock_pricing_plan_service.get_filtered_and_sorted_plans.return_value
+    provider = AsyncMock()
+    provider.get_plan_columns.return_value = PlanColumns.from_plans(plans)
+    plan_cache.clear()
+    service = PricingPlanService(
+        PricingPlanRepository(fakeredis.aioredis.FakeRedis(decode_responses=True)), [provider], PlanIndexStore()
+    )
+    refreshing = asyncio.Event()
+
+    async def slow_refresh():
+        await refreshing.wait()
+
+    service.flight.spawn(CATALOG_REFRESH_KEY, slow_refresh)
+    index = await asyncio.wait_for(service.get_plan_index(), 5)
+    assert index is not None and len(index) == len(plans)
+    refreshing.set()
+    plan_cache.clear()
+
+@pytest.mark.asyncio
+async def test_update_order_moves_it_between_status_indexes():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    repository = OrderRepository(redis_client)
+    order = Order(order_id=uuid4(), provider="A", storage_gb=10, status="pending")
+    await repository.save_order(order)
+    order.status = "completed"
+    await repository.update_order(order)
+    assert (await repository.list_orders(status="pending"))[0] == []
+    assert [o.status for o in (await repository.list_orders(status="completed"))[0]] == ["completed"]
+    assert [o.order_id for o in (await repository.list_orders(provider="A", status="completed"))[0]] == [order.order_id]
+
+def test_encoded_plan_bodies_are_bounded_per_index(mocker):
+    mocker.patch.object(settings, "PLAN_BODY_CACHE_SIZE", 2)
+    plans = [PricingPlan(provider="AB"[i % 2], storage_gb=10 * (i + 1), price_per_gb=0.01) for i in range(10)]
+    index = PlanIndex("v1", plans)
+    first = index.encoded(10)
+    for min_storage in range(10, 101, 10):
+        index.encoded(min_storage)
+    assert len(index._encoded) == 2
+    assert index.encoded(100) is index.encoded(100)
+    assert index.encoded(10).body == first.body
+
+def test_pool_wait_shedding_is_off_in_cluster_mode(mocker):
+    assert RateLimitMiddleware(FastAPI()).load is not None
+    mocker.patch.object(redis_manager, "cluster", True)
+    mocker.patch.object(redis_manager, "client", None)
+    assert RateLimitMiddleware(FastAPI()).load is None
+    assert redis_manager.snapshot()["pool"] == {"nodes": []}
+
+@pytest.mark.asyncio
+async def test_cluster_close_leaves_the_standalone_pool_alone(mocker):
+    manager = RedisClientManager()
+    manager.cluster = True
+    get_pool = mocker.patch("src.core.redis_client.get_redis_pool")
+    await manager.close()
+    get_pool.assert_not_called()